@@ -19,10 +19,31 @@ builder.Services
     .AddSingleton<SwConnection>()
     .AddSingleton<DocumentManager>()
     .AddSingleton<SchemaManager>()
+    .AddSingleton<DocumentRevisions>()
+    .AddSingleton<ComTargetCache>()
+    .AddSingleton<DocumentIndex>()
+    .AddSingleton<FeatureDefinitionReader>()
+    .AddSingleton<FeatureDataCache>()
+    .AddSingleton<AssemblyTreeCache>()
     .AddSingleton<OperationManager>()
+    .AddSingleton<DispatchScheduler>()
+    .AddSingleton<ServerMetrics>()
     .AddSingleton<OperationRunner>()
+    .AddSingleton<JobManager>()
     .AddMcpServer()
     .WithStdioServerTransport()
     .WithToolsFromAssembly();
 
+// Optional periodic metrics file (see MetricsDump), e.g.
+// --Metrics:DumpPath=C:\swmcp\metrics.json --Metrics:DumpIntervalSeconds=30
+if (builder.Configuration["Metrics:DumpPath"] is { Length: > 0 } metricsPath)
+{
+    var seconds = int.TryParse(builder.Configuration["Metrics:DumpIntervalSeconds"], out var s) && s > 0
+        ? s
+        : MetricsDump.DefaultIntervalSeconds;
+    builder.Services.AddHostedService(services => new MetricsDump(
+        services.GetRequiredService<ServerMetrics>(), metricsPath, TimeSpan.FromSeconds(seconds),
+        services.GetRequiredService<ILogger<MetricsDump>>()));
+}
+
 await builder.Build().RunAsync();
@@ -0,0 +1,332 @@
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>A component's placement in its assembly: <c>MathTransform.ArrayData</c>, split up.</summary>
+    /// <param name="Rotation">The 3×3 rotation, row by row.</param>
+    /// <param name="Translation">The origin's offset, in meters.</param>
+    public sealed record ComponentTransform(double[] Rotation, double[] Translation, double Scale);
+
+    /// <summary>One component as <c>get_assembly_info</c> reports it.</summary>
+    /// <param name="Name">SolidWorks' <c>Name2</c>: the path from the top level, e.g. <c>Frame-1/Bracket-2</c>.</param>
+    /// <param name="File">The referenced model file.</param>
+    /// <param name="Suppression">The <c>swComponentSuppressionState_e</c> state, e.g. <c>lightweight</c>.</param>
+    /// <param name="Children">The first page of children when expanded; null when not (see <paramref name="ChildCount"/>).</param>
+    public sealed record AssemblyComponent(
+        string Name, string? File, string? Configuration, string Suppression, ComponentTransform? Transform,
+        int ChildCount, IReadOnlyList<AssemblyComponent>? Children);
+
+    /// <summary>One page of an assembly level, and how many components the level has.</summary>
+    public sealed record AssemblyPage(IReadOnlyList<AssemblyComponent> Components, int TotalCount);
+
+    /// <summary>Which part of the component tree <c>get_assembly_info</c> reads.</summary>
+    public sealed record AssemblyQuery
+    {
+        /// <summary>Deepest expansion one call makes.</summary>
+        public const int MaxDepth = 8;
+
+        public AssemblyQuery(
+            string? parent = null, int depth = 1, int offset = 0, int limit = 100, bool transforms = true,
+            bool resolveLightweight = false)
+        {
+            Parent = string.IsNullOrWhiteSpace(parent) ? null : parent.Trim();
+            Depth = Math.Clamp(depth, 1, MaxDepth);
+            Offset = Math.Max(0, offset);
+            Limit = Math.Max(0, limit);
+            Transforms = transforms;
+            ResolveLightweight = resolveLightweight;
+        }
+
+        /// <summary>The component whose children are listed (its <c>Name2</c>); null for the top level.</summary>
+        public string? Parent { get; }
+
+        /// <summary>Levels listed: 1 is the level itself, 2 adds each listed component's children, and so on.</summary>
+        public int Depth { get; }
+
+        /// <summary>Components of the listed level to skip. Deeper levels always start at their first child.</summary>
+        public int Offset { get; }
+
+        /// <summary>Most components listed per level.</summary>
+        public int Limit { get; }
+
+        public bool Transforms { get; }
+
+        /// <summary>Resolve lightweight components on the page before reading them.</summary>
+        public bool ResolveLightweight { get; }
+    }
+
+    /// <summary>
+    /// The component tree behind <c>get_assembly_info</c>, read a page at a
+    /// time and kept per document revision. A top-level assembly with
+    /// thousands of components is never walked whole: each level is one
+    /// <c>GetComponents</c>/<c>GetChildren</c> call, and only the components
+    /// on the requested page are read — name, file, configuration,
+    /// suppression, transform, and a child count that tells the client
+    /// whether to drill in (with <see cref="AssemblyQuery.Parent"/>).
+    /// </summary>
+    /// <remarks>
+    /// Every read on a component works on a lightweight one, so nothing is
+    /// resolved into memory unless the caller asks for
+    /// <see cref="AssemblyQuery.ResolveLightweight"/> — and then only the
+    /// page's components. Expansion below the listed level stops after
+    /// <see cref="MaxComponents"/> components; the rest report
+    /// <see cref="AssemblyComponent.ChildCount"/> only.
+    /// <para>
+    /// Pages are cached per document and <see cref="DocumentRevisions"/>
+    /// revision: a server write to the assembly moves the revision and so
+    /// drops its pages, and, like <c>ifRevisionNot</c>, an edit made by hand
+    /// in SolidWorks is not seen until one does. A resolving read changes
+    /// suppression states without a revision, so it drops the document's
+    /// pages itself. At most <see cref="Capacity"/> documents are kept, least
+    /// recently read dropped first. <see cref="Read"/> must run on the
+    /// dispatcher thread.
+    /// </para>
+    /// </remarks>
+    public sealed class AssemblyTreeCache
+    {
+        /// <summary>Documents kept before the least recently read one is dropped.</summary>
+        public const int Capacity = 16;
+
+        /// <summary>Pages kept per document before its pages are dropped and collected afresh.</summary>
+        public const int PagesPerDocument = 64;
+
+        /// <summary>Components one call reads, at most, below the listed level.</summary>
+        public const int MaxComponents = 2000;
+
+        // IComponent2.SetSuppression2's swComponentResolved: the component
+        // itself, not its whole subtree (swComponentFullyResolved).
+        private const int Resolved = 3;
+
+        private readonly object _lock = new();
+        private readonly Dictionary<string, DocumentPages> _documents = new(StringComparer.OrdinalIgnoreCase);
+        private long _clock;
+        private long _hits;
+        private long _misses;
+
+        /// <summary>Pages served from the cache.</summary>
+        public long Hits => Interlocked.Read(ref _hits);
+
+        /// <summary>Pages read from SolidWorks.</summary>
+        public long Misses => Interlocked.Read(ref _misses);
+
+        /// <summary>
+        /// The page of <paramref name="doc"/>'s component tree
+        /// <paramref name="query"/> selects, or null when
+        /// <see cref="AssemblyQuery.Parent"/> names no component.
+        /// </summary>
+        public AssemblyPage? Read(SwDocument doc, long revision, AssemblyQuery query)
+        {
+            var key = DocumentRevisions.KeyFor(doc.Info.Title, doc.Info.Path);
+            if (query.ResolveLightweight)
+            {
+                Forget(key);
+            }
+            else if (TryGet(key, revision, query, out var cached))
+            {
+                return cached;
+            }
+
+            var page = Walk(doc.Model, query);
+            if (page != null)
+            {
+                Store(key, revision, query, page);
+            }
+
+            return page;
+        }
+
+        /// <summary>
+        /// The cached page for <paramref name="query"/> at
+        /// <paramref name="revision"/>, counting a hit or a miss. Internal
+        /// (not private) so swmcp.server.tests can check the revision rules
+        /// without SolidWorks.
+        /// </summary>
+        internal bool TryGet(string documentKey, long revision, AssemblyQuery query, out AssemblyPage page)
+        {
+            lock (_lock)
+            {
+                if (_documents.TryGetValue(documentKey, out var doc) && doc.Revision == revision &&
+                    doc.Pages.TryGetValue(query, out page!))
+                {
+                    doc.LastUsed = ++_clock;
+                    Interlocked.Increment(ref _hits);
+                    return true;
+                }
+            }
+
+            page = null!;
+            Interlocked.Increment(ref _misses);
+            return false;
+        }
+
+        /// <summary>Caches <paramref name="page"/>, dropping the document's pages from any other revision.</summary>
+        internal void Store(string documentKey, long revision, AssemblyQuery query, AssemblyPage page)
+        {
+            lock (_lock)
+            {
+                if (!_documents.TryGetValue(documentKey, out var doc) || doc.Revision != revision ||
+                    doc.Pages.Count >= PagesPerDocument)
+                {
+                    if (doc == null && _documents.Count >= Capacity)
+                    {
+                        _documents.Remove(_documents.MinBy(d => d.Value.LastUsed).Key);
+                    }
+
+                    doc = new DocumentPages(revision);
+                    _documents[documentKey] = doc;
+                }
+
+                doc.LastUsed = ++_clock;
+                doc.Pages[query] = page;
+            }
+        }
+
+        /// <summary>Drops every page cached for the document.</summary>
+        internal void Forget(string documentKey)
+        {
+            lock (_lock)
+            {
+                _documents.Remove(documentKey);
+            }
+        }
+
+        /// <summary>
+        /// <c>MathTransform.ArrayData</c>'s 16 values as a transform: nine of
+        /// rotation, three of translation, the scale. Null for anything else.
+        /// Internal (not private) so swmcp.server.tests can check the layout.
+        /// </summary>
+        internal static ComponentTransform? FromArrayData(object? data) =>
+            data is double[] { Length: >= 13 } values
+                ? new ComponentTransform(values[..9], values[9..12], values[12])
+                : null;
+
+        /// <summary><c>swComponentSuppressionState_e</c>, by name.</summary>
+        internal static string SuppressionName(int? state) => state switch
+        {
+            0 => "suppressed",
+            1 => "lightweight",
+            2 => "fullyResolved",
+            3 => "resolved",
+            4 => "fullyLightweight",
+            5 => "internalIdMismatch",
+            _ => "unknown",
+        };
+
+        private static bool IsLightweight(int? state) => state is 1 or 4;
+
+        private static AssemblyPage? Walk(object model, AssemblyQuery query)
+        {
+            object? parent = null;
+            if (query.Parent != null)
+            {
+                parent = DispatchInvoker.InvokeMethod(model, "GetComponentByName", new object?[] { query.Parent }) is { Success: true, Value: { } found }
+                    ? found
+                    : null;
+                if (parent == null)
+                {
+                    return null;
+                }
+            }
+
+            try
+            {
+                var level = parent == null
+                    ? Components(DispatchInvoker.InvokeMethod(model, "GetComponents", new object?[] { true }))
+                    : Components(DispatchInvoker.InvokeMethod(parent, "GetChildren", Array.Empty<object?>()));
+                var budget = MaxComponents;
+                return new AssemblyPage(ReadLevel(level, query.Offset, query, query.Depth, ref budget), level.Length);
+            }
+            finally
+            {
+                ComLifetime.Release(parent);
+            }
+        }
+
+        // Takes ownership of level: every element is an RCW this call
+        // obtained, released here whether or not it was on the page (C2).
+        private static List<AssemblyComponent> ReadLevel(object[] level, int offset, AssemblyQuery query, int depth, ref int budget)
+        {
+            try
+            {
+                var components = new List<AssemblyComponent>();
+                foreach (var component in level.Skip(offset).Take(query.Limit))
+                {
+                    components.Add(ReadComponent(component, query, depth, ref budget));
+                }
+
+                return components;
+            }
+            finally
+            {
+                foreach (var component in level)
+                {
+                    ComLifetime.Release(component);
+                }
+            }
+        }
+
+        private static AssemblyComponent ReadComponent(object component, AssemblyQuery query, int depth, ref int budget)
+        {
+            var suppression = Int(DispatchInvoker.InvokeMethod(component, "GetSuppression2", Array.Empty<object?>()));
+            if (query.ResolveLightweight && IsLightweight(suppression))
+            {
+                DispatchInvoker.InvokeMethod(component, "SetSuppression2", new object?[] { Resolved });
+                suppression = Int(DispatchInvoker.InvokeMethod(component, "GetSuppression2", Array.Empty<object?>()));
+            }
+
+            var childCount = Int(DispatchInvoker.InvokeMethod(component, "IGetChildrenCount", Array.Empty<object?>())) ?? 0;
+            List<AssemblyComponent>? children = null;
+            if (depth > 1 && childCount > 0 && budget > 0)
+            {
+                var level = Components(DispatchInvoker.InvokeMethod(component, "GetChildren", Array.Empty<object?>()));
+                budget -= Math.Min(level.Length, query.Limit);
+                children = ReadLevel(level, 0, query, depth - 1, ref budget);
+            }
+
+            return new AssemblyComponent(
+                DispatchInvoker.GetProperty(component, "Name2") is { Success: true, Value: string name } ? name : "",
+                DispatchInvoker.InvokeMethod(component, "GetPathName", Array.Empty<object?>()) is { Success: true, Value: string file } ? file : null,
+                DispatchInvoker.GetProperty(component, "ReferencedConfiguration") is { Success: true, Value: string configuration } ? configuration : null,
+                SuppressionName(suppression),
+                query.Transforms ? ReadTransform(component) : null,
+                childCount,
+                children);
+        }
+
+        private static ComponentTransform? ReadTransform(object component)
+        {
+            if (DispatchInvoker.GetProperty(component, "Transform2") is not { Success: true, Value: { } transform })
+            {
+                return null;
+            }
+
+            try
+            {
+                return DispatchInvoker.GetProperty(transform, "ArrayData") is { Success: true } data ? FromArrayData(data.Value) : null;
+            }
+            finally
+            {
+                ComLifetime.Release(transform);
+            }
+        }
+
+        private static object[] Components(InvokeOutcome outcome) =>
+            outcome is { Success: true, Value: object[] components } ? components : Array.Empty<object>();
+
+        private static int? Int(InvokeOutcome outcome) => outcome is { Success: true, Value: int value } ? value : null;
+
+        private sealed class DocumentPages
+        {
+            public DocumentPages(long revision)
+            {
+                Revision = revision;
+            }
+
+            public long Revision { get; }
+
+            public Dictionary<AssemblyQuery, AssemblyPage> Pages { get; } = new();
+
+            public long LastUsed { get; set; }
+        }
+    }
+}
@@ -0,0 +1,103 @@
+using System.Runtime.ExceptionServices;
+using System.Runtime.InteropServices;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// The documents one <see cref="OperationRunner.RunBatch"/> acts on, resolved
+    /// once up front (inside the batch's dispatch, before step 0) instead of once
+    /// per step. A multi-document plan — a part, its mating part, a fixture —
+    /// names each document on many steps; every one of those used to repeat the
+    /// same <see cref="DocumentManager.Resolve"/> enumeration of every open
+    /// document.
+    /// </summary>
+    /// <remarks>
+    /// A name that does not resolve is remembered as such, not retried: the
+    /// first step naming it fails exactly as it would have without the cache
+    /// (<c>null</c> → "no open document matches"; an ambiguous match rethrows
+    /// the original <see cref="SwBridgeException"/>), and since a batch fails
+    /// fast no later step ever asks again — unless a step in between created
+    /// or renamed a document (<c>new_part</c>, <c>save_as</c>), after which
+    /// the runner calls <see cref="Forget"/> and every name is looked up
+    /// afresh the next time a step uses it. Names are compared
+    /// case-insensitively, matching <see cref="DocumentManager.Resolve"/>.
+    /// Lives for one batch on the dispatcher thread — never shared.
+    /// </remarks>
+    internal sealed class BatchDocuments
+    {
+        private readonly Dictionary<string, (SwDocument? Document, Exception? Error)> _resolved = new(StringComparer.OrdinalIgnoreCase);
+        private readonly Func<string, SwDocument?> _resolve;
+
+        /// <summary>
+        /// Resolves every distinct, non-blank name in <paramref name="documentNames"/>
+        /// through <paramref name="resolve"/>, once each.
+        /// </summary>
+        public BatchDocuments(IEnumerable<string?> documentNames, Func<string, SwDocument?> resolve)
+        {
+            _resolve = resolve;
+            foreach (var name in documentNames)
+            {
+                if (string.IsNullOrWhiteSpace(name) || _resolved.ContainsKey(name))
+                {
+                    continue;
+                }
+
+                try
+                {
+                    _resolved[name] = (resolve(name), null);
+                }
+                catch (Exception ex) when (ex is SwBridgeException or COMException)
+                {
+                    _resolved[name] = (null, ex);
+                }
+            }
+        }
+
+        /// <summary>Number of distinct names resolved up front.</summary>
+        public int Count => _resolved.Count;
+
+        /// <summary>Every distinct document the batch resolved, once each (two names for the same document count once).</summary>
+        public IEnumerable<SwDocument> Documents =>
+            _resolved.Values.Where(e => e.Document != null).Select(e => e.Document!).Distinct();
+
+        /// <summary>
+        /// Drops every resolution, hits and misses alike: after a step that
+        /// created a document a cached miss may now match it, and after a
+        /// rename a cached hit may now answer to a name that no longer
+        /// matches. <see cref="Documents"/> is emptied too.
+        /// </summary>
+        public void Forget() => _resolved.Clear();
+
+        /// <summary>
+        /// The document resolved for <paramref name="documentName"/>, or null when
+        /// nothing matched. Rethrows (with its original stack) the exception the
+        /// up-front resolution hit; a name that was not part of the up-front set
+        /// is resolved now and cached from then on.
+        /// </summary>
+        public SwDocument? Resolve(string documentName)
+        {
+            if (!_resolved.TryGetValue(documentName, out var entry))
+            {
+                try
+                {
+                    var document = _resolve(documentName);
+                    _resolved[documentName] = (document, null);
+                    return document;
+                }
+                catch (Exception ex) when (ex is SwBridgeException or COMException)
+                {
+                    _resolved[documentName] = (null, ex);
+                    throw;
+                }
+            }
+
+            if (entry.Error != null)
+            {
+                ExceptionDispatchInfo.Throw(entry.Error);
+            }
+
+            return entry.Document;
+        }
+    }
+}
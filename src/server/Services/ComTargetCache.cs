@@ -0,0 +1,242 @@
+using System.Runtime.InteropServices;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Per-document cache of the intermediate COM objects recipes target —
+    /// <c>FeatureManager</c>, <c>SketchManager</c>, <c>Extension</c>,
+    /// <c>Extension.SelectionManager</c>, … — so a step against a document the
+    /// server has already worked on skips the <see cref="ComPath.Resolve"/>
+    /// walk (one cross-process property get per path segment) from the model
+    /// down to its target.
+    /// </summary>
+    /// <remarks>
+    /// Only paths made entirely of <see cref="StableSegments"/> are cached:
+    /// those return the same object for as long as the document is open.
+    /// <c>ActiveView</c> or <c>SketchManager.ActiveSketch</c> do not, and are
+    /// always resolved afresh.
+    /// <para>
+    /// Entries are keyed on the model RCW itself, by reference. The key is
+    /// held strongly, so while an entry exists the runtime keeps handing out
+    /// that same RCW for the document. A document that is closed (and maybe
+    /// reopened) comes back as a different COM object, hence a different RCW
+    /// and a fresh entry. The dead entry is never looked up again and ages
+    /// out: at most <see cref="Capacity"/> documents are kept, and the least
+    /// recently used one is released first. <see cref="Clear"/> drops
+    /// everything when the connection to SolidWorks is lost.
+    /// </para>
+    /// <para>
+    /// Release is balanced, never final (H4). The cache releases each target
+    /// exactly once — the one reference <see cref="ComPath.Resolve"/> handed
+    /// it. Every other holder of the same RCW (the runner mid-step, SwBridge's
+    /// probes) holds its own count, so an eviction never disconnects an object
+    /// someone else is still using. Callers must therefore never release a
+    /// target they got from <see cref="TryGet"/>; the runner's C2 conversion
+    /// already treats the invocation target as shared. Thread-safe; in
+    /// practice every caller is on the dispatcher thread.
+    /// </para>
+    /// </remarks>
+    public sealed class ComTargetCache
+    {
+        /// <summary>Documents kept before the least recently used one is released.</summary>
+        public const int Capacity = 16;
+
+        internal static readonly IReadOnlySet<string> StableSegments = new HashSet<string>(StringComparer.OrdinalIgnoreCase)
+        {
+            "Extension",
+            "FeatureManager",
+            "SketchManager",
+            "SelectionManager",
+            "ConfigurationManager",
+        };
+
+        private readonly object _lock = new();
+        private readonly Dictionary<object, DocumentTargets> _documents = new(ReferenceEqualityComparer.Instance);
+        private readonly Action<object> _release;
+        private long _clock;
+        private long _hits;
+        private long _misses;
+
+        public ComTargetCache()
+            : this(o => ComLifetime.Release(o))
+        {
+        }
+
+        // Tests substitute the release, to observe it without RCWs.
+        internal ComTargetCache(Action<object> release)
+        {
+            _release = release;
+        }
+
+        public long Hits => Interlocked.Read(ref _hits);
+
+        public long Misses => Interlocked.Read(ref _misses);
+
+        /// <summary>Number of documents with cached targets.</summary>
+        public int Count
+        {
+            get
+            {
+                lock (_lock)
+                {
+                    return _documents.Count;
+                }
+            }
+        }
+
+        /// <summary>True when <paramref name="path"/> names an object that lives as long as its document.</summary>
+        public static bool IsCacheable(string? path) =>
+            !string.IsNullOrWhiteSpace(path) && path.Split('.').All(StableSegments.Contains);
+
+        /// <summary>
+        /// Resolves <paramref name="path"/> from <paramref name="model"/>,
+        /// from the cache when possible. A failed resolve is returned as-is
+        /// and not cached. An uncacheable path is resolved every time, and
+        /// its value is the caller's, exactly as from <see cref="ComPath.Resolve"/>.
+        /// </summary>
+        public (bool Success, object? Value, string? FailedSegment, string? FailureDetail) Resolve(object model, string path)
+        {
+            if (TryGet(model, path, out var cached))
+            {
+                return (true, cached, null, null);
+            }
+
+            var result = ResolveUncached(model, path);
+            return result.Success && result.Value != null
+                ? result with { Value = Add(model, path, result.Value) }
+                : result;
+        }
+
+        /// <summary><see cref="ComPath.Resolve"/>, in <see cref="Resolve"/>'s shape — for roots that are not documents.</summary>
+        public static (bool Success, object? Value, string? FailedSegment, string? FailureDetail) ResolveUncached(object root, string path)
+        {
+            var result = ComPath.Resolve(root, path);
+            return (result.Success, result.Value, result.FailedSegment, result.FailureDetail);
+        }
+
+        /// <summary>Looks up a cached target, counting the lookup as a hit or a miss (uncacheable paths count as neither).</summary>
+        public bool TryGet(object model, string path, out object target)
+        {
+            target = null!;
+            if (!IsCacheable(path))
+            {
+                return false;
+            }
+
+            lock (_lock)
+            {
+                if (_documents.TryGetValue(model, out var doc) && doc.Targets.TryGetValue(path, out var value))
+                {
+                    doc.LastUsed = ++_clock;
+                    target = value;
+                    Interlocked.Increment(ref _hits);
+                    return true;
+                }
+            }
+
+            Interlocked.Increment(ref _misses);
+            return false;
+        }
+
+        /// <summary>
+        /// Caches <paramref name="target"/>, taking over the reference the
+        /// caller got for it, and returns what the caller should use from
+        /// now on. For an uncacheable path that is <paramref name="target"/>
+        /// itself, still the caller's. For a path already cached (another
+        /// resolve won) it is the cached object, and the caller's duplicate
+        /// reference is released.
+        /// </summary>
+        public object Add(object model, string path, object target)
+        {
+            if (!IsCacheable(path) || ReferenceEquals(target, model))
+            {
+                return target;
+            }
+
+            object cached;
+            var released = new List<object>();
+            lock (_lock)
+            {
+                if (!_documents.TryGetValue(model, out var doc))
+                {
+                    if (_documents.Count >= Capacity)
+                    {
+                        var oldest = _documents.MinBy(d => d.Value.LastUsed);
+                        _documents.Remove(oldest.Key);
+                        released.AddRange(oldest.Value.Targets.Values);
+                    }
+
+                    doc = new DocumentTargets();
+                    _documents[model] = doc;
+                }
+
+                doc.LastUsed = ++_clock;
+                if (!doc.Targets.TryAdd(path, target))
+                {
+                    released.Add(target);
+                }
+
+                cached = doc.Targets[path];
+            }
+
+            ReleaseAll(released);
+            return cached;
+        }
+
+        /// <summary>Releases and forgets everything cached for <paramref name="model"/>'s document.</summary>
+        public void Evict(object model)
+        {
+            List<object> released;
+            lock (_lock)
+            {
+                if (!_documents.Remove(model, out var doc))
+                {
+                    return;
+                }
+
+                released = doc.Targets.Values.ToList();
+            }
+
+            ReleaseAll(released);
+        }
+
+        /// <summary>Releases and forgets every document's targets — for when the connection to SolidWorks is lost.</summary>
+        public void Clear()
+        {
+            List<object> released;
+            lock (_lock)
+            {
+                released = _documents.Values.SelectMany(d => d.Targets.Values).ToList();
+                _documents.Clear();
+            }
+
+            ReleaseAll(released);
+        }
+
+        // Outside the lock: a release is a COM call, and on a disconnected
+        // server it is one that can fail — which must not take the cache's
+        // bookkeeping down with it.
+        private void ReleaseAll(List<object> targets)
+        {
+            foreach (var target in targets)
+            {
+                try
+                {
+                    _release(target);
+                }
+                catch (Exception ex) when (ex is COMException or InvalidComObjectException)
+                {
+                    // Already gone with its server; nothing left to release.
+                }
+            }
+        }
+
+        private sealed class DocumentTargets
+        {
+            public Dictionary<string, object> Targets { get; } = new(StringComparer.OrdinalIgnoreCase);
+
+            public long LastUsed { get; set; }
+        }
+    }
+}
@@ -0,0 +1,310 @@
+using System.Globalization;
+using System.Text.Json;
+using swmcp.server.Models;
+
+namespace swmcp.server.Services
+{
+    /// <summary>How a recipe's terminal member is invoked (<see cref="OperationRecipe.Kind"/>).</summary>
+    internal enum InvokeKind
+    {
+        Method,
+        PropertyGet,
+        PropertySet,
+        Unknown,
+    }
+
+    /// <summary>A param's <see cref="OperationParam.Type"/>, parsed.</summary>
+    internal enum ParamKind
+    {
+        Bool,
+        Int,
+        Double,
+        String,
+        Length,
+        Angle,
+        ComNull,
+        Unknown,
+    }
+
+    /// <summary>A <see cref="RequireCheck.Check"/>, parsed.</summary>
+    internal enum RequireKind
+    {
+        DocumentType,
+        InSketchMode,
+        NotInSketchMode,
+        SelectionCount,
+        SelectionType,
+        Unknown,
+    }
+
+    /// <summary>A <see cref="VerifyCheck.Check"/>, parsed.</summary>
+    internal enum VerifyKind
+    {
+        ReturnNotNull,
+        ReturnTrue,
+        ReturnEquals,
+        FeatureCountIncreased,
+        SketchSegmentCountIncreased,
+        SketchModeIs,
+        NoNewRebuildErrors,
+        Unknown,
+    }
+
+    /// <summary>A <see cref="ReturnsSpec.Type"/>, parsed.</summary>
+    internal enum ReturnKind
+    {
+        Void,
+        Bool,
+        Number,
+        String,
+        Feature,
+        SketchSegment,
+        SketchSegments,
+        Document,
+        Unknown,
+    }
+
+    /// <summary>Converts one param's raw JSON (null = not supplied, no default) to the value bound for COM.</summary>
+    internal delegate (object? Value, string? Error) ParamConverter(JsonElement? raw, bool requireUnit);
+
+    /// <summary>One declared param with its converter already chosen.</summary>
+    internal sealed record CompiledParam(OperationParam Param, ParamKind Kind, ParamConverter Convert);
+
+    /// <summary>
+    /// An <see cref="OperationRecipe"/> with everything <see cref="OperationRunner"/>
+    /// used to re-derive from it on every call worked out once: the
+    /// case-insensitive param-name index, each param's converter, and the
+    /// parsed <c>kind</c>, <c>requires</c>, <c>verify</c> and <c>returns</c>.
+    /// <see cref="OperationManager"/> compiles every recipe when the seed
+    /// loads and on <c>register_operation</c>; the runner only ever executes
+    /// the compiled form.
+    /// </summary>
+    /// <remarks>
+    /// Binding is the hottest path in the server — a vectorized step binds
+    /// hundreds of times per dispatch — and every bind used to copy the args
+    /// into a case-insensitive dictionary, build a <see cref="HashSet{T}"/> of
+    /// the declared names and lower-case each param type to switch on it.
+    /// None of that depends on the call. Immutable once built; the
+    /// <see cref="Recipe"/> it was compiled from is kept for its authored
+    /// data (names, defaults, descriptions) and for <c>describe_operation</c>.
+    /// An unrecognised value anywhere compiles to an <c>Unknown</c> member
+    /// rather than throwing, so a hand-edited seed fails the one call that
+    /// uses it, with the same message as before, not the whole load.
+    /// </remarks>
+    public sealed class CompiledRecipe
+    {
+        private CompiledRecipe(OperationRecipe recipe)
+        {
+            Recipe = recipe;
+            Params = recipe.Params.Select(p => new CompiledParam(p, ParseParam(p.Type), ConverterFor(p))).ToArray();
+
+            var index = new Dictionary<string, int>(StringComparer.OrdinalIgnoreCase);
+            for (var i = 0; i < Params.Count; i++)
+            {
+                index.TryAdd(Params[i].Param.Name, i);
+            }
+
+            ParamIndex = index;
+            DeclaredParamList = Params.Count > 0 ? string.Join(", ", Params.Select(p => p.Param.Name)) : "(none)";
+            Kind = ParseKind(recipe.Kind);
+            Requires = recipe.Requires.Select(r => (ParseRequire(r.Check), r)).ToArray();
+            Verify = recipe.Verify.Select(v => (ParseVerify(v.Check), v)).ToArray();
+            ReturnsType = recipe.Returns?.Type?.ToLowerInvariant() ?? "void";
+            Returns = ParseReturn(ReturnsType);
+
+            IsDocumentScoped = string.Equals(recipe.Scope, "document", StringComparison.OrdinalIgnoreCase);
+            IsNewPart = string.Equals(recipe.Scope, "application", StringComparison.OrdinalIgnoreCase) &&
+                        string.Equals(recipe.Member, "NewPart", StringComparison.OrdinalIgnoreCase);
+            RenamesDocument = IsDocumentScoped &&
+                              string.IsNullOrEmpty(recipe.Target) &&
+                              recipe.Member.StartsWith("SaveAs", StringComparison.OrdinalIgnoreCase);
+            IsSketchBulkInsert = IsDocumentScoped &&
+                                 string.Equals(recipe.Target, "SketchManager", StringComparison.OrdinalIgnoreCase) &&
+                                 string.Equals(recipe.Member, "BulkInsert", StringComparison.OrdinalIgnoreCase);
+            NeedsPreFeatureCount = Verify.Any(v => v.Kind == VerifyKind.FeatureCountIncreased);
+            NeedsPreSketchSegmentCount = Verify.Any(v => v.Kind == VerifyKind.SketchSegmentCountIncreased);
+        }
+
+        /// <summary>The authored recipe this was compiled from.</summary>
+        public OperationRecipe Recipe { get; }
+
+        public string Name => Recipe.Name;
+
+        internal string Target => Recipe.Target;
+
+        internal string Member => Recipe.Member;
+
+        internal IReadOnlyList<CompiledParam> Params { get; }
+
+        /// <summary>Declared param name → position, case-insensitively.</summary>
+        internal IReadOnlyDictionary<string, int> ParamIndex { get; }
+
+        /// <summary>"a, b, c" — quoted back in the unknown-argument refusal.</summary>
+        internal string DeclaredParamList { get; }
+
+        internal InvokeKind Kind { get; }
+
+        internal IReadOnlyList<(RequireKind Kind, RequireCheck Check)> Requires { get; }
+
+        internal IReadOnlyList<(VerifyKind Kind, VerifyCheck Check)> Verify { get; }
+
+        internal ReturnKind Returns { get; }
+
+        /// <summary>The declared <c>returns.type</c>, lower-cased — quoted back when a return is refused.</summary>
+        internal string ReturnsType { get; }
+
+        internal bool IsDocumentScoped { get; }
+
+        /// <summary><c>scope: "application"</c> + <c>member: "NewPart"</c> — the reserved combination behind <c>new_part</c>.</summary>
+        internal bool IsNewPart { get; }
+
+        /// <summary>
+        /// A document-root <c>SaveAs*</c> member (<c>save_as</c>): a successful
+        /// call gives the document a new title and path, so names resolved
+        /// before it may no longer match.
+        /// </summary>
+        internal bool RenamesDocument { get; }
+
+        /// <summary>A step that creates or renames a document, after which open-document lookups must be redone.</summary>
+        internal bool ChangesOpenDocuments => IsNewPart || RenamesDocument;
+
+        /// <summary>Document scope + <c>SketchManager</c> + <c>BulkInsert</c> — the reserved combination behind <c>sketch_bulk_insert</c>.</summary>
+        internal bool IsSketchBulkInsert { get; }
+
+        /// <summary>A <c>featureCountIncreased</c> check needs the pre-invoke feature count.</summary>
+        internal bool NeedsPreFeatureCount { get; }
+
+        /// <summary>A <c>sketchSegmentCountIncreased</c> check needs the pre-invoke segment count.</summary>
+        internal bool NeedsPreSketchSegmentCount { get; }
+
+        public static CompiledRecipe Compile(OperationRecipe recipe) => new(recipe);
+
+        internal static InvokeKind ParseKind(string? kind) => kind?.ToLowerInvariant() switch
+        {
+            "method" => InvokeKind.Method,
+            "propertyget" => InvokeKind.PropertyGet,
+            "propertyset" => InvokeKind.PropertySet,
+            _ => InvokeKind.Unknown,
+        };
+
+        internal static ParamKind ParseParam(string? type) => type?.ToLowerInvariant() switch
+        {
+            "bool" => ParamKind.Bool,
+            "int" or "enum" => ParamKind.Int,
+            "double" => ParamKind.Double,
+            "string" => ParamKind.String,
+            "length" => ParamKind.Length,
+            "angle" => ParamKind.Angle,
+            "comnull" => ParamKind.ComNull,
+            _ => ParamKind.Unknown,
+        };
+
+        internal static RequireKind ParseRequire(string? check) => check?.ToLowerInvariant() switch
+        {
+            "documenttype" => RequireKind.DocumentType,
+            "insketchmode" => RequireKind.InSketchMode,
+            "notinsketchmode" => RequireKind.NotInSketchMode,
+            "selectioncount" => RequireKind.SelectionCount,
+            "selectiontype" => RequireKind.SelectionType,
+            _ => RequireKind.Unknown,
+        };
+
+        internal static VerifyKind ParseVerify(string? check) => check?.ToLowerInvariant() switch
+        {
+            "returnnotnull" => VerifyKind.ReturnNotNull,
+            "returntrue" => VerifyKind.ReturnTrue,
+            "returnequals" => VerifyKind.ReturnEquals,
+            "featurecountincreased" => VerifyKind.FeatureCountIncreased,
+            "sketchsegmentcountincreased" => VerifyKind.SketchSegmentCountIncreased,
+            "sketchmodeis" => VerifyKind.SketchModeIs,
+            "nonewrebuilderrors" => VerifyKind.NoNewRebuildErrors,
+            _ => VerifyKind.Unknown,
+        };
+
+        internal static ReturnKind ParseReturn(string? type) => type?.ToLowerInvariant() switch
+        {
+            "void" => ReturnKind.Void,
+            "bool" => ReturnKind.Bool,
+            "number" => ReturnKind.Number,
+            "string" => ReturnKind.String,
+            "feature" => ReturnKind.Feature,
+            "sketchsegment" => ReturnKind.SketchSegment,
+            "sketchsegments" => ReturnKind.SketchSegments,
+            "document" => ReturnKind.Document,
+            _ => ReturnKind.Unknown,
+        };
+
+        // ------------------------------------------------------- converters
+
+        /// <summary>The converter for <paramref name="p"/>'s type, chosen once. <c>comNull</c> never reaches a converter — Bind binds it directly.</summary>
+        internal static ParamConverter ConverterFor(OperationParam p) => ParseParam(p.Type) switch
+        {
+            ParamKind.Bool => static (raw, _) => (raw.HasValue ? ToBool(raw.Value) : false, null),
+            ParamKind.Int => static (raw, _) => (raw.HasValue ? ToInt(raw.Value) : 0, null),
+            ParamKind.Double => static (raw, _) => (raw.HasValue ? ToDouble(raw.Value) : 0.0, null),
+            ParamKind.String => static (raw, _) => (raw.HasValue ? ToStringValue(raw.Value) : "", null),
+            ParamKind.Length => ConvertLength,
+            ParamKind.Angle => ConvertAngle,
+            _ => (_, _) => (null, $"Unknown parameter type '{p.Type}'."),
+        };
+
+        private static (object? Value, string? Error) ConvertLength(JsonElement? raw, bool requireUnit)
+        {
+            if (!raw.HasValue)
+            {
+                return (0.0, null);
+            }
+
+            if (!requireUnit && raw.Value.ValueKind == JsonValueKind.Number)
+            {
+                return (raw.Value.GetDouble(), null); // recipe-authored default: already canonical SI (meters)
+            }
+
+            return UnitParser.TryParseLength(raw.Value, out var meters, out var error)
+                ? (meters, (string?)null)
+                : ((object?)null, error);
+        }
+
+        private static (object? Value, string? Error) ConvertAngle(JsonElement? raw, bool requireUnit)
+        {
+            if (!raw.HasValue)
+            {
+                return (0.0, null);
+            }
+
+            if (!requireUnit && raw.Value.ValueKind == JsonValueKind.Number)
+            {
+                return (raw.Value.GetDouble(), null); // recipe-authored default: already canonical SI (radians)
+            }
+
+            return UnitParser.TryParseAngle(raw.Value, out var radians, out var error)
+                ? (radians, (string?)null)
+                : ((object?)null, error);
+        }
+
+        private static bool ToBool(JsonElement e) => e.ValueKind switch
+        {
+            JsonValueKind.True => true,
+            JsonValueKind.False => false,
+            JsonValueKind.String => bool.Parse(e.GetString() ?? "false"),
+            JsonValueKind.Number => e.GetDouble() != 0,
+            _ => throw new FormatException($"Cannot interpret JSON {e.ValueKind} as bool."),
+        };
+
+        private static int ToInt(JsonElement e) => e.ValueKind switch
+        {
+            JsonValueKind.Number => e.TryGetInt32(out var i) ? i : (int)e.GetDouble(),
+            JsonValueKind.String => int.Parse(e.GetString() ?? "0", CultureInfo.InvariantCulture),
+            _ => throw new FormatException($"Cannot interpret JSON {e.ValueKind} as int."),
+        };
+
+        private static double ToDouble(JsonElement e) => e.ValueKind switch
+        {
+            JsonValueKind.Number => e.GetDouble(),
+            JsonValueKind.String => double.Parse(e.GetString() ?? "0", CultureInfo.InvariantCulture),
+            _ => throw new FormatException($"Cannot interpret JSON {e.ValueKind} as double."),
+        };
+
+        private static string ToStringValue(JsonElement e) => e.ValueKind == JsonValueKind.String ? e.GetString() ?? "" : e.ToString();
+    }
+}
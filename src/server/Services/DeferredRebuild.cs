@@ -0,0 +1,165 @@
+using System.Runtime.InteropServices;
+using System.Text.Json;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Where a deferred rebuild (see <see cref="RebuildPolicy.Deferred"/>)
+    /// failed: the document, the first feature in its tree reporting an error,
+    /// and the index of the batch step whose return named that feature.
+    /// </summary>
+    /// <param name="Feature">Null when the rebuild failed but no feature reported an error code (or the tree could not be walked).</param>
+    /// <param name="ErrorCode">The feature's <c>swFeatureError_e</c> value.</param>
+    /// <param name="StepIndex">Null when no step's return named <paramref name="Feature"/> — e.g. the feature predates the batch.</param>
+    public sealed record RebuildFailure(string Document, string? Feature, int? ErrorCode, int? StepIndex);
+
+    /// <summary>
+    /// The <c>noNewRebuildErrors</c> checks a <see cref="RebuildPolicy.Deferred"/>
+    /// batch did not run per step: <see cref="StepProbes"/> hands each one's
+    /// document here instead of forcing <c>EditRebuild3</c>, and
+    /// <see cref="Run"/> rebuilds every such document once, after the last step.
+    /// </summary>
+    /// <remarks>
+    /// A 20-feature plan whose recipes all declare <c>noNewRebuildErrors</c>
+    /// used to pay for 20 full rebuilds; this pays for one per document. The
+    /// price is locality: a failure is found at the end of the batch, not at
+    /// the step that caused it — which is why <see cref="Run"/> walks the
+    /// tree for the earliest feature in error and maps it back to the step
+    /// whose <c>return.name</c> is that feature. Lives for one batch on the
+    /// dispatcher thread — never shared.
+    /// </remarks>
+    internal sealed class DeferredRebuild
+    {
+        private readonly List<SwDocument> _pending = new();
+
+        /// <summary>True once any step deferred a check.</summary>
+        public bool HasPending => _pending.Count > 0;
+
+        public void Defer(SwDocument document)
+        {
+            if (!_pending.Contains(document))
+            {
+                _pending.Add(document);
+            }
+        }
+
+        /// <summary>
+        /// Rebuilds every deferred document once, in the order they were first
+        /// deferred, and reports the first one that fails (null when all
+        /// rebuild cleanly). <paramref name="results"/> are the batch's step
+        /// results so far, used to attribute the failing feature.
+        /// </summary>
+        public RebuildFailure? Run(IReadOnlyList<OperationResult> results)
+        {
+            foreach (var doc in _pending)
+            {
+                if (DocumentStateProbes.RebuildSucceeded(doc.Model))
+                {
+                    continue;
+                }
+
+                var (feature, errorCode) = FirstFeatureInError(doc.Model);
+                return new RebuildFailure(
+                    doc.Info.Title, feature, errorCode, feature == null ? null : FindCreatingStep(feature, results));
+            }
+
+            return null;
+        }
+
+        /// <summary>
+        /// Index of the last step whose return names <paramref name="featureName"/>
+        /// — a feature DTO's <c>name</c>, or any item's <c>return.name</c> for a
+        /// vectorized step. The last one wins: a later step that recreated a
+        /// feature under the same name is the one that produced what is now in
+        /// the tree.
+        /// </summary>
+        internal static int? FindCreatingStep(string featureName, IReadOnlyList<OperationResult> results)
+        {
+            for (var i = results.Count - 1; i >= 0; i--)
+            {
+                if (results[i].Return == null)
+                {
+                    continue;
+                }
+
+                var ret = JsonSerializer.SerializeToElement(results[i].Return);
+                if (Names(ret, featureName) ||
+                    (TryGetPropertyIgnoreCase(ret, "items", out var items) && items.ValueKind == JsonValueKind.Array &&
+                     items.EnumerateArray().Any(item => TryGetPropertyIgnoreCase(item, "return", out var itemReturn) && Names(itemReturn, featureName))))
+                {
+                    return i;
+                }
+            }
+
+            return null;
+        }
+
+        private static bool Names(JsonElement value, string featureName) =>
+            TryGetPropertyIgnoreCase(value, "name", out var name) &&
+            name.ValueKind == JsonValueKind.String &&
+            string.Equals(name.GetString(), featureName, StringComparison.OrdinalIgnoreCase);
+
+        private static bool TryGetPropertyIgnoreCase(JsonElement obj, string name, out JsonElement value)
+        {
+            if (obj.ValueKind == JsonValueKind.Object)
+            {
+                foreach (var property in obj.EnumerateObject())
+                {
+                    if (string.Equals(property.Name, name, StringComparison.OrdinalIgnoreCase))
+                    {
+                        value = property.Value;
+                        return true;
+                    }
+                }
+            }
+
+            value = default;
+            return false;
+        }
+
+        // Tree order is rebuild order, so the first feature reporting an error
+        // is the root cause; later ones are usually its dependents. Uses the
+        // plain GetErrorCode: GetErrorCode2's ByRef isWarning output cannot be
+        // marshalled through a plain late-bound call (the same limitation
+        // SolidWorksTool works around for materials). Every feature RCW the
+        // walk obtains is released before moving on (C2).
+        private static (string? Feature, int? ErrorCode) FirstFeatureInError(object model)
+        {
+            try
+            {
+                var first = DispatchInvoker.InvokeMethod(model, "FirstFeature", Array.Empty<object?>());
+                var feature = first.Success ? first.Value : null;
+                while (feature != null)
+                {
+                    object? next;
+                    try
+                    {
+                        var code = DispatchInvoker.InvokeMethod(feature, "GetErrorCode", Array.Empty<object?>());
+                        if (code is { Success: true, Value: int errorCode } && errorCode != 0)
+                        {
+                            var name = DispatchInvoker.GetProperty(feature, "Name");
+                            return (name.Success ? name.Value as string : null, errorCode);
+                        }
+
+                        var nextOutcome = DispatchInvoker.InvokeMethod(feature, "GetNextFeature", Array.Empty<object?>());
+                        next = nextOutcome.Success ? nextOutcome.Value : null;
+                    }
+                    finally
+                    {
+                        ComLifetime.Release(feature);
+                    }
+
+                    feature = next;
+                }
+            }
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
+            {
+                // Attribution is best-effort; the rebuild failure itself is
+                // still reported.
+            }
+
+            return (null, null);
+        }
+    }
+}
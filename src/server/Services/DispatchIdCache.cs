@@ -0,0 +1,75 @@
+using System.Collections.Concurrent;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Process-wide (COM type, member name) → DISPID table behind
+    /// <see cref="DispatchInvoker"/>. A COM type's DISPIDs are fixed by its
+    /// type library, so once <c>IDispatch::GetIDsOfNames</c> has answered for
+    /// <c>IFeatureManager.FeatureExtrusion3</c> on one object it has answered
+    /// for every object of that type, for the life of the SolidWorks process.
+    /// </summary>
+    /// <remarks>
+    /// "For the life of the SolidWorks process" is the catch: a SolidWorks
+    /// restart (or an upgrade between sessions) can renumber a member. An
+    /// entry is therefore only ever a hint — a call that fails with
+    /// <c>DISP_E_MEMBERNOTFOUND</c> on a cached DISPID goes through
+    /// <see cref="Invalidate"/> and is retried by name, never reported as the
+    /// member's failure. Member names compare case-insensitively, as
+    /// <c>GetIDsOfNames</c> does. Thread-safe; in practice every caller is on
+    /// the dispatcher thread.
+    /// </remarks>
+    internal sealed class DispatchIdCache
+    {
+        private readonly ConcurrentDictionary<(Guid Type, string Member), int> _ids = new(KeyComparer.Instance);
+        private long _hits;
+        private long _misses;
+        private long _invalidations;
+
+        /// <summary>The table every <see cref="DispatchInvoker"/> call shares.</summary>
+        public static DispatchIdCache Shared { get; } = new();
+
+        public long Hits => Interlocked.Read(ref _hits);
+
+        public long Misses => Interlocked.Read(ref _misses);
+
+        public long Invalidations => Interlocked.Read(ref _invalidations);
+
+        public int Count => _ids.Count;
+
+        /// <summary>Looks up a cached DISPID, counting the lookup as a hit or a miss.</summary>
+        public bool TryGet(Guid type, string member, out int dispId)
+        {
+            if (_ids.TryGetValue((type, member), out dispId))
+            {
+                Interlocked.Increment(ref _hits);
+                return true;
+            }
+
+            Interlocked.Increment(ref _misses);
+            return false;
+        }
+
+        public void Add(Guid type, string member, int dispId) => _ids[(type, member)] = dispId;
+
+        /// <summary>Drops an entry that turned out to be stale; the next call resolves the name afresh.</summary>
+        public void Invalidate(Guid type, string member)
+        {
+            if (_ids.TryRemove((type, member), out _))
+            {
+                Interlocked.Increment(ref _invalidations);
+            }
+        }
+
+        private sealed class KeyComparer : IEqualityComparer<(Guid Type, string Member)>
+        {
+            public static readonly KeyComparer Instance = new();
+
+            public bool Equals((Guid Type, string Member) x, (Guid Type, string Member) y) =>
+                x.Type == y.Type && string.Equals(x.Member, y.Member, StringComparison.OrdinalIgnoreCase);
+
+            public int GetHashCode((Guid Type, string Member) key) =>
+                HashCode.Combine(key.Type, StringComparer.OrdinalIgnoreCase.GetHashCode(key.Member));
+        }
+    }
+}
@@ -0,0 +1,210 @@
+using System.Reflection;
+using System.Runtime.CompilerServices;
+using System.Runtime.InteropServices;
+using System.Runtime.InteropServices.ComTypes;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Drop-in for <see cref="ComInvoker"/>'s three calls on the runner's hot
+    /// paths, minus the per-call <c>IDispatch::GetIDsOfNames</c>: the member's
+    /// DISPID comes from <see cref="DispatchIdCache"/> and the call goes
+    /// straight to <c>Invoke</c> (through <see cref="Type.InvokeMember(string, BindingFlags, Binder, object, object[])"/>'s
+    /// <c>[DISPID=n]</c> form). Every call is a cross-process round trip to
+    /// SolidWorks, so a <c>sketch_bulk_insert</c> of 500 lines, or a vectorized
+    /// step, or the deferred-rebuild feature walk, saves one round trip per
+    /// invocation after the first.
+    /// </summary>
+    /// <remarks>
+    /// The COM type is identified by its <c>ITypeInfo</c> GUID, read once per
+    /// RCW and remembered for that RCW's lifetime — so a target reused across
+    /// a vectorized step pays for it once. Anything that cannot be identified
+    /// (no type info, not an <c>IDispatch</c>) is simply handed to
+    /// <see cref="ComInvoker"/>: the cache is an optimization and never
+    /// changes what a call does. A cached DISPID that the object no longer
+    /// recognises is invalidated and the call retried once by name.
+    /// Failures come back as <see cref="InvokeOutcome.Fail"/>, like
+    /// <see cref="ComInvoker"/>'s; nothing throws. Dispatcher-thread only.
+    /// </remarks>
+    internal static class DispatchInvoker
+    {
+        private const int DispEMemberNotFound = unchecked((int)0x80020003);
+        private const int DispEUnknownName = unchecked((int)0x80020006);
+        private const int LocaleSystemDefault = 0x0800;
+
+        // Empty Guid = "could not be identified", remembered too, so an
+        // unidentifiable object does not retry GetTypeInfo on every call.
+        private static readonly ConditionalWeakTable<object, StrongBox<Guid>> TypeIds = new();
+
+        // Each call's round trip is recorded under its member name in
+        // ServerMetrics.ComCalls, cached DISPID or not.
+        public static InvokeOutcome InvokeMethod(object target, string member, object?[] args)
+        {
+            using var timing = ServerMetrics.ComCalls.Time(member);
+            return Invoke(target, member, BindingFlags.InvokeMethod, args) ?? ComInvoker.InvokeMethod(target, member, args);
+        }
+
+        public static InvokeOutcome GetProperty(object target, string member)
+        {
+            using var timing = ServerMetrics.ComCalls.Time(member);
+            return Invoke(target, member, BindingFlags.GetProperty, Array.Empty<object?>()) ?? ComInvoker.GetProperty(target, member);
+        }
+
+        // ComPropertyReader.TryGetMember's call: one member read that may be a
+        // property or a method (GetEdgeCount), so it is invoked as either,
+        // the way a late-bound caller that cannot tell them apart would.
+        public static InvokeOutcome GetMember(object target, string member, object?[] args)
+        {
+            using var timing = ServerMetrics.ComCalls.Time(member);
+            return Invoke(target, member, BindingFlags.InvokeMethod | BindingFlags.GetProperty, args)
+                ?? (ComPropertyReader.TryGetMember(target, member, args, out var value)
+                    ? InvokeOutcome.Ok(value)
+                    : InvokeOutcome.Fail($"{member} could not be read."));
+        }
+
+        public static InvokeOutcome SetProperty(object target, string member, object? value)
+        {
+            using var timing = ServerMetrics.ComCalls.Time(member);
+            return Invoke(target, member, BindingFlags.SetProperty, new[] { value }) ?? ComInvoker.SetProperty(target, member, value);
+        }
+
+        /// <summary>
+        /// True when <paramref name="target"/>'s <c>IDispatch</c> answers
+        /// <c>GetIDsOfNames</c> for <paramref name="member"/> with
+        /// <c>DISP_E_UNKNOWNNAME</c> or <c>DISP_E_MEMBERNOTFOUND</c> — the
+        /// name is wrong, not the call. False for a known member, and for an
+        /// object that cannot be asked. One round trip; meant for after a
+        /// failed call, to tell the two apart.
+        /// </summary>
+        public static bool IsUnknownMember(object target, string member)
+        {
+            if (!Marshal.IsComObject(target) || target is not IDispatchIds dispatch)
+            {
+                return false;
+            }
+
+            try
+            {
+                var iid = Guid.Empty;
+                var hr = dispatch.GetIDsOfNames(ref iid, new[] { member }, 1, LocaleSystemDefault, new int[1]);
+                return hr is DispEUnknownName or DispEMemberNotFound;
+            }
+            catch (Exception ex) when (ex is COMException or InvalidComObjectException)
+            {
+                return false;
+            }
+        }
+
+        // Null means "not cacheable — use ComInvoker".
+        private static InvokeOutcome? Invoke(object target, string member, BindingFlags flags, object?[] args)
+        {
+            if (!Marshal.IsComObject(target) || target is not IDispatchIds dispatch)
+            {
+                return null;
+            }
+
+            var type = TypeIds.GetValue(target, _ => new StrongBox<Guid>(TypeIdOf(dispatch))).Value;
+            if (type == Guid.Empty)
+            {
+                return null;
+            }
+
+            var cache = DispatchIdCache.Shared;
+            var cached = cache.TryGet(type, member, out var dispId);
+
+            // A name the object does not know is ComInvoker's to report, in
+            // its own words.
+            if (!cached && !TryGetDispId(dispatch, member, out dispId))
+            {
+                return null;
+            }
+
+            if (!cached)
+            {
+                cache.Add(type, member, dispId);
+            }
+
+            try
+            {
+                return InvokeOutcome.Ok(target.GetType().InvokeMember($"[DISPID={dispId}]", flags, null, target, args));
+            }
+            catch (Exception ex) when (Unwrap(ex) is COMException { ErrorCode: DispEMemberNotFound or DispEUnknownName } && cached)
+            {
+                cache.Invalidate(type, member);
+                return Invoke(target, member, flags, args);
+            }
+            catch (Exception ex) when (ex is TargetInvocationException or COMException or InvalidComObjectException or
+                                           MissingMethodException or ArgumentException)
+            {
+                var inner = Unwrap(ex);
+                var hresult = inner is COMException com ? $" (0x{com.ErrorCode:X8})" : "";
+                return InvokeOutcome.Fail($"{inner.GetType().Name}{hresult}: {inner.Message}");
+            }
+        }
+
+        private static Exception Unwrap(Exception ex) => ex is TargetInvocationException { InnerException: { } inner } ? inner : ex;
+
+        private static bool TryGetDispId(IDispatchIds dispatch, string member, out int dispId)
+        {
+            var ids = new int[1];
+            var iid = Guid.Empty;
+            var hr = dispatch.GetIDsOfNames(ref iid, new[] { member }, 1, LocaleSystemDefault, ids);
+            dispId = ids[0];
+            return hr == 0;
+        }
+
+        private static Guid TypeIdOf(IDispatchIds dispatch)
+        {
+            ITypeInfo? typeInfo = null;
+            try
+            {
+                if (dispatch.GetTypeInfo(0, LocaleSystemDefault, out typeInfo) != 0 || typeInfo == null)
+                {
+                    return Guid.Empty;
+                }
+
+                typeInfo.GetTypeAttr(out var attrPointer);
+                try
+                {
+                    return Marshal.PtrToStructure<TYPEATTR>(attrPointer).guid;
+                }
+                finally
+                {
+                    typeInfo.ReleaseTypeAttr(attrPointer);
+                }
+            }
+            catch (Exception ex) when (ex is COMException or InvalidComObjectException)
+            {
+                return Guid.Empty;
+            }
+            finally
+            {
+                ComLifetime.Release(typeInfo);
+            }
+        }
+
+        // The first three IDispatch slots; Invoke itself goes through the
+        // runtime's own IDispatch marshalling (Type.InvokeMember), so it is
+        // not declared here.
+        [ComImport]
+        [Guid("00020400-0000-0000-C000-000000000046")]
+        [InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
+        private interface IDispatchIds
+        {
+            [PreserveSig]
+            int GetTypeInfoCount(out int count);
+
+            [PreserveSig]
+            int GetTypeInfo(int index, int lcid, out ITypeInfo? typeInfo);
+
+            [PreserveSig]
+            int GetIDsOfNames(
+                ref Guid riid,
+                [MarshalAs(UnmanagedType.LPArray, ArraySubType = UnmanagedType.LPWStr)] string[] names,
+                int count,
+                int lcid,
+                [MarshalAs(UnmanagedType.LPArray)] int[] dispIds);
+        }
+    }
+}
@@ -0,0 +1,341 @@
+using System.Diagnostics;
+
+namespace swmcp.server.Services
+{
+    /// <summary>Which queue a <see cref="DispatchScheduler"/> request waits in; lower values go first.</summary>
+    public enum DispatchPriority
+    {
+        /// <summary>Interactive reads: <c>get_part_info</c>, <c>get_document_state</c>, …</summary>
+        Read,
+
+        /// <summary>Interactive writes: <c>run_operation</c>, <c>run_operations</c>.</summary>
+        Write,
+
+        /// <summary><c>submit_operations</c> jobs.</summary>
+        Background,
+    }
+
+    /// <summary>
+    /// Admission control and ordering in front of SwBridge's
+    /// <see cref="SwBridge.SwDispatcher"/>. The dispatcher runs one unit of
+    /// work at a time, first come first served, and queues without bound —
+    /// so a <c>get_document_state</c> arriving behind three queued batches
+    /// waited for all three, and a flood of requests was only ever answered
+    /// by each one timing out after 120s. Every tool that reaches SolidWorks
+    /// now takes a <see cref="DispatchTicket"/> first and holds it for the
+    /// length of its work; only the holder talks to the dispatcher.
+    /// </summary>
+    /// <remarks>
+    /// Waiting tickets are granted by <see cref="DispatchPriority"/> — reads,
+    /// then writes, then background jobs — and, within a priority, round-robin
+    /// across sources, so one source's backlog cannot starve another's. Work
+    /// already holding the dispatcher is never preempted: a read still waits
+    /// for a running batch, just not for the ones queued behind it. Once
+    /// <see cref="MaxQueueDepth"/> interactive tickets are waiting,
+    /// <see cref="TryEnter"/> refuses outright, and the tool answers with a
+    /// structured busy response instead of a timeout. Queued jobs count
+    /// against their own limit, <see cref="MaxQueuedJobs"/>, never against
+    /// interactive admission — a backlog of <c>submit_operations</c> must not
+    /// turn every <c>get_part_info</c> into "busy".
+    /// <para>
+    /// A dispatch that times out (<see cref="SwBridge.SwDispatchTimeoutException"/>)
+    /// releases its ticket while SolidWorks may still be running the work;
+    /// the next holder then waits inside the dispatcher, exactly as every
+    /// request did before this gate existed.
+    /// </para>
+    /// </remarks>
+    public sealed class DispatchScheduler
+    {
+        /// <summary>Interactive (read and write) tickets allowed to wait before new requests are refused as busy.</summary>
+        public const int MaxQueueDepth = 16;
+
+        /// <summary>Background (job) tickets allowed to wait before new submissions are refused as busy.</summary>
+        public const int MaxQueuedJobs = 32;
+
+        /// <summary>The source every interactive request queues under; jobs queue under their job id.</summary>
+        public const string Requests = "requests";
+
+        private readonly object _lock = new();
+        private readonly int _maxQueueDepth;
+        private readonly int _maxQueuedJobs;
+        private readonly Waiters[] _queues;
+        private DispatchTicket? _holder;
+        private int _waiting;
+        private int _waitingJobs;
+        private long _admitted;
+        private long _rejected;
+
+        public DispatchScheduler()
+            : this(MaxQueueDepth, MaxQueuedJobs)
+        {
+        }
+
+        // Tests use shallow queues, to reach the limits in a few tickets.
+        internal DispatchScheduler(int maxQueueDepth, int maxQueuedJobs = MaxQueuedJobs)
+        {
+            _maxQueueDepth = maxQueueDepth;
+            _maxQueuedJobs = maxQueuedJobs;
+            _queues = Enum.GetValues<DispatchPriority>().Select(_ => new Waiters()).ToArray();
+        }
+
+        /// <summary>Tickets currently waiting for the dispatcher, jobs included.</summary>
+        public int QueueDepth
+        {
+            get
+            {
+                lock (_lock)
+                {
+                    return _waiting;
+                }
+            }
+        }
+
+        /// <summary>Tickets handed out.</summary>
+        public long Admitted => Interlocked.Read(ref _admitted);
+
+        /// <summary>Requests refused because their queue was full.</summary>
+        public long Rejected => Interlocked.Read(ref _rejected);
+
+        /// <summary>Each granted ticket's wait, from <see cref="TryEnter"/> to its grant; zero when the dispatcher was idle.</summary>
+        public LatencyHistogram WaitTimes { get; } = new();
+
+        /// <summary>
+        /// A ticket in <paramref name="priority"/>'s queue under
+        /// <paramref name="source"/> — already granted when nothing holds or
+        /// waits for the dispatcher — or null when the queue is full.
+        /// </summary>
+        public DispatchTicket? TryEnter(DispatchPriority priority, string source)
+        {
+            lock (_lock)
+            {
+                var background = priority == DispatchPriority.Background;
+                if (background ? _waitingJobs >= _maxQueuedJobs : _waiting - _waitingJobs >= _maxQueueDepth)
+                {
+                    Interlocked.Increment(ref _rejected);
+                    return null;
+                }
+
+                Interlocked.Increment(ref _admitted);
+                var ticket = new DispatchTicket(this, priority, source);
+                if (_holder == null)
+                {
+                    Grant(ticket);
+                }
+                else
+                {
+                    _queues[(int)priority].Add(ticket);
+                    Count(priority, +1);
+                }
+
+                return ticket;
+            }
+        }
+
+        /// <summary>
+        /// <see cref="TryEnter"/>, then waits up to <paramref name="timeout"/>
+        /// for the ticket. Null, with <paramref name="refusal"/> saying why,
+        /// when the queue was full, the wait ran out, or
+        /// <paramref name="cancellationToken"/> was cancelled first.
+        /// </summary>
+        public DispatchTicket? Admit(
+            DispatchPriority priority, string source, TimeSpan timeout, out string? refusal,
+            CancellationToken cancellationToken = default)
+        {
+            var ticket = TryEnter(priority, source);
+            if (ticket == null)
+            {
+                refusal = priority == DispatchPriority.Background
+                    ? $"SolidWorks is busy: {_maxQueuedJobs} jobs are already queued for it. Retry shortly."
+                    : $"SolidWorks is busy: {_maxQueueDepth} requests are already waiting for it. Retry shortly.";
+                return null;
+            }
+
+            if (!ticket.Wait(timeout, cancellationToken))
+            {
+                ticket.Dispose();
+                refusal = cancellationToken.IsCancellationRequested
+                    ? "Cancelled while waiting for SolidWorks; nothing ran."
+                    : $"SolidWorks is busy: this request waited {timeout.TotalSeconds:0}s for it without getting a turn. Retry shortly.";
+                return null;
+            }
+
+            refusal = null;
+            return ticket;
+        }
+
+        // Called by a ticket leaving: the holder frees the dispatcher for the
+        // next one, a waiter just leaves its queue.
+        internal void Leave(DispatchTicket ticket)
+        {
+            lock (_lock)
+            {
+                if (ReferenceEquals(_holder, ticket))
+                {
+                    _holder = null;
+                    GrantNext();
+                }
+                else if (_queues[(int)ticket.Priority].Remove(ticket))
+                {
+                    Count(ticket.Priority, -1);
+                }
+            }
+        }
+
+        private void GrantNext()
+        {
+            foreach (var queue in _queues)
+            {
+                if (queue.Take() is { } next)
+                {
+                    Count(next.Priority, -1);
+                    Grant(next);
+                    return;
+                }
+            }
+        }
+
+        private void Count(DispatchPriority priority, int delta)
+        {
+            _waiting += delta;
+            if (priority == DispatchPriority.Background)
+            {
+                _waitingJobs += delta;
+            }
+        }
+
+        private void Grant(DispatchTicket ticket)
+        {
+            _holder = ticket;
+            ticket.Signal();
+            WaitTimes.Record(ticket.QueueWaitTicks);
+        }
+
+        // One priority's waiters: a FIFO per source, the sources served in
+        // turn. Guarded by the scheduler's lock.
+        private sealed class Waiters
+        {
+            private readonly LinkedList<string> _turns = new();
+            private readonly Dictionary<string, LinkedList<DispatchTicket>> _bySource = new(StringComparer.Ordinal);
+
+            public void Add(DispatchTicket ticket)
+            {
+                if (!_bySource.TryGetValue(ticket.Source, out var tickets))
+                {
+                    _bySource[ticket.Source] = tickets = new LinkedList<DispatchTicket>();
+                    _turns.AddLast(ticket.Source);
+                }
+
+                tickets.AddLast(ticket);
+            }
+
+            public DispatchTicket? Take()
+            {
+                if (_turns.First is not { } turn)
+                {
+                    return null;
+                }
+
+                var tickets = _bySource[turn.Value];
+                var ticket = tickets.First!.Value;
+                tickets.RemoveFirst();
+                _turns.RemoveFirst();
+                if (tickets.Count == 0)
+                {
+                    _bySource.Remove(turn.Value);
+                }
+                else
+                {
+                    _turns.AddLast(turn.Value);
+                }
+
+                return ticket;
+            }
+
+            public bool Remove(DispatchTicket ticket)
+            {
+                if (!_bySource.TryGetValue(ticket.Source, out var tickets) || !tickets.Remove(ticket))
+                {
+                    return false;
+                }
+
+                if (tickets.Count == 0)
+                {
+                    _bySource.Remove(ticket.Source);
+                    _turns.Remove(ticket.Source);
+                }
+
+                return true;
+            }
+        }
+    }
+
+    /// <summary>
+    /// One request's place in the <see cref="DispatchScheduler"/>: waiting
+    /// until <see cref="Wait"/> returns true, then holding the dispatcher
+    /// until disposed. Disposing a ticket that is still waiting gives up its
+    /// place.
+    /// </summary>
+    public sealed class DispatchTicket : IDisposable
+    {
+        private readonly DispatchScheduler _scheduler;
+        private readonly ManualResetEventSlim _granted = new();
+        private readonly long _requestedAt = Stopwatch.GetTimestamp();
+        private volatile bool _isGranted;
+        private long _grantedAt;
+        private int _disposed;
+
+        internal DispatchTicket(DispatchScheduler scheduler, DispatchPriority priority, string source)
+        {
+            _scheduler = scheduler;
+            Priority = priority;
+            Source = source;
+        }
+
+        public DispatchPriority Priority { get; }
+
+        public string Source { get; }
+
+        /// <summary>True once this ticket holds the dispatcher.</summary>
+        public bool IsGranted => _isGranted;
+
+        /// <summary>How long the ticket queued before it was granted; so far, while it is still waiting.</summary>
+        public TimeSpan QueueWait => TimeSpan.FromMilliseconds(LatencyHistogram.ToMs(QueueWaitTicks));
+
+        internal long QueueWaitTicks => (_isGranted ? Interlocked.Read(ref _grantedAt) : Stopwatch.GetTimestamp()) - _requestedAt;
+
+        /// <summary>
+        /// Waits for the dispatcher; false when <paramref name="timeout"/>
+        /// ran out or <paramref name="cancellationToken"/> was cancelled first.
+        /// The ticket must be disposed either way.
+        /// </summary>
+        public bool Wait(TimeSpan timeout, CancellationToken cancellationToken = default)
+        {
+            try
+            {
+                return _granted.Wait(timeout, cancellationToken);
+            }
+            catch (OperationCanceledException)
+            {
+                return false;
+            }
+        }
+
+        public void Dispose()
+        {
+            if (Interlocked.Exchange(ref _disposed, 1) == 0)
+            {
+                // Leave takes the scheduler's lock, so once it returns
+                // nothing can signal this ticket any more.
+                _scheduler.Leave(this);
+                _granted.Dispose();
+            }
+        }
+
+        internal void Signal()
+        {
+            Interlocked.Exchange(ref _grantedAt, Stopwatch.GetTimestamp());
+            _isGranted = true;
+            _granted.Set();
+        }
+    }
+}
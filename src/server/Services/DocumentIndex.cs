@@ -0,0 +1,327 @@
+using System.Collections.Concurrent;
+using System.Diagnostics;
+using System.Runtime.InteropServices;
+using SolidWorks.Interop.sldworks;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Server-side index of the open documents by title, file name and full
+    /// path — what every tool resolves a <c>documentName</c> against, and what
+    /// <c>list_open_documents</c> and the "Open documents: …" part of every
+    /// no-match error read. <see cref="DocumentManager.Resolve"/> and
+    /// <see cref="DocumentManager.ListOpenDocuments"/> enumerate every open
+    /// document and read its title and path on each call; with 40 documents
+    /// open, that was paid on every request, sometimes twice (once to miss,
+    /// once more to build the error message).
+    /// </summary>
+    /// <remarks>
+    /// The index is rebuilt — one <see cref="DocumentManager.GetOpenDocuments"/>
+    /// enumeration — only when it is stale: SolidWorks' open, new, load and
+    /// close notifications mark it so, and as a fallback for changes no
+    /// notification reports (a <c>save_as</c> renaming a document, an event
+    /// lost to a busy SolidWorks) it is never trusted for longer than
+    /// <see cref="MaxAge"/>. If the notifications cannot be subscribed at all,
+    /// the index is rebuilt on every call, which is exactly the old cost.
+    /// <para>
+    /// Only an unambiguous hit is answered from the index. A miss, or a name
+    /// matching several documents, goes to <see cref="DocumentManager.Resolve"/>,
+    /// which stays the authority: the index can cost a lookup, never change
+    /// its answer (or the ambiguous-match error). A miss that
+    /// <see cref="DocumentManager.Resolve"/> does find means the index is
+    /// behind, and marks it stale.
+    /// </para>
+    /// <para>
+    /// A close notification also evicts the document's <see cref="ComTargetCache"/>
+    /// entries, and attaching to a new SolidWorks instance (after a restart)
+    /// clears that cache outright — both being the moments its targets die.
+    /// The notification itself only records the closed name: the eviction
+    /// happens at the next rebuild, under the index's lock and on the
+    /// dispatcher thread, so it never races a step still using those targets
+    /// or a rebuild swapping the snapshot it looks the name up in.
+    /// </para>
+    /// <para>
+    /// Every member but <see cref="Invalidate"/> must run on the dispatcher
+    /// thread (ADR 0003): the snapshot rebuild reads each document's info,
+    /// attaching subscribes to the notifications on the application object,
+    /// and eviction releases cached targets. The runner calls it inside its
+    /// own dispatch; the tools wrap their lookups in a call to
+    /// <see cref="SwConnection.Dispatcher"/>.
+    /// </para>
+    /// </remarks>
+    public sealed class DocumentIndex : IDisposable
+    {
+        /// <summary>Longest an index is used without a rebuild, notifications or not.</summary>
+        public static readonly TimeSpan MaxAge = TimeSpan.FromSeconds(5);
+
+        private readonly SwConnection _connection;
+        private readonly DocumentManager _documents;
+        private readonly ComTargetCache _targets;
+        private readonly DocumentRevisions _revisions;
+        private readonly object _lock = new();
+        private readonly ConcurrentQueue<string> _closed = new();
+        private Snapshot? _snapshot;
+        private volatile bool _stale = true;
+        private SldWorks? _app;
+        private bool _subscribed;
+
+        public DocumentIndex(SwConnection connection, DocumentManager documents, ComTargetCache targets, DocumentRevisions revisions)
+        {
+            _connection = connection;
+            _documents = documents;
+            _targets = targets;
+            _revisions = revisions;
+        }
+
+        /// <summary>
+        /// The open document <paramref name="name"/> (title, file name or full
+        /// path, case-insensitive) names, or null. Throws
+        /// <see cref="SwBridgeException"/> exactly when
+        /// <see cref="DocumentManager.Resolve"/> would.
+        /// </summary>
+        public SwDocument? Resolve(string name)
+        {
+            var matches = Current().Lookup(name);
+            if (matches.Count == 1)
+            {
+                return matches[0];
+            }
+
+            var resolved = _documents.Resolve(name);
+            if (resolved != null && matches.Count == 0)
+            {
+                _stale = true;
+            }
+
+            return resolved;
+        }
+
+        /// <summary>Every open document, in SolidWorks' order.</summary>
+        public IReadOnlyList<SwDocument> GetOpenDocuments() => Current().Documents;
+
+        /// <summary>Title, path and type of every open document, as captured when the index was built.</summary>
+        public IReadOnlyList<DocumentInfo> ListOpenDocuments() => Current().Infos;
+
+        /// <summary>Forces a rebuild on next use — for callers that just opened or closed a document themselves.</summary>
+        public void Invalidate() => _stale = true;
+
+        public void Dispose()
+        {
+            lock (_lock)
+            {
+                Unsubscribe();
+            }
+        }
+
+        private Snapshot Current()
+        {
+            Attach();
+            var snapshot = _snapshot;
+            if (IsFresh(snapshot))
+            {
+                return snapshot!;
+            }
+
+            lock (_lock)
+            {
+                EvictClosed();
+
+                // Another caller may have rebuilt it while this one waited.
+                snapshot = _snapshot;
+                if (IsFresh(snapshot))
+                {
+                    return snapshot!;
+                }
+
+                // Cleared before enumerating, so a notification arriving
+                // mid-enumeration leaves the new snapshot already stale.
+                _stale = false;
+                snapshot = new Snapshot(_documents.GetOpenDocuments(), Stopwatch.GetTimestamp());
+                _snapshot = snapshot;
+                return snapshot;
+            }
+        }
+
+        // Looked up in the snapshot from before the close — the last one that
+        // still lists the document. Called under _lock.
+        private void EvictClosed()
+        {
+            while (_closed.TryDequeue(out var fileName))
+            {
+                if (_snapshot == null)
+                {
+                    continue;
+                }
+
+                foreach (var doc in _snapshot.Lookup(fileName))
+                {
+                    _targets.Evict(doc.Model);
+                }
+            }
+        }
+
+        private bool IsFresh(Snapshot? snapshot) =>
+            snapshot != null && !_stale && _subscribed && Stopwatch.GetElapsedTime(snapshot.BuiltAt) < MaxAge;
+
+        // SwConnection re-attaches after a SolidWorks restart; a different app
+        // object is how that shows here. GetApp throwing (SolidWorks not
+        // running) propagates, exactly as DocumentManager's own calls would.
+        private void Attach()
+        {
+            var app = _connection.GetApp();
+            if (ReferenceEquals(app, _app))
+            {
+                return;
+            }
+
+            lock (_lock)
+            {
+                if (ReferenceEquals(app, _app))
+                {
+                    return;
+                }
+
+                var reattached = _app != null;
+                Unsubscribe();
+                _app = app;
+                _stale = true;
+                if (reattached)
+                {
+                    _targets.Clear();
+                }
+
+                try
+                {
+                    app.FileOpenPostNotify += OnFileOpenPost;
+                    app.FileNewNotify2 += OnFileNew;
+                    app.DocumentLoadNotify2 += OnDocumentLoad;
+                    app.FileCloseNotify += OnFileClose;
+                    _subscribed = true;
+                }
+                catch (Exception ex) when (ex is COMException or InvalidCastException or InvalidComObjectException)
+                {
+                    // No notifications: Current() rebuilds on every call.
+                    Unsubscribe();
+                    _app = app;
+                }
+            }
+        }
+
+        private void Unsubscribe()
+        {
+            if (_app != null)
+            {
+                try
+                {
+                    _app.FileOpenPostNotify -= OnFileOpenPost;
+                    _app.FileNewNotify2 -= OnFileNew;
+                    _app.DocumentLoadNotify2 -= OnDocumentLoad;
+                    _app.FileCloseNotify -= OnFileClose;
+                }
+                catch (Exception ex) when (ex is COMException or InvalidCastException or InvalidComObjectException)
+                {
+                    // The old instance is gone; there is nothing left to detach from.
+                }
+            }
+
+            _app = null;
+            _subscribed = false;
+        }
+
+        // Notification handlers run on SolidWorks' callback, so they only flip
+        // state and queue work; the rebuild (and a closed document's target
+        // eviction) waits for the next tool call. Returning 0 is SolidWorks' "handled, carry on". Opening and
+        // closing also move the document's revision (see DocumentRevisions):
+        // a file reopened after a close without saving is not the document
+        // its old revision described.
+        private int OnFileOpenPost(string fileName)
+        {
+            _revisions.Bump(fileName);
+            return MarkStale();
+        }
+
+        private int OnFileNew(object newDoc, int docType, string templateName) => MarkStale();
+
+        private int OnDocumentLoad(string docTitle, string docPath) => MarkStale();
+
+        private int OnFileClose(string fileName, int reason)
+        {
+            _revisions.Forget(fileName);
+            _closed.Enqueue(fileName);
+            return MarkStale();
+        }
+
+        private int MarkStale()
+        {
+            _stale = true;
+            return 0;
+        }
+
+        /// <summary>
+        /// The names a document answers to, as <see cref="DocumentManager.Resolve"/>
+        /// matches them: its title, and for a saved document its full path
+        /// and file name. Internal (not private) so swmcp.server.tests can
+        /// check the key rules without a live document.
+        /// </summary>
+        internal static IEnumerable<string> KeysFor(string title, string? path)
+        {
+            var names = new List<string> { title };
+            if (!string.IsNullOrEmpty(path))
+            {
+                names.Add(path);
+                names.Add(FileName(path));
+            }
+
+            return names.Where(n => n.Length > 0).Distinct(StringComparer.OrdinalIgnoreCase);
+        }
+
+        /// <summary>Key → positions in <paramref name="documents"/>; a key shared by two documents maps to both.</summary>
+        internal static Dictionary<string, List<int>> BuildKeys(IReadOnlyList<(string Title, string? Path)> documents)
+        {
+            var keys = new Dictionary<string, List<int>>(StringComparer.OrdinalIgnoreCase);
+            for (var i = 0; i < documents.Count; i++)
+            {
+                foreach (var key in KeysFor(documents[i].Title, documents[i].Path))
+                {
+                    if (!keys.TryGetValue(key, out var positions))
+                    {
+                        keys[key] = positions = new List<int>();
+                    }
+
+                    positions.Add(i);
+                }
+            }
+
+            return keys;
+        }
+
+        // Not System.IO.Path: SolidWorks paths are Windows paths whatever
+        // platform the tests run on.
+        private static string FileName(string path) => path[(path.LastIndexOfAny(new[] { '\\', '/' }) + 1)..];
+
+        private sealed class Snapshot
+        {
+            private readonly Dictionary<string, List<int>> _keys;
+
+            public Snapshot(IReadOnlyList<SwDocument> documents, long builtAt)
+            {
+                Documents = documents;
+                Infos = documents.Select(d => d.Info).ToList();
+                BuiltAt = builtAt;
+                _keys = BuildKeys(Infos.Select(i => (i.Title, (string?)i.Path)).ToList());
+            }
+
+            public IReadOnlyList<SwDocument> Documents { get; }
+
+            public IReadOnlyList<DocumentInfo> Infos { get; }
+
+            public long BuiltAt { get; }
+
+            public IReadOnlyList<SwDocument> Lookup(string name) =>
+                _keys.TryGetValue(name, out var positions)
+                    ? positions.Select(i => Documents[i]).ToList()
+                    : Array.Empty<SwDocument>();
+        }
+    }
+}
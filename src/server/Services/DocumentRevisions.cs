@@ -0,0 +1,66 @@
+using System.Collections.Concurrent;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Per-document revision counters — an ETag for "has this document moved
+    /// since I last looked". <see cref="OperationRunner"/> bumps a document's
+    /// revision every time it invokes a write against it; the read tools echo
+    /// the current value and accept it back as <c>ifRevisionNot</c>, answering
+    /// a poll whose document has not moved without re-walking the feature tree
+    /// or re-evaluating mass properties on the dispatcher.
+    /// </summary>
+    /// <remarks>
+    /// Every value handed out comes from one process-wide sequence, so a
+    /// revision is never reused — not across documents, and not for a document
+    /// whose identity changed (a <c>save_as</c> gives it a new path, which reads
+    /// as a fresh key with a fresh, larger value). Keys are paths or titles,
+    /// though, and a document closed without saving and opened again answers
+    /// to the same key with its edits gone; so <see cref="DocumentIndex"/>
+    /// calls <see cref="Forget"/> on SolidWorks' close notification and
+    /// <see cref="Bump(string)"/> on its open one, and the reopened document
+    /// reads as "changed" too. A client holding a stale revision can
+    /// therefore only ever see "changed", never a false "unchanged" — with
+    /// two exceptions. An edit made outside this server (by hand in the
+    /// SolidWorks UI, or by another add-in) does not go through
+    /// <see cref="OperationRunner"/> and bumps nothing; and a close or open
+    /// whose notification SolidWorks never delivered (e.g. the notifications
+    /// could not be subscribed) is as invisible as that edit.
+    /// </remarks>
+    public class DocumentRevisions
+    {
+        private readonly ConcurrentDictionary<string, long> _revisions = new(StringComparer.OrdinalIgnoreCase);
+        private long _sequence;
+
+        /// <summary>The document's current revision, assigning a fresh one the first time the document is seen.</summary>
+        public long Current(SwDocument doc) => Current(KeyFor(doc.Info));
+
+        /// <summary>Moves the document to a new revision (strictly greater than any revision issued so far) and returns it.</summary>
+        public long Bump(SwDocument doc) => Bump(KeyFor(doc.Info));
+
+        // A saved document is identified by its full path; an unsaved one only
+        // has its title. Internal (not private) so swmcp.server.tests can check
+        // the key rules without a live document.
+        internal static string KeyFor(string title, string? path) => string.IsNullOrEmpty(path) ? title : path;
+
+        private static string KeyFor(DocumentInfo info) => KeyFor(info.Title, info.Path);
+
+        internal long Current(string key) => _revisions.GetOrAdd(key, _ => Interlocked.Increment(ref _sequence));
+
+        /// <summary>
+        /// Drops <paramref name="key"/> (a path, or an unsaved document's
+        /// title), so the next <see cref="Current(string)"/> hands out a fresh
+        /// value — for a document that was closed and may come back without
+        /// the edits its last revision stood for.
+        /// </summary>
+        internal void Forget(string key) => _revisions.TryRemove(key, out _);
+
+        internal long Bump(string key)
+        {
+            var next = Interlocked.Increment(ref _sequence);
+            _revisions[key] = next;
+            return next;
+        }
+    }
+}
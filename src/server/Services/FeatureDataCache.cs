@@ -0,0 +1,313 @@
+using System.Runtime.InteropServices;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>One feature-tree entry as <c>get_part_info</c> reports it.</summary>
+    /// <param name="Data">The schema-read values; null for a type with no schema, or a definition that could not be read.</param>
+    public sealed record FeatureData(string Name, string TypeName, IReadOnlyDictionary<string, object?>? Data);
+
+    /// <summary>One page of a <see cref="FeatureQuery"/>'s matches, and how many matched in all.</summary>
+    /// <param name="Unreadable">Per type on the page, the schema properties being skipped because their read failed.</param>
+    public sealed record FeaturePage(
+        IReadOnlyList<FeatureData> Features, int TotalCount, IReadOnlyDictionary<string, IReadOnlyList<string>> Unreadable);
+
+    /// <summary>
+    /// The feature tree behind <c>get_part_info</c>, with each known
+    /// feature's schema-driven <c>data</c> kept per document and feature so
+    /// that a poll re-reads only the features that changed since the last
+    /// one. Reading a known feature's data costs
+    /// a <c>GetDefinition</c> plus one call per schema property (see
+    /// <see cref="FeatureDefinitionReader"/>);
+    /// on a 1,500-feature part that dwarfs everything else the tool does,
+    /// and after a single fillet edit all but one of those reads return what
+    /// they returned last time.
+    /// </summary>
+    /// <remarks>
+    /// A feature's entry is reused while three things are unchanged: its
+    /// <c>IFeature.GetUpdateStamp</c> (bumped by SolidWorks whenever the
+    /// feature is edited or regenerated), its suppression state, and the
+    /// schema its data was read with — a <c>register_feature_schema</c> for
+    /// its type swaps in a new schema list, which is enough to miss. Finding
+    /// out what changed still visits every feature, but for its identity and
+    /// stamp only: a type-name and name read per feature (which the tree
+    /// itself needs anyway), two more per known feature, against the full
+    /// property read they replace. Entries for features no longer
+    /// in the tree are dropped on every refresh whose walk named every
+    /// feature — that is, one with no type filter beyond the default.
+    /// <para>
+    /// Documents are keyed like <see cref="DocumentRevisions"/> (path, or
+    /// title when unsaved); at most <see cref="Capacity"/> are kept, least
+    /// recently read dropped first. Entries hold converted values only,
+    /// never an RCW. <see cref="Read"/> must run on the dispatcher thread.
+    /// </para>
+    /// </remarks>
+    public sealed class FeatureDataCache
+    {
+        /// <summary>Documents kept before the least recently read one is dropped.</summary>
+        public const int Capacity = 32;
+
+        private readonly ComTargetCache _targets;
+        private readonly FeatureDefinitionReader _definitions;
+        private readonly object _lock = new();
+        private readonly Dictionary<string, DocumentEntries> _documents = new(StringComparer.OrdinalIgnoreCase);
+        private long _clock;
+        private long _reads;
+        private long _reuses;
+
+        public FeatureDataCache(ComTargetCache targets, FeatureDefinitionReader definitions)
+        {
+            _targets = targets;
+            _definitions = definitions;
+        }
+
+        /// <summary>Features whose data was read from SolidWorks.</summary>
+        public long Reads => Interlocked.Read(ref _reads);
+
+        /// <summary>Features whose data was served from the cache.</summary>
+        public long Reuses => Interlocked.Read(ref _reuses);
+
+        /// <summary>
+        /// The page of <paramref name="doc"/>'s feature tree
+        /// <paramref name="query"/> selects, in <c>IFeatureManager.GetFeatures</c>
+        /// order, with data for every feature on it whose type
+        /// <paramref name="schemaFor"/> knows.
+        /// </summary>
+        /// <remarks>
+        /// The filter runs inside the walk, in order of cost: the type name is
+        /// read first, and a feature the type filters reject (folder noise
+        /// included — the 19 scaffolding entries every part has) is dropped
+        /// there, before its name, stamp or definition is touched. A feature
+        /// the name pattern rejects costs two reads. Only features on the page
+        /// go any further — <c>ComPropertyReader</c> never sees the rest.
+        /// Once the page is full the walk only counts, so
+        /// <see cref="FeaturePage.TotalCount"/> stays exact while the data
+        /// reads are bounded by the page size.
+        /// </remarks>
+        public FeaturePage Read(SwDocument doc, Func<string, IReadOnlyList<PropertySpec>?> schemaFor, FeatureQuery query)
+        {
+            var key = DocumentRevisions.KeyFor(doc.Info.Title, doc.Info.Path);
+            var featureManager = _targets.Resolve(doc.Model, "FeatureManager");
+            var all = featureManager is { Success: true, Value: { } manager }
+                ? DispatchInvoker.InvokeMethod(manager, "GetFeatures", new object?[] { false })
+                : null;
+            var features = all is { Success: true, Value: object[] array } ? array : Array.Empty<object>();
+            try
+            {
+                var walk = Walk(
+                    features, schemaFor, query,
+                    feature => DispatchInvoker.InvokeMethod(feature, "GetTypeName2", Array.Empty<object?>()) is { Success: true, Value: string type } ? type : null,
+                    feature => DispatchInvoker.GetProperty(feature, "Name") is { Success: true, Value: string name } ? name : null,
+                    Version);
+                var versions = walk.Versions;
+                var data = Refresh(key, walk.Present, versions, v => ReadProperties(v.Feature!, v.TypeName!, v.Schema));
+                var unreadable = new Dictionary<string, IReadOnlyList<string>>(StringComparer.Ordinal);
+                foreach (var version in versions)
+                {
+                    if (!unreadable.ContainsKey(version.TypeName!) && _definitions.Unreadable(version.Schema) is { Count: > 0 } skipped)
+                    {
+                        unreadable[version.TypeName!] = skipped;
+                    }
+                }
+
+                return new FeaturePage(
+                    walk.Page.Select(f => new FeatureData(f.Name, f.TypeName, f.Known ? data[f.Name] : null)).ToList(),
+                    walk.Matched,
+                    unreadable);
+            }
+            finally
+            {
+                // C2: each element of GetFeatures' array is an RCW this call
+                // obtained and nobody else holds a count on.
+                foreach (var feature in features)
+                {
+                    ComLifetime.Release(feature);
+                }
+            }
+        }
+
+        /// <summary>
+        /// <see cref="Read"/>'s walk over <paramref name="features"/>, with the
+        /// COM reads passed in: <paramref name="typeNameOf"/> and
+        /// <paramref name="nameOf"/> return null for a read that failed (the
+        /// feature is skipped), and <paramref name="versionOf"/> reads a page
+        /// feature's stamp. Internal (not private) so swmcp.server.tests can
+        /// check which walks may prune without SolidWorks.
+        /// </summary>
+        /// <remarks>
+        /// Entries can only be pruned when every feature that could have one
+        /// was named, so <see cref="FeatureWalk.Present"/> is null when the
+        /// caller's <see cref="FeatureQuery.TypeNames"/> or
+        /// <see cref="FeatureQuery.ExcludeTypeNames"/> rejected a feature
+        /// before its name was read (stale entries are harmless — stamps
+        /// decide reuse — and go at the next unfiltered walk). Folder noise
+        /// does not count: it is rejected on every default walk, and a
+        /// scaffolding entry that did have data is at worst read again.
+        /// </remarks>
+        internal static FeatureWalk Walk(
+            IEnumerable<object> features, Func<string, IReadOnlyList<PropertySpec>?> schemaFor, FeatureQuery query,
+            Func<object, string?> typeNameOf, Func<object, string?> nameOf,
+            Func<object, string, string, IReadOnlyList<PropertySpec>, FeatureVersion> versionOf)
+        {
+            var page = new List<(string Name, string TypeName, bool Known)>();
+            var present = new HashSet<string>(StringComparer.Ordinal);
+            var everyNameRead = true;
+            var versions = new List<FeatureVersion>();
+            var matched = 0;
+            foreach (var feature in features)
+            {
+                if (typeNameOf(feature) is not { } type)
+                {
+                    continue;
+                }
+
+                if (!query.MatchesType(type))
+                {
+                    if (!query.MatchesTypeFilters(type))
+                    {
+                        everyNameRead = false;
+                    }
+
+                    continue;
+                }
+
+                if (nameOf(feature) is not { } featureName)
+                {
+                    continue;
+                }
+
+                present.Add(featureName);
+                if (!query.MatchesName(featureName) || !query.OnPage(matched++))
+                {
+                    continue;
+                }
+
+                var schema = schemaFor(type);
+                page.Add((featureName, type, schema != null));
+                if (schema != null)
+                {
+                    versions.Add(versionOf(feature, featureName, type, schema));
+                }
+            }
+
+            return new FeatureWalk(page, everyNameRead ? present : null, versions, matched);
+        }
+
+        /// <summary>
+        /// Reuses or (via <paramref name="read"/>) re-reads each of
+        /// <paramref name="features"/> and returns their data. A read that
+        /// comes back not reusable (part of it failed, perhaps only this
+        /// once) is returned but never reused: the next refresh reads the
+        /// feature again. Of the
+        /// document's other entries, those still <paramref name="present"/>
+        /// in the tree are kept (they were merely off this page) and the
+        /// rest dropped; a null <paramref name="present"/> (the walk did not
+        /// see every name) keeps them all. Internal (not private) so
+        /// swmcp.server.tests can check the reuse rules without SolidWorks.
+        /// </summary>
+        internal IReadOnlyDictionary<string, IReadOnlyDictionary<string, object?>?> Refresh(
+            string documentKey, IReadOnlySet<string>? present, IReadOnlyList<FeatureVersion> features,
+            Func<FeatureVersion, (IReadOnlyDictionary<string, object?>? Data, bool Reusable)> read)
+        {
+            Dictionary<string, Entry>? previous;
+            lock (_lock)
+            {
+                previous = _documents.TryGetValue(documentKey, out var doc) ? doc.Features : null;
+            }
+
+            var next = previous == null
+                ? new Dictionary<string, Entry>(StringComparer.Ordinal)
+                : previous.Where(e => present?.Contains(e.Key) != false).ToDictionary(e => e.Key, e => e.Value, StringComparer.Ordinal);
+            var data = new Dictionary<string, IReadOnlyDictionary<string, object?>?>(StringComparer.Ordinal);
+            foreach (var feature in features)
+            {
+                if (previous != null && feature.Stamp != null && previous.TryGetValue(feature.Name, out var entry) &&
+                    entry.Stamp == feature.Stamp && entry.Suppressed == feature.Suppressed &&
+                    ReferenceEquals(entry.Schema, feature.Schema))
+                {
+                    Interlocked.Increment(ref _reuses);
+                }
+                else
+                {
+                    var (fresh, reusable) = read(feature);
+                    entry = new Entry(reusable ? feature.Stamp : null, feature.Suppressed, feature.Schema, fresh);
+                    Interlocked.Increment(ref _reads);
+                }
+
+                next[feature.Name] = entry;
+                data[feature.Name] = entry.Data;
+            }
+
+            lock (_lock)
+            {
+                if (!_documents.ContainsKey(documentKey) && _documents.Count >= Capacity)
+                {
+                    _documents.Remove(_documents.MinBy(d => d.Value.LastUsed).Key);
+                }
+
+                _documents[documentKey] = new DocumentEntries(next, ++_clock);
+            }
+
+            return data;
+        }
+
+        private static FeatureVersion Version(object feature, string featureName, string typeName, IReadOnlyList<PropertySpec> schema)
+        {
+            // A stamp that cannot be read is null, which is never reused: the
+            // feature is simply re-read every time.
+            var stamp = DispatchInvoker.InvokeMethod(feature, "GetUpdateStamp", Array.Empty<object?>());
+            var suppressed = DispatchInvoker.InvokeMethod(feature, "IsSuppressed", Array.Empty<object?>());
+            return new FeatureVersion(
+                featureName,
+                stamp is { Success: true, Value: int s } ? s : null,
+                suppressed is { Success: true, Value: true },
+                schema,
+                feature,
+                typeName);
+        }
+
+        // A definition that could not be fetched or read is a failure of this
+        // call, not of the feature: null data, not kept for reuse.
+        private (IReadOnlyDictionary<string, object?>? Data, bool Reusable) ReadProperties(
+            object feature, string typeName, IReadOnlyList<PropertySpec> schema)
+        {
+            var definition = DispatchInvoker.InvokeMethod(feature, "GetDefinition", Array.Empty<object?>());
+            if (definition is not { Success: true, Value: { } def })
+            {
+                return (null, false);
+            }
+
+            try
+            {
+                var data = _definitions.Read(def, typeName, schema, out var complete);
+                return (data, complete);
+            }
+            catch (Exception ex) when (ex is COMException or InvalidComObjectException)
+            {
+                return (null, false);
+            }
+            finally
+            {
+                ComLifetime.Release(def);
+            }
+        }
+
+        /// <summary>One feature as found in the tree: what its cache entry is checked against.</summary>
+        /// <param name="Stamp">Null when the update stamp could not be read.</param>
+        /// <param name="Feature">The feature's RCW, for reading its data; null in tests.</param>
+        /// <param name="TypeName">The feature's type, for picking its definition reader; null in tests.</param>
+        internal sealed record FeatureVersion(
+            string Name, int? Stamp, bool Suppressed, IReadOnlyList<PropertySpec> Schema, object? Feature = null, string? TypeName = null);
+
+        /// <summary>What one <see cref="Walk"/> found.</summary>
+        /// <param name="Present">Every feature name the walk read; null when a type filter kept it from reading them all.</param>
+        /// <param name="Matched">Features matching the query, on the page or not.</param>
+        internal sealed record FeatureWalk(
+            IReadOnlyList<(string Name, string TypeName, bool Known)> Page, IReadOnlySet<string>? Present,
+            IReadOnlyList<FeatureVersion> Versions, int Matched);
+
+        private sealed record Entry(int? Stamp, bool Suppressed, IReadOnlyList<PropertySpec> Schema, IReadOnlyDictionary<string, object?>? Data);
+
+        private sealed record DocumentEntries(Dictionary<string, Entry> Features, long LastUsed);
+    }
+}
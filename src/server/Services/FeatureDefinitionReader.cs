@@ -0,0 +1,243 @@
+using System.Globalization;
+using System.Runtime.CompilerServices;
+using System.Runtime.InteropServices;
+using SolidWorks.Interop.sldworks;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Reads a feature definition's schema properties for
+    /// <see cref="FeatureDataCache"/>. The seed types that make up most
+    /// trees (<c>Extrusion</c>, <c>Cut</c>, <c>ICE</c>, <c>Fillet</c>,
+    /// <c>Chamfer</c>) go through their interop interface: one
+    /// <c>QueryInterface</c> per definition, then a vtable call per property,
+    /// where a late-bound read pays an <c>IDispatch::Invoke</c> for each.
+    /// Everything else — registered types, and any seed property the typed
+    /// readers do not cover — stays late-bound, through
+    /// <see cref="DispatchInvoker"/>: its cached DISPIDs spare the
+    /// <c>GetIDsOfNames</c> round trip after a type's first feature.
+    /// </summary>
+    /// <remarks>
+    /// A typed reader applies per property, not per schema: it is matched on
+    /// the spec's member and arguments, so a <c>register_feature_schema</c>
+    /// that replaces a seed type's schema still gets the fast path for every
+    /// property it kept, and the late-bound one for the rest. A definition
+    /// that does not answer the interface (the <c>QueryInterface</c> fails)
+    /// is read late-bound throughout.
+    /// <para>
+    /// A property whose <c>member</c> the definition does not have (a
+    /// late-bound read failing, and <c>GetIDsOfNames</c> then answering
+    /// <c>DISP_E_UNKNOWNNAME</c> or <c>DISP_E_MEMBERNOTFOUND</c>) is
+    /// remembered, and skipped from then on rather than retried on every
+    /// feature of its type on every call — a wrong <c>member</c> in a
+    /// registered schema otherwise costs a failed round trip per feature,
+    /// forever. <see cref="Unreadable"/> reports them. Any other failure —
+    /// a typed reader's <see cref="COMException"/>, a known member that
+    /// faulted on this one feature — is left out of that feature's data only
+    /// and tried again next time. Failures are remembered per
+    /// <see cref="PropertySpec"/> instance, so registering a new schema for
+    /// the type (new specs) tries again.
+    /// </para>
+    /// </remarks>
+    public sealed class FeatureDefinitionReader
+    {
+        private static readonly TypedReader Extrude = TypedReader.For<IExtrudeFeatureData2>(
+            (Signature("GetDepth", true), d => d.GetDepth(true)),
+            (Signature("GetDepth", false), d => d.GetDepth(false)),
+            (Signature("GetDraftAngle", true), d => d.GetDraftAngle(true)),
+            (Signature("GetDraftAngle", false), d => d.GetDraftAngle(false)),
+            (Signature("GetDraftOutward", true), d => d.GetDraftOutward(true)),
+            (Signature("GetDraftOutward", false), d => d.GetDraftOutward(false)),
+            (Signature("BothDirections"), d => d.BothDirections),
+            (Signature("ReverseDirection"), d => d.ReverseDirection));
+
+        private static readonly IReadOnlyDictionary<string, TypedReader> TypedReaders =
+            new Dictionary<string, TypedReader>(StringComparer.OrdinalIgnoreCase)
+            {
+                ["Extrusion"] = Extrude,
+                ["Cut"] = Extrude,
+                ["ICE"] = Extrude,
+                ["Fillet"] = TypedReader.For<ISimpleFilletFeatureData2>(
+                    (Signature("DefaultRadius"), d => d.DefaultRadius),
+                    (Signature("OverflowType"), d => d.OverflowType),
+                    (Signature("FilletItemsCount"), d => d.FilletItemsCount),
+                    (Signature("IsMultipleRadius"), d => d.IsMultipleRadius),
+                    (Signature("Type"), d => d.Type),
+                    (Signature("PropagateToTangentFaces"), d => d.PropagateToTangentFaces),
+                    (Signature("GetEdgeCount"), d => d.GetEdgeCount())),
+                ["Chamfer"] = TypedReader.For<IChamferFeatureData2>(
+                    (Signature("GetEdgeChamferDistance", 0), d => d.GetEdgeChamferDistance(0)),
+                    (Signature("GetEdgeChamferDistance", 1), d => d.GetEdgeChamferDistance(1)),
+                    (Signature("EdgeChamferAngle"), d => d.EdgeChamferAngle),
+                    (Signature("Type"), d => d.Type),
+                    (Signature("EqualDistance"), d => d.EqualDistance),
+                    (Signature("TangentPropagation"), d => d.TangentPropagation),
+                    (Signature("GetEdgeCount"), d => d.GetEdgeCount())),
+            };
+
+        // Keyed on the spec instance, weakly: a replaced schema's failures go
+        // with it.
+        private readonly ConditionalWeakTable<PropertySpec, object> _failed = new();
+        private readonly LateBoundRead _lateBound;
+        private readonly Func<object, string, bool> _isUnknownMember;
+        private long _typedReads;
+        private long _lateBoundReads;
+        private long _skipped;
+
+        public FeatureDefinitionReader()
+            : this(ReadLateBound, DispatchInvoker.IsUnknownMember)
+        {
+        }
+
+        // Tests substitute the late-bound read and the unknown-member check,
+        // to fail members without RCWs.
+        internal FeatureDefinitionReader(LateBoundRead lateBound, Func<object, string, bool> isUnknownMember)
+        {
+            _lateBound = lateBound;
+            _isUnknownMember = isUnknownMember;
+        }
+
+        internal delegate bool LateBoundRead(object target, string member, IReadOnlyList<object?>? args, out object? value);
+
+        // Through DispatchInvoker, so a late-bound property pays its
+        // GetIDsOfNames once per type, not once per feature, and shows up in
+        // the metrics' comCalls like the runner's own calls.
+        private static bool ReadLateBound(object target, string member, IReadOnlyList<object?>? args, out object? value)
+        {
+            var outcome = DispatchInvoker.GetMember(target, member, args?.ToArray() ?? Array.Empty<object?>());
+            value = outcome.Value;
+            return outcome.Success;
+        }
+
+        /// <summary>Properties read through an interop interface.</summary>
+        public long TypedReads => Interlocked.Read(ref _typedReads);
+
+        /// <summary>Properties read late-bound through <see cref="DispatchInvoker"/>.</summary>
+        public long LateBoundReads => Interlocked.Read(ref _lateBoundReads);
+
+        /// <summary>Property reads skipped because the property failed before.</summary>
+        public long Skipped => Interlocked.Read(ref _skipped);
+
+        /// <summary>
+        /// <paramref name="schema"/>'s values from <paramref name="definition"/>
+        /// (a <paramref name="typeName"/> feature's <c>GetDefinition</c>).
+        /// A property that fails, or returns a COM object, is left out;
+        /// <paramref name="complete"/> is false when one was left out for a
+        /// failure that may not recur (anything but an unknown member), so
+        /// the caller should not keep the data as this feature's last word.
+        /// </summary>
+        public Dictionary<string, object?> Read(object definition, string typeName, IReadOnlyList<PropertySpec> schema, out bool complete)
+        {
+            var typed = TypedReaders.TryGetValue(typeName, out var reader) && reader.Accepts(definition) ? reader : null;
+            var data = new Dictionary<string, object?>(StringComparer.Ordinal);
+            complete = true;
+            foreach (var spec in schema)
+            {
+                if (_failed.TryGetValue(spec, out _))
+                {
+                    Interlocked.Increment(ref _skipped);
+                    continue;
+                }
+
+                if (!TryRead(definition, typed, spec, out var value, out var unknownMember))
+                {
+                    if (unknownMember)
+                    {
+                        _failed.AddOrUpdate(spec, typeName);
+                    }
+                    else
+                    {
+                        complete = false;
+                    }
+
+                    continue;
+                }
+
+                // Schemas are meant to name scalars (see the schema store
+                // notes); a member returning an object is left out rather
+                // than leaked or serialized as an RCW (C2).
+                if (value != null && Marshal.IsComObject(value))
+                {
+                    ComLifetime.Release(value);
+                    continue;
+                }
+
+                data[spec.Name] = value;
+            }
+
+            return data;
+        }
+
+        /// <summary>The names of <paramref name="schema"/>'s properties whose member was not found and are being skipped.</summary>
+        public IReadOnlyList<string> Unreadable(IReadOnlyList<PropertySpec> schema) =>
+            schema.Where(s => _failed.TryGetValue(s, out _)).Select(s => s.Name).ToList();
+
+        /// <summary>
+        /// True when a <paramref name="typeName"/> definition's
+        /// <paramref name="spec"/> has a typed reader. Internal (not private)
+        /// so swmcp.server.tests can check the readers against the seed.
+        /// </summary>
+        internal static bool HasTypedReader(string typeName, PropertySpec spec) =>
+            TypedReaders.TryGetValue(typeName, out var reader) && reader.Members.ContainsKey(Signature(spec.Member, spec.Args));
+
+        /// <summary>A member plus its arguments, as the typed readers are keyed: <c>GetDepth(True)</c>.</summary>
+        internal static string Signature(string member, IReadOnlyList<object?>? args) =>
+            $"{member}({string.Join(",", (args ?? Array.Empty<object?>()).Select(a => Convert.ToString(a, CultureInfo.InvariantCulture)))})";
+
+        private static string Signature(string member, params object?[] args) => Signature(member, (IReadOnlyList<object?>)args);
+
+        // unknownMember is only ever set for a late-bound read: a typed
+        // reader's member is on the interface by construction, so its
+        // failure is this feature's, not the spec's.
+        private bool TryRead(object definition, TypedReader? typed, PropertySpec spec, out object? value, out bool unknownMember)
+        {
+            unknownMember = false;
+            if (typed != null && typed.Members.TryGetValue(Signature(spec.Member, spec.Args), out var get))
+            {
+                Interlocked.Increment(ref _typedReads);
+                try
+                {
+                    value = get(definition);
+                    return true;
+                }
+                catch (COMException)
+                {
+                    // The member's failure, not the definition's: a dead
+                    // definition throws InvalidComObjectException, which the
+                    // caller handles for the whole read.
+                    value = null;
+                    return false;
+                }
+            }
+
+            Interlocked.Increment(ref _lateBoundReads);
+            if (_lateBound(definition, spec.Member, spec.Args, out value))
+            {
+                return true;
+            }
+
+            unknownMember = _isUnknownMember(definition, spec.Member);
+            return false;
+        }
+
+        private sealed class TypedReader
+        {
+            private TypedReader(Func<object, bool> accepts, Dictionary<string, Func<object, object?>> members)
+            {
+                Accepts = accepts;
+                Members = members;
+            }
+
+            public Func<object, bool> Accepts { get; }
+
+            public IReadOnlyDictionary<string, Func<object, object?>> Members { get; }
+
+            public static TypedReader For<T>(params (string Signature, Func<T, object?> Get)[] members)
+                where T : class =>
+                new(
+                    definition => definition is T,
+                    members.ToDictionary(m => m.Signature, m => (Func<object, object?>)(d => m.Get((T)d)), StringComparer.OrdinalIgnoreCase));
+        }
+    }
+}
@@ -0,0 +1,79 @@
+using System.Text.RegularExpressions;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Which feature-tree entries <c>get_part_info</c> lists, and which page
+    /// of them: <see cref="FeatureDataCache.Read"/> applies it during the
+    /// walk, so features outside the filter or the page never have their
+    /// data read.
+    /// </summary>
+    /// <remarks>
+    /// Filters combine with AND, in this order: folder noise (see
+    /// <see cref="FeatureTreeFilter"/>), <see cref="TypeNames"/>,
+    /// <see cref="ExcludeTypeNames"/>, <see cref="NamePattern"/>. Type names
+    /// compare exactly (they are <c>GetTypeName2</c> identifiers, as the noise
+    /// list does); the name pattern is a case-insensitive wildcard over the
+    /// whole name — <c>*</c> any run of characters, <c>?</c> any one.
+    /// </remarks>
+    public sealed class FeatureQuery
+    {
+        private readonly Regex? _namePattern;
+
+        public FeatureQuery(
+            bool includeFolderFeatures = false, IReadOnlyCollection<string>? typeNames = null,
+            IReadOnlyCollection<string>? excludeTypeNames = null, string? namePattern = null,
+            int offset = 0, int limit = int.MaxValue)
+        {
+            IncludeFolderFeatures = includeFolderFeatures;
+            TypeNames = typeNames is { Count: > 0 } ? new HashSet<string>(typeNames, StringComparer.Ordinal) : null;
+            ExcludeTypeNames = excludeTypeNames is { Count: > 0 } ? new HashSet<string>(excludeTypeNames, StringComparer.Ordinal) : null;
+            NamePattern = string.IsNullOrEmpty(namePattern) ? null : namePattern;
+            Offset = Math.Max(0, offset);
+            Limit = Math.Max(0, limit);
+            _namePattern = NamePattern == null ? null : WildcardToRegex(NamePattern);
+        }
+
+        /// <summary>Every feature except folder noise, unpaged — what <c>get_part_info</c> listed before paging existed.</summary>
+        public static FeatureQuery Default { get; } = new();
+
+        public bool IncludeFolderFeatures { get; }
+
+        /// <summary>Only these types, when set.</summary>
+        public IReadOnlySet<string>? TypeNames { get; }
+
+        /// <summary>Never these types, when set.</summary>
+        public IReadOnlySet<string>? ExcludeTypeNames { get; }
+
+        public string? NamePattern { get; }
+
+        /// <summary>Matching features to skip before the page starts.</summary>
+        public int Offset { get; }
+
+        /// <summary>Most matching features the page holds.</summary>
+        public int Limit { get; }
+
+        public bool Matches(string name, string typeName) => MatchesType(typeName) && MatchesName(name);
+
+        /// <summary>
+        /// The filters that need only the type name — checked first, so a
+        /// feature they reject costs the walk one read and nothing else.
+        /// </summary>
+        public bool MatchesType(string typeName) =>
+            (IncludeFolderFeatures || !FeatureTreeFilter.IsFolderNoise(typeName)) && MatchesTypeFilters(typeName);
+
+        /// <summary><see cref="TypeNames"/> and <see cref="ExcludeTypeNames"/> alone, without the folder-noise rule.</summary>
+        public bool MatchesTypeFilters(string typeName) =>
+            (TypeNames == null || TypeNames.Contains(typeName)) &&
+            (ExcludeTypeNames == null || !ExcludeTypeNames.Contains(typeName));
+
+        public bool MatchesName(string name) => _namePattern == null || _namePattern.IsMatch(name);
+
+        /// <summary>True when the <paramref name="index"/>-th match (zero-based) falls on the page.</summary>
+        public bool OnPage(int index) => index >= Offset && index - Offset < Limit;
+
+        internal static Regex WildcardToRegex(string pattern) =>
+            new("^" + Regex.Escape(pattern).Replace(@"\*", ".*").Replace(@"\?", ".") + "$",
+                RegexOptions.IgnoreCase | RegexOptions.CultureInvariant | RegexOptions.Singleline);
+    }
+}
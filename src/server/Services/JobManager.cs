@@ -0,0 +1,290 @@
+using System.Collections.Concurrent;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>Lifecycle of an <see cref="OperationJob"/>.</summary>
+    public enum JobStatus
+    {
+        /// <summary>Submitted; its batch has not reached the dispatcher yet.</summary>
+        Queued,
+
+        /// <summary>Steps are executing (or the job's dispatch wait timed out while they still were — see <see cref="JobSnapshot.DispatchTimedOut"/>).</summary>
+        Running,
+
+        /// <summary>Every step succeeded.</summary>
+        Completed,
+
+        /// <summary>A step failed (the batch stopped there), or the batch could not be dispatched at all.</summary>
+        Failed,
+
+        /// <summary>Stopped by <c>cancel_job</c> at a step boundary (or between a vectorized step's items); the work before it ran.</summary>
+        Cancelled,
+    }
+
+    /// <summary>
+    /// Server-side record of one <c>submit_operations</c> batch. Steps are
+    /// appended as they finish (from the dispatcher thread), and read as a
+    /// consistent copy by <c>get_job</c> (from a request thread), so every
+    /// member goes through one lock.
+    /// </summary>
+    public sealed class OperationJob
+    {
+        private readonly object _lock = new();
+        private readonly List<OperationResult> _results = new();
+        private JobStatus _status = JobStatus.Queued;
+        private string? _error;
+        private DateTimeOffset? _finishedAt;
+        private bool _dispatchTimedOut;
+
+        internal OperationJob(string id, IReadOnlyList<string> operations)
+        {
+            Id = id;
+            Operations = operations;
+        }
+
+        public string Id { get; }
+
+        /// <summary>Operation name of every submitted step, by index.</summary>
+        public IReadOnlyList<string> Operations { get; }
+
+        public DateTimeOffset SubmittedAt { get; } = DateTimeOffset.UtcNow;
+
+        internal CancellationTokenSource Cancellation { get; } = new();
+
+        /// <summary>A consistent copy of the job's state, safe to serialize while steps are still being appended.</summary>
+        public JobSnapshot Snapshot()
+        {
+            lock (_lock)
+            {
+                return new JobSnapshot(Id, _status, Operations, _results.ToList(), _error, SubmittedAt, _finishedAt, _dispatchTimedOut);
+            }
+        }
+
+        internal bool IsFinished
+        {
+            get
+            {
+                lock (_lock)
+                {
+                    return _finishedAt != null;
+                }
+            }
+        }
+
+        // Called on the dispatcher thread as each step finishes. A failing
+        // step or the last step finishes the job right here rather than when
+        // RunBatch returns, so a job whose dispatch wait already timed out
+        // still reaches a terminal status.
+        internal void Append(int index, OperationResult result)
+        {
+            lock (_lock)
+            {
+                _results.Add(result);
+                if (_finishedAt == null)
+                {
+                    _status = JobStatus.Running;
+                }
+
+                if (result.Cancelled)
+                {
+                    FinishUnderLock(JobStatus.Cancelled, $"Cancelled by cancel_job during step {index} ('{Operations[index]}'): {result.Error}");
+                }
+                else if (!result.Success)
+                {
+                    FinishUnderLock(JobStatus.Failed, $"Step {index} ('{Operations[index]}') failed: {result.Error}");
+                }
+                else if (index == Operations.Count - 1)
+                {
+                    FinishUnderLock(JobStatus.Completed, null);
+                }
+            }
+        }
+
+        internal void MarkDispatchTimedOut()
+        {
+            lock (_lock)
+            {
+                _dispatchTimedOut = true;
+                _status = _finishedAt == null ? JobStatus.Running : _status;
+            }
+        }
+
+        /// <summary>Finishes the job unless a step already did; the first terminal status wins.</summary>
+        internal void Finish(JobStatus status, string? error)
+        {
+            lock (_lock)
+            {
+                FinishUnderLock(status, error);
+            }
+        }
+
+        private void FinishUnderLock(JobStatus status, string? error)
+        {
+            if (_finishedAt != null)
+            {
+                return;
+            }
+
+            _status = status;
+            _error = error;
+            _finishedAt = DateTimeOffset.UtcNow;
+        }
+    }
+
+    /// <summary>Point-in-time copy of an <see cref="OperationJob"/>.</summary>
+    /// <param name="DispatchTimedOut">
+    /// True when the job's batch outlived its dispatch budget. Nothing is lost
+    /// when that happens: the batch keeps running on the dispatcher and its
+    /// steps keep being appended here until it fails, completes, or is
+    /// cancelled.
+    /// </param>
+    public sealed record JobSnapshot(
+        string Id, JobStatus Status, IReadOnlyList<string> Operations, IReadOnlyList<OperationResult> Results,
+        string? Error, DateTimeOffset SubmittedAt, DateTimeOffset? FinishedAt, bool DispatchTimedOut);
+
+    /// <summary>
+    /// Runs <c>submit_operations</c> batches in the background. Each job is
+    /// still exactly one <see cref="OperationRunner.RunBatch"/> — one unit of
+    /// work on the dispatcher, with the same no-interleaving guarantee as
+    /// <c>run_operations</c> (post-review M1) — but the caller gets a job id
+    /// back immediately, every finished step is recorded on the job the
+    /// moment it finishes, and <see cref="Cancel"/> stops the batch at the
+    /// next step boundary.
+    /// </summary>
+    /// <remarks>
+    /// This is what closes <c>run_operations</c>' one documented hole: a batch
+    /// that outlives its timeout there returns no transcript at all, because
+    /// the results are only handed back when the dispatch returns. Here they
+    /// are handed over one step at a time, so a timed-out wait costs nothing
+    /// but the wait. Progress is read with <c>get_job</c>, never pushed: MCP
+    /// progress notifications belong to a request still in flight, and the
+    /// <c>submit_operations</c> request has been answered before the first
+    /// step runs. Finished jobs are kept for <see cref="MaxFinishedJobs"/>
+    /// jobs, oldest evicted first; running jobs are never evicted.
+    /// </remarks>
+    public class JobManager
+    {
+        internal const int MaxFinishedJobs = 100;
+
+        private readonly OperationRunner _runner;
+        private readonly DispatchScheduler _scheduler;
+        private readonly ServerMetrics _metrics;
+        private readonly ConcurrentDictionary<string, OperationJob> _jobs = new(StringComparer.Ordinal);
+
+        public JobManager(OperationRunner runner, DispatchScheduler scheduler, ServerMetrics metrics)
+        {
+            _runner = runner;
+            _scheduler = scheduler;
+            _metrics = metrics;
+        }
+
+        /// <summary>
+        /// Queues the batch and returns its job immediately; execution happens
+        /// on a background task once the job's <see cref="DispatchPriority.Background"/>
+        /// ticket comes up. Null, with nothing queued, when the
+        /// <see cref="DispatchScheduler"/> queue is full.
+        /// </summary>
+        public OperationJob? Submit(
+            IReadOnlyList<BatchStep> steps,
+            string? documentName,
+            BatchOptions options)
+        {
+            var id = Guid.NewGuid().ToString("N");
+            var ticket = _scheduler.TryEnter(DispatchPriority.Background, id);
+            if (ticket == null)
+            {
+                return null;
+            }
+
+            var job = new OperationJob(id, steps.Select(s => s.Recipe.Name).ToList());
+            _jobs[job.Id] = job;
+            EvictFinished();
+
+            _ = Task.Run(() => Execute(job, ticket, steps, documentName, options));
+            return job;
+        }
+
+        public OperationJob? Get(string jobId) => _jobs.TryGetValue(jobId, out var job) ? job : null;
+
+        /// <summary>
+        /// Requests cancellation. Takes effect at the next step boundary, or
+        /// the next item of a vectorized step — the invoke in flight (if any)
+        /// always finishes and is recorded.
+        /// Returns false for an unknown id or a job that has already finished.
+        /// </summary>
+        public bool Cancel(string jobId)
+        {
+            var job = Get(jobId);
+            if (job == null || job.IsFinished)
+            {
+                return false;
+            }
+
+            job.Cancellation.Cancel();
+
+            // A job whose dispatch wait already timed out has nobody left to
+            // observe RunBatch returning — mark it here. If a step is still
+            // invoking it is recorded when it lands; the status stays cancelled.
+            if (job.Snapshot().DispatchTimedOut)
+            {
+                job.Finish(JobStatus.Cancelled, "Cancelled by cancel_job.");
+            }
+
+            return true;
+        }
+
+        private void Execute(
+            OperationJob job, DispatchTicket ticket, IReadOnlyList<BatchStep> steps, string? documentName, BatchOptions options)
+        {
+            // Same budget run_operations uses; here it bounds only how long
+            // this background task waits, never what gets recorded.
+            var timeout = TimeSpan.FromSeconds(120 + (30 * Math.Max(1, steps.Count)));
+            using var held = ticket;
+            try
+            {
+                // A queued job waits for its turn as long as it takes; only
+                // cancel_job ends the wait early, with nothing run.
+                if (!ticket.Wait(Timeout.InfiniteTimeSpan, job.Cancellation.Token))
+                {
+                    job.Finish(JobStatus.Cancelled, "Cancelled by cancel_job before it started.");
+                    return;
+                }
+
+                using var timing = _metrics.Tools.Time("submit_operations");
+
+                _runner.RunBatch(
+                    steps, documentName, timeout, options,
+                    onStepCompleted: job.Append,
+                    cancellationToken: job.Cancellation.Token,
+                    queuedFor: ticket.QueueWait);
+
+                // Every step that ran already finished the job through Append
+                // if it failed or was the last; what is left is a batch stopped
+                // at a step boundary by cancel_job (or an empty batch).
+                job.Finish(
+                    job.Cancellation.IsCancellationRequested ? JobStatus.Cancelled : JobStatus.Completed,
+                    job.Cancellation.IsCancellationRequested
+                        ? "Cancelled by cancel_job." + (options.Rebuild == RebuildPolicy.Deferred ? OperationRunner.DeferredChecksSkipped : "")
+                        : null);
+            }
+            catch (SwDispatchTimeoutException)
+            {
+                job.MarkDispatchTimedOut();
+            }
+            catch (Exception ex) when (ex is SwBridgeException or ObjectDisposedException)
+            {
+                job.Finish(JobStatus.Failed, $"Batch could not run: {ex.Message}");
+            }
+        }
+
+        private void EvictFinished()
+        {
+            var finished = _jobs.Values.Where(j => j.IsFinished).OrderBy(j => j.SubmittedAt).ToList();
+            foreach (var job in finished.Take(Math.Max(0, finished.Count - MaxFinishedJobs)))
+            {
+                _jobs.TryRemove(job.Id, out _);
+            }
+        }
+    }
+}
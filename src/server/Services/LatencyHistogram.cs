@@ -0,0 +1,154 @@
+using System.Collections.Concurrent;
+using System.Diagnostics;
+
+namespace swmcp.server.Services
+{
+    /// <summary>One bucket of a <see cref="LatencySummary"/>: the calls that took at most <paramref name="LeMs"/>.</summary>
+    /// <param name="LeMs">The bucket's upper bound in milliseconds; null for the last, unbounded one.</param>
+    public sealed record LatencyBucket(double? LeMs, long Count);
+
+    /// <summary>
+    /// A <see cref="LatencyHistogram"/> as reported. Percentiles are bucket
+    /// upper bounds — "95% of calls took at most this" — not interpolated
+    /// values; only non-empty buckets are listed.
+    /// </summary>
+    public sealed record LatencySummary(
+        long Count, double TotalMs, double MeanMs, double P50Ms, double P95Ms, double MaxMs, IReadOnlyList<LatencyBucket> Buckets);
+
+    /// <summary>
+    /// Fixed-bucket latency histogram, recorded without a lock: every field is
+    /// a counter updated with <see cref="Interlocked"/>, so the dispatcher
+    /// thread never waits on a reader. Buckets run from 0.1ms (a cached
+    /// DISPID call) to 30s (a rebuild that should have been deferred).
+    /// </summary>
+    /// <remarks>
+    /// A <see cref="Summary"/> taken while calls are landing reads each
+    /// counter exactly but not all of them at one instant, so its count and
+    /// its buckets can disagree by the calls in flight.
+    /// </remarks>
+    public sealed class LatencyHistogram
+    {
+        internal static readonly double[] BoundsMs = { 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000 };
+
+        private readonly long[] _buckets = new long[BoundsMs.Length + 1];
+        private long _count;
+        private long _totalTicks;
+        private long _maxTicks;
+
+        /// <summary>Records one call that took <paramref name="elapsedTicks"/> <see cref="Stopwatch"/> ticks.</summary>
+        public void Record(long elapsedTicks)
+        {
+            elapsedTicks = Math.Max(0, elapsedTicks);
+            var ms = ToMs(elapsedTicks);
+            var bucket = 0;
+            while (bucket < BoundsMs.Length && ms > BoundsMs[bucket])
+            {
+                bucket++;
+            }
+
+            Interlocked.Increment(ref _buckets[bucket]);
+            Interlocked.Increment(ref _count);
+            Interlocked.Add(ref _totalTicks, elapsedTicks);
+
+            var max = Interlocked.Read(ref _maxTicks);
+            while (elapsedTicks > max)
+            {
+                var seen = Interlocked.CompareExchange(ref _maxTicks, elapsedTicks, max);
+                if (seen == max)
+                {
+                    break;
+                }
+
+                max = seen;
+            }
+        }
+
+        /// <summary>Starts timing one call; disposing the scope records it.</summary>
+        public LatencyScope Time() => new(this);
+
+        public LatencySummary Summary()
+        {
+            var counts = new long[_buckets.Length];
+            for (var i = 0; i < counts.Length; i++)
+            {
+                counts[i] = Interlocked.Read(ref _buckets[i]);
+            }
+
+            var count = counts.Sum();
+            var totalMs = ToMs(Interlocked.Read(ref _totalTicks));
+            var maxMs = ToMs(Interlocked.Read(ref _maxTicks));
+            var buckets = counts
+                .Select((c, i) => new LatencyBucket(i < BoundsMs.Length ? BoundsMs[i] : null, c))
+                .Where(b => b.Count > 0)
+                .ToList();
+            return new LatencySummary(
+                count, Round(totalMs), count == 0 ? 0 : Round(totalMs / count),
+                Percentile(counts, count, 0.50, maxMs), Percentile(counts, count, 0.95, maxMs), Round(maxMs), buckets);
+        }
+
+        internal static double ToMs(long ticks) => ticks * 1000.0 / Stopwatch.Frequency;
+
+        // The upper bound of the bucket the q-th call falls in; the unbounded
+        // bucket, and any bound above the slowest call, report the maximum.
+        private static double Percentile(long[] counts, long count, double q, double maxMs)
+        {
+            if (count == 0)
+            {
+                return 0;
+            }
+
+            var rank = (long)Math.Ceiling(q * count);
+            long seen = 0;
+            for (var i = 0; i < counts.Length; i++)
+            {
+                seen += counts[i];
+                if (seen >= rank)
+                {
+                    return Round(i < BoundsMs.Length ? Math.Min(BoundsMs[i], maxMs) : maxMs);
+                }
+            }
+
+            return Round(maxMs);
+        }
+
+        private static double Round(double ms) => Math.Round(ms, 3);
+    }
+
+    /// <summary>Times one call into a <see cref="LatencyHistogram"/>; see <see cref="LatencyHistogram.Time"/>.</summary>
+    public readonly struct LatencyScope : IDisposable
+    {
+        private readonly LatencyHistogram? _histogram;
+        private readonly long _start;
+
+        internal LatencyScope(LatencyHistogram histogram)
+        {
+            _histogram = histogram;
+            _start = Stopwatch.GetTimestamp();
+        }
+
+        public void Dispose() => _histogram?.Record(Stopwatch.GetTimestamp() - _start);
+    }
+
+    /// <summary>
+    /// <see cref="LatencyHistogram"/>s by name — a tool, a recipe phase, a COM
+    /// member. Names compare case-insensitively; a name's histogram is
+    /// created on first use and kept for the life of the process.
+    /// </summary>
+    public sealed class LatencyTable
+    {
+        private readonly ConcurrentDictionary<string, LatencyHistogram> _histograms = new(StringComparer.OrdinalIgnoreCase);
+
+        public LatencyHistogram this[string name] => _histograms.GetOrAdd(name, _ => new LatencyHistogram());
+
+        public void Record(string name, long elapsedTicks) => this[name].Record(elapsedTicks);
+
+        /// <summary>Starts timing one call under <paramref name="name"/>.</summary>
+        public LatencyScope Time(string name) => this[name].Time();
+
+        /// <summary>Every histogram's <see cref="LatencyHistogram.Summary"/>, by name in ordinal order.</summary>
+        public IReadOnlyDictionary<string, LatencySummary> Summaries() =>
+            _histograms
+                .OrderBy(h => h.Key, StringComparer.OrdinalIgnoreCase)
+                .ToDictionary(h => h.Key, h => h.Value.Summary(), StringComparer.OrdinalIgnoreCase);
+    }
+}
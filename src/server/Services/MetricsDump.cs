@@ -0,0 +1,76 @@
+using System.Text.Json;
+using Microsoft.Extensions.Hosting;
+using Microsoft.Extensions.Logging;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Writes a <see cref="ServerMetrics.Snapshot"/> to a file every
+    /// <c>Metrics:DumpIntervalSeconds</c> (default 60) and once more on
+    /// shutdown, for capacity planning across runs without an MCP client
+    /// asking. Registered only when <c>Metrics:DumpPath</c> is configured —
+    /// e.g. <c>--Metrics:DumpPath=C:\swmcp\metrics.json</c> on the command
+    /// line, or the <c>Metrics__DumpPath</c> environment variable.
+    /// </summary>
+    /// <remarks>
+    /// Each dump replaces the file whole (written beside it, then moved over
+    /// it), so a reader never sees half a snapshot. A failed write is logged
+    /// and retried at the next interval — a malformed path included; it never
+    /// stops the server.
+    /// </remarks>
+    public sealed class MetricsDump : BackgroundService
+    {
+        public const int DefaultIntervalSeconds = 60;
+
+        private static readonly JsonSerializerOptions Json = new(JsonSerializerDefaults.Web) { WriteIndented = true };
+
+        private readonly ServerMetrics _metrics;
+        private readonly string _path;
+        private readonly TimeSpan _interval;
+        private readonly ILogger<MetricsDump> _logger;
+
+        public MetricsDump(ServerMetrics metrics, string path, TimeSpan interval, ILogger<MetricsDump> logger)
+        {
+            _metrics = metrics;
+            _path = path;
+            _interval = interval;
+            _logger = logger;
+        }
+
+        protected override async Task ExecuteAsync(CancellationToken stoppingToken)
+        {
+            using var timer = new PeriodicTimer(_interval);
+            try
+            {
+                while (await timer.WaitForNextTickAsync(stoppingToken))
+                {
+                    Write();
+                }
+            }
+            catch (OperationCanceledException)
+            {
+                // Shutting down; the final dump follows.
+            }
+
+            Write();
+        }
+
+        private void Write()
+        {
+            try
+            {
+                var temp = _path + ".tmp";
+                File.WriteAllText(temp, JsonSerializer.Serialize(_metrics.Snapshot(), Json));
+                File.Move(temp, _path, overwrite: true);
+            }
+            // ArgumentException and NotSupportedException are a malformed
+            // DumpPath (illegal characters, a stray ':'). It is logged like any
+            // other failed write rather than faulting the hosted service,
+            // which would stop the whole server.
+            catch (Exception ex) when (ex is IOException or UnauthorizedAccessException or ArgumentException or NotSupportedException)
+            {
+                _logger.LogWarning(ex, "Could not write server metrics to {Path}", _path);
+            }
+        }
+    }
+}
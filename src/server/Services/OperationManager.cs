@@ -12,7 +12,9 @@ namespace swmcp.server.Services
     /// its known gotcha: the seed is never copied into the persisted store, so
     /// it is re-read fresh from the shipped file on every start, while
     /// registered entries are never touched by that refresh (ADR 0001 §1,
-    /// "source").
+    /// "source"). Every recipe is held compiled (<see cref="CompiledRecipe"/>):
+    /// compiled when the seed loads and when <see cref="Register"/> accepts it,
+    /// never per call.
     /// </summary>
     public class OperationManager
     {
@@ -50,8 +52,8 @@ namespace swmcp.server.Services
         // state. 'volatile' on the field ensures a reader on another thread
         // observes the new reference promptly after the swap.
         private readonly object _writeLock = new();
-        private volatile Dictionary<string, OperationRecipe> _seed = new(StringComparer.OrdinalIgnoreCase);
-        private volatile Dictionary<string, OperationRecipe> _registered = new(StringComparer.OrdinalIgnoreCase);
+        private volatile Dictionary<string, CompiledRecipe> _seed = new(StringComparer.OrdinalIgnoreCase);
+        private volatile Dictionary<string, CompiledRecipe> _registered = new(StringComparer.OrdinalIgnoreCase);
 
         // H2: true when the registered-operations store existed but could not
         // be parsed and was quarantined rather than silently treated as empty.
@@ -110,7 +112,7 @@ namespace swmcp.server.Services
         {
             if (!File.Exists(_registeredPath))
             {
-                _registered = new Dictionary<string, OperationRecipe>(StringComparer.OrdinalIgnoreCase);
+                _registered = new Dictionary<string, CompiledRecipe>(StringComparer.OrdinalIgnoreCase);
                 _registeredStoreUnreadable = false;
                 return;
             }
@@ -139,7 +141,7 @@ namespace swmcp.server.Services
                         "corrupt file was left in place rather than risk overwriting it.");
                 }
 
-                _registered = new Dictionary<string, OperationRecipe>(StringComparer.OrdinalIgnoreCase);
+                _registered = new Dictionary<string, CompiledRecipe>(StringComparer.OrdinalIgnoreCase);
                 _registeredStoreUnreadable = true;
             }
         }
@@ -147,24 +149,24 @@ namespace swmcp.server.Services
         // Used for the seed, where "unreadable" degrades to "empty seed" with
         // a stderr line — acceptable because the seed is never the only copy
         // of anything (it ships in source control) and re-refreshes every start.
-        private static Dictionary<string, OperationRecipe> LoadFileBestEffort(string path, string source)
+        private static Dictionary<string, CompiledRecipe> LoadFileBestEffort(string path, string source)
         {
             try
             {
                 return File.Exists(path)
                     ? LoadFileOrThrow(path, source)
-                    : new Dictionary<string, OperationRecipe>(StringComparer.OrdinalIgnoreCase);
+                    : new Dictionary<string, CompiledRecipe>(StringComparer.OrdinalIgnoreCase);
             }
             catch (Exception ex)
             {
                 Console.Error.WriteLine($"Failed to load operations from '{path}': {ex.Message}");
-                return new Dictionary<string, OperationRecipe>(StringComparer.OrdinalIgnoreCase);
+                return new Dictionary<string, CompiledRecipe>(StringComparer.OrdinalIgnoreCase);
             }
         }
 
-        private static Dictionary<string, OperationRecipe> LoadFileOrThrow(string path, string source)
+        private static Dictionary<string, CompiledRecipe> LoadFileOrThrow(string path, string source)
         {
-            var result = new Dictionary<string, OperationRecipe>(StringComparer.OrdinalIgnoreCase);
+            var result = new Dictionary<string, CompiledRecipe>(StringComparer.OrdinalIgnoreCase);
             var file = JsonSerializer.Deserialize<OperationFile>(File.ReadAllText(path), JsonOptions)
                 ?? throw new InvalidDataException($"'{path}' did not deserialize to a valid operations file.");
 
@@ -176,14 +178,17 @@ namespace swmcp.server.Services
                 }
 
                 op.Source = source;
-                result[op.Name] = op;
+                result[op.Name] = CompiledRecipe.Compile(op);
             }
 
             return result;
         }
 
         /// <summary>Looks up an operation by name; registered entries shadow seed entries of the same name.</summary>
-        public OperationRecipe? Get(string name) =>
+        public OperationRecipe? Get(string name) => GetCompiled(name)?.Recipe;
+
+        /// <summary>As <see cref="Get"/>, in the compiled form <see cref="OperationRunner"/> executes.</summary>
+        public CompiledRecipe? GetCompiled(string name) =>
             _registered.TryGetValue(name, out var registered) ? registered :
             _seed.TryGetValue(name, out var seeded) ? seeded : null;
 
@@ -199,13 +204,13 @@ namespace swmcp.server.Services
             var seed = _seed;
             var registered = _registered;
 
-            var merged = new Dictionary<string, OperationRecipe>(seed, StringComparer.OrdinalIgnoreCase);
+            var merged = new Dictionary<string, CompiledRecipe>(seed, StringComparer.OrdinalIgnoreCase);
             foreach (var (name, recipe) in registered)
             {
                 merged[name] = recipe;
             }
 
-            return merged.Values.OrderBy(r => r.Name, StringComparer.OrdinalIgnoreCase).ToList();
+            return merged.Values.Select(c => c.Recipe).OrderBy(r => r.Name, StringComparer.OrdinalIgnoreCase).ToList();
         }
 
         /// <summary>Validates a recipe's shape against the closed v1 vocabulary. Never touches SolidWorks.</summary>
@@ -349,9 +354,9 @@ namespace swmcp.server.Services
 
             lock (_writeLock)
             {
-                var next = new Dictionary<string, OperationRecipe>(_registered, StringComparer.OrdinalIgnoreCase)
+                var next = new Dictionary<string, CompiledRecipe>(_registered, StringComparer.OrdinalIgnoreCase)
                 {
-                    [recipe.Name] = recipe,
+                    [recipe.Name] = CompiledRecipe.Compile(recipe),
                 };
                 Save(next);
                 _registered = next;
@@ -382,7 +387,7 @@ namespace swmcp.server.Services
                     return (false, reason);
                 }
 
-                var next = new Dictionary<string, OperationRecipe>(_registered, StringComparer.OrdinalIgnoreCase);
+                var next = new Dictionary<string, CompiledRecipe>(_registered, StringComparer.OrdinalIgnoreCase);
                 next.Remove(name);
                 Save(next);
                 _registered = next;
@@ -472,11 +477,11 @@ namespace swmcp.server.Services
         // mid-write, leaving truncated JSON that LoadRegistered would then have
         // to quarantine on the next start — atomicity here is what keeps that
         // quarantine path rare instead of routine. Callers hold _writeLock.
-        private void Save(Dictionary<string, OperationRecipe> registered)
+        private void Save(Dictionary<string, CompiledRecipe> registered)
         {
             try
             {
-                var file = new OperationFile { SchemaVersion = CurrentSchemaVersion, Operations = registered.Values.ToList() };
+                var file = new OperationFile { SchemaVersion = CurrentSchemaVersion, Operations = registered.Values.Select(c => c.Recipe).ToList() };
                 var temp = _registeredPath + ".tmp";
                 File.WriteAllText(temp, JsonSerializer.Serialize(file, JsonOptions));
                 File.Move(temp, _registeredPath, overwrite: true);
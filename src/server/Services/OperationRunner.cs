@@ -1,3 +1,4 @@
+using System.Diagnostics;
 using System.Runtime.InteropServices;
 using System.Text.Json;
 using SwBridge;
@@ -22,6 +23,67 @@ namespace swmcp.server.Services
         string DocumentName, bool InSketchMode, int FeatureCount, int SelectionCount,
         IReadOnlyList<SelectionInfo>? SelectedEntities);
 
+    /// <summary>
+    /// Which steps of a <see cref="OperationRunner.RunBatch"/> carry a
+    /// <see cref="DocumentStateSnapshot"/>. A snapshot is several COM reads —
+    /// plus <see cref="SelectionInspector.GetSelection"/>'s geometry reads
+    /// whenever something is selected — so a long sketch-building batch whose
+    /// caller only ever looks at the failing step should not pay for one per
+    /// step.
+    /// </summary>
+    public enum SnapshotPolicy
+    {
+        /// <summary>No step carries a snapshot, not even a failing one.</summary>
+        None,
+
+        /// <summary>Only the failing step (if any) carries a snapshot.</summary>
+        OnFailure,
+
+        /// <summary>The last step executed carries one: the failing step, or the final step of a batch that completed.</summary>
+        Final,
+
+        /// <summary>Every step carries one — the behavior before this option existed, and still <c>run_operation</c>'s.</summary>
+        EveryStep,
+    }
+
+    /// <summary>
+    /// When a batch pays for the forced rebuild behind each
+    /// <c>noNewRebuildErrors</c> verify check.
+    /// </summary>
+    public enum RebuildPolicy
+    {
+        /// <summary>Every step that declares the check rebuilds right after its invocation — the behavior before this option existed.</summary>
+        PerStep,
+
+        /// <summary>
+        /// Steps skip the check; one rebuild per document runs after the last
+        /// step (see <see cref="DeferredRebuild"/>), and its failure fails that
+        /// last step, naming the earliest feature in error and the step that
+        /// created it.
+        /// </summary>
+        Deferred,
+    }
+
+    /// <summary>
+    /// Batch-wide options for <see cref="OperationRunner.RunBatch"/> — the
+    /// knobs <c>run_operations</c> and <c>submit_operations</c> share.
+    /// </summary>
+    /// <param name="Snapshot">Which steps' results carry a <see cref="DocumentStateSnapshot"/>.</param>
+    /// <param name="SuspendUi">
+    /// Switch off graphics updates and feature-tree repaints on every document
+    /// the batch touches for the duration of the dispatch (see
+    /// <see cref="UiSuspension"/>), restoring them afterwards even when a step
+    /// fails. Recipes are untouched.
+    /// </param>
+    /// <param name="Rebuild">When <c>noNewRebuildErrors</c> checks rebuild — see <see cref="RebuildPolicy"/>.</param>
+    /// <param name="Timings">Attach each step's <see cref="StepTimings"/> to its result.</param>
+    public sealed record BatchOptions(
+        SnapshotPolicy Snapshot = SnapshotPolicy.EveryStep, bool SuspendUi = false, RebuildPolicy Rebuild = RebuildPolicy.PerStep,
+        bool Timings = false)
+    {
+        public static BatchOptions Default { get; } = new();
+    }
+
     /// <summary>
     /// Result of running one operation: never throws for a SolidWorks-side
     /// failure — see <see cref="Success"/>/<see cref="Error"/>.
@@ -34,9 +96,37 @@ namespace swmcp.server.Services
     /// 1000x unit error or a mistyped parameter visible in the transcript
     /// instead of merely absent from it.
     /// </param>
+    /// <param name="Revision">
+    /// The document's <see cref="DocumentRevisions"/> revision after this step —
+    /// already bumped when the step invoked a write. Pass it back to
+    /// <c>get_part_info</c>/<c>get_document_state</c> as <c>ifRevisionNot</c>
+    /// to skip re-reading a document nothing has touched since. Null when no
+    /// document was resolved.
+    /// </param>
+    /// <param name="RebuildFailure">Where a <see cref="RebuildPolicy.Deferred"/> batch's end-of-batch rebuild failed; set only on that batch's last step.</param>
+    /// <param name="Cancelled">
+    /// Marks a vectorized step stopped between items by
+    /// <see cref="OperationRunner.RunBatch"/>'s cancellation token: it is not
+    /// a success, and <paramref name="Return"/> carries the items that ran
+    /// before the stop.
+    /// </param>
+    /// <param name="Timings">The step's <see cref="StepTimings"/>; set only when the caller asked for them.</param>
     public sealed record OperationResult(
         bool Success, string? Error, object? Return, DocumentStateSnapshot? DocumentState,
-        IReadOnlyDictionary<string, object?>? BoundArgs);
+        IReadOnlyDictionary<string, object?>? BoundArgs, long? Revision = null, RebuildFailure? RebuildFailure = null,
+        bool Cancelled = false, StepTimings? Timings = null);
+
+    /// <summary>
+    /// One step of an <see cref="OperationRunner.RunBatch"/> plan.
+    /// <paramref name="DocumentName"/> overrides the batch-level document for
+    /// this step only; null falls back to it. A non-null
+    /// <paramref name="ArgsList"/> makes this a vectorized step — the recipe
+    /// applied once per argument set, see <see cref="OperationRunner.RunBatch"/>
+    /// — and <paramref name="Args"/> is then ignored.
+    /// </summary>
+    public sealed record BatchStep(
+        CompiledRecipe Recipe, IReadOnlyDictionary<string, JsonElement>? Args, string? DocumentName = null,
+        IReadOnlyList<IReadOnlyDictionary<string, JsonElement>?>? ArgsList = null);
 
     /// <summary>
     /// Executes one <see cref="OperationRecipe"/> against one document (or the
@@ -52,16 +142,44 @@ namespace swmcp.server.Services
     {
         private readonly SwConnection _connection;
         private readonly DocumentManager _documents;
-
-        public OperationRunner(SwConnection connection, DocumentManager documents)
+        private readonly DocumentIndex _index;
+        private readonly DocumentRevisions _revisions;
+        private readonly ComTargetCache _targets;
+        private readonly ServerMetrics _metrics;
+
+        public OperationRunner(
+            SwConnection connection, DocumentManager documents, DocumentIndex index, DocumentRevisions revisions,
+            ComTargetCache targets, ServerMetrics metrics)
         {
             _connection = connection;
             _documents = documents;
+            _index = index;
+            _revisions = revisions;
+            _targets = targets;
+            _metrics = metrics;
         }
 
-        /// <summary>Runs one operation, using <see cref="SwDispatcher.DefaultTimeout"/>.</summary>
-        public OperationResult Run(OperationRecipe recipe, string? documentName, IReadOnlyDictionary<string, JsonElement>? args) =>
-            _connection.Dispatcher.Run(() => RunUnsynchronized(recipe, documentName, args));
+        /// <summary>
+        /// Runs one operation, using <see cref="SwDispatcher.DefaultTimeout"/>.
+        /// With <paramref name="timings"/> the result carries its
+        /// <see cref="StepTimings"/>; <paramref name="queuedFor"/> is the time
+        /// the caller already spent waiting for its turn, counted into
+        /// <see cref="StepTimings.QueueWaitMs"/>.
+        /// </summary>
+        public OperationResult Run(
+            CompiledRecipe recipe, string? documentName, IReadOnlyDictionary<string, JsonElement>? args, bool timings = false,
+            TimeSpan queuedFor = default)
+        {
+            var dispatched = Stopwatch.GetTimestamp();
+            return _connection.Dispatcher.Run(() =>
+            {
+                var queueWait = queuedFor + Stopwatch.GetElapsedTime(dispatched);
+                var clock = new StepClock();
+                var result = RunUnsynchronized(recipe, documentName, args, clock);
+                _metrics.RecordStep(recipe.Name, clock);
+                return timings ? result with { Timings = clock.Timings(queueWait) } : result;
+            });
+        }
 
         /// <summary>
         /// Runs an ordered batch of operations as <b>one</b> unit of work on the
@@ -72,29 +190,181 @@ namespace swmcp.server.Services
         /// <see cref="OperationResult.Success"/> is false. <paramref name="timeout"/>
         /// should be generous — the whole batch shares it, not each step
         /// individually (the caller is expected to scale it with step count,
-        /// e.g. 120s + 30s/step).
+        /// e.g. 120s + 30s/step). <paramref name="options"/> carries the
+        /// batch-wide knobs (<see cref="BatchOptions"/>).
         /// </summary>
+        /// <remarks>
+        /// A step may name its own <see cref="BatchStep.DocumentName"/>, so one
+        /// batch can build several documents. Every document-scoped step's
+        /// document is resolved once, up front and inside the same dispatch, into
+        /// a <see cref="BatchDocuments"/> the steps then share. A step that
+        /// creates or renames a document (<c>new_part</c>, <c>save_as</c>)
+        /// clears it, so a later step can name the new part or the new title.
+        /// <para>
+        /// <paramref name="onStepCompleted"/> is invoked on the dispatcher thread
+        /// with each step's index and result the moment the step finishes —
+        /// which is how <see cref="JobManager"/> keeps a transcript that
+        /// survives this call timing out: a timed-out wait loses the returned
+        /// list, not the callbacks, since the batch itself keeps running on
+        /// the dispatcher.
+        /// </para>
+        /// <para>
+        /// <paramref name="cancellationToken"/> is checked before every step
+        /// and between the items of a vectorized step — never inside a COM
+        /// call, so the item already invoking always finishes. A batch stopped
+        /// between steps simply returns fewer results than it has steps; a
+        /// vectorized step stopped between items ends the list with a result
+        /// marked <see cref="OperationResult.Cancelled"/> whose return holds
+        /// the items that ran. Either way the dispatcher is free again within
+        /// one step (or item) of the cancellation, not one batch.
+        /// </para>
+        /// <para>
+        /// A step with an <see cref="BatchStep.ArgsList"/> applies its recipe to
+        /// every argument set in turn: the document, the <c>requires</c> checks
+        /// and the COM target are resolved once for the whole list, and only
+        /// binding, invocation and <c>verify</c> repeat per item. The step's
+        /// return is <c>{ count, items: [{ return, boundArgs }, ...] }</c>; the
+        /// first failing item fails the step, and the failure still carries
+        /// the items that ran before it.
+        /// </para>
+        /// <para>
+        /// Under <see cref="RebuildPolicy.Deferred"/> the deferred
+        /// <c>noNewRebuildErrors</c> checks run once the last step has
+        /// succeeded, before its snapshot is taken and its result reported; a
+        /// batch that stops early (a failing step, cancellation) never runs
+        /// them, and a cancelled vectorized step's error says so
+        /// (<see cref="DeferredChecksSkipped"/>).
+        /// </para>
+        /// <para>
+        /// Under <see cref="BatchOptions.Timings"/> every result carries its
+        /// <see cref="StepTimings"/> — the deferred rebuild counted into the
+        /// last step's verify, the up-front document lookup (and
+        /// <see cref="BatchOptions.SuspendUi"/>'s setup) into the first
+        /// step's resolveDocument — and the first step's queue wait adds
+        /// <paramref name="queuedFor"/>, the time the caller already spent
+        /// waiting for its turn.
+        /// </para>
+        /// </remarks>
         public IReadOnlyList<OperationResult> RunBatch(
-            IReadOnlyList<(OperationRecipe Recipe, IReadOnlyDictionary<string, JsonElement>? Args)> steps,
+            IReadOnlyList<BatchStep> steps,
             string? documentName,
-            TimeSpan timeout) =>
-            _connection.Dispatcher.Run(
+            TimeSpan timeout,
+            BatchOptions? options = null,
+            Action<int, OperationResult>? onStepCompleted = null,
+            CancellationToken cancellationToken = default,
+            TimeSpan queuedFor = default)
+        {
+            var dispatched = Stopwatch.GetTimestamp();
+            return _connection.Dispatcher.Run(
                 () =>
                 {
+                    var queueWait = queuedFor + Stopwatch.GetElapsedTime(dispatched);
+                    var firstClock = new StepClock();
+                    options ??= BatchOptions.Default;
+                    var snapshot = options.Snapshot;
+                    var deferredRebuild = options.Rebuild == RebuildPolicy.Deferred ? new DeferredRebuild() : null;
+                    var documents = new BatchDocuments(
+                        steps.Where(s => s.Recipe.IsDocumentScoped).Select(s => s.DocumentName ?? documentName),
+                        _index.Resolve);
+
+                    // Disposed (UI restored) when this lambda exits — after the
+                    // last step, after a failing one, and on an exception alike.
+                    using var suspension = options.SuspendUi ? UiSuspension.ForDocuments(documents.Documents) : null;
+
+                    var references = new StepReferences();
                     var results = new List<OperationResult>();
-                    foreach (var (recipe, args) in steps)
+                    for (var i = 0; i < steps.Count && !cancellationToken.IsCancellationRequested; i++)
                     {
-                        var result = RunUnsynchronized(recipe, documentName, args);
+                        var step = steps[i];
+                        var clock = i == 0 ? firstClock : new StepClock();
+                        Func<OperationResult, OperationResult>? finish = i == steps.Count - 1 && deferredRebuild != null
+                            ? last =>
+                            {
+                                if (!last.Success || !deferredRebuild.HasPending)
+                                {
+                                    return last;
+                                }
+
+                                var completed = CompleteDeferredRebuild(steps, results, last, deferredRebuild);
+                                clock.Lap(StepPhase.Verify);
+                                return completed;
+                            }
+                            : null;
+                        var result = RunUnsynchronized(
+                            step.Recipe, step.DocumentName ?? documentName, step.Args, clock, snapshot, isLastStep: i == steps.Count - 1,
+                            documents, references, stepIndex: i, step.ArgsList, deferredRebuild, cancellationToken, finish);
+                        if (result.Cancelled && deferredRebuild?.HasPending == true)
+                        {
+                            result = result with { Error = result.Error + DeferredChecksSkipped };
+                        }
+
+                        _metrics.RecordStep(step.Recipe.Name, clock);
+                        if (options.Timings)
+                        {
+                            result = result with { Timings = clock.Timings(i == 0 ? queueWait : null) };
+                        }
+
                         results.Add(result);
+                        references.Add(result);
+                        onStepCompleted?.Invoke(i, result);
                         if (!result.Success)
                         {
                             break;
                         }
+
+                        if (step.Recipe.ChangesOpenDocuments)
+                        {
+                            documents.Forget();
+                        }
                     }
 
                     return (IReadOnlyList<OperationResult>)results;
                 },
                 timeout);
+        }
+
+        /// <summary>
+        /// Appended to a cancelled batch's error when it deferred rebuild
+        /// checks: cancellation hands the dispatcher back without the
+        /// end-of-batch rebuild, so those checks never ran.
+        /// </summary>
+        internal const string DeferredChecksSkipped =
+            " No end-of-batch rebuild ran, so the steps' deferred noNewRebuildErrors checks were skipped.";
+
+        // Runs the batch's one coalesced rebuild and folds its outcome into the
+        // last step's result — the step at which the deferred checks are
+        // finally evaluated. Guarded like RunUnsynchronized: the steps already
+        // ran, so an exception here must become a failure, not lose them.
+        private static OperationResult CompleteDeferredRebuild(
+            IReadOnlyList<BatchStep> steps, List<OperationResult> results, OperationResult last, DeferredRebuild deferredRebuild)
+        {
+            RebuildFailure? failure;
+            try
+            {
+                failure = deferredRebuild.Run(results.Append(last).ToList());
+            }
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
+            {
+                return last with { Success = false, Error = $"noNewRebuildErrors (deferred): the end-of-batch rebuild could not run: {ex.Message}" };
+            }
+
+            if (failure == null)
+            {
+                return last;
+            }
+
+            var culprit = failure.Feature == null
+                ? "no feature reported an error code"
+                : $"the earliest feature in error is '{failure.Feature}' (swFeatureError_e {failure.ErrorCode})" +
+                  (failure.StepIndex is { } k ? $", created by step {k} ('{steps[k].Recipe.Name}')" : ", not created by any step of this batch");
+            return last with
+            {
+                Success = false,
+                Error = $"noNewRebuildErrors (deferred): the end-of-batch rebuild of '{failure.Document}' reported errors; {culprit}. " +
+                        "Every step ran; the document is left as they left it.",
+                RebuildFailure = failure,
+            };
+        }
 
         // Never lets an exception escape (defense for RunBatch: a raw throw here
         // would abort the whole batch's dispatch and lose every already-completed
@@ -103,56 +373,115 @@ namespace swmcp.server.Services
         // nested call) and DocumentManager.Resolve's new ambiguous-match throw;
         // COMException/InvalidComObjectException cover a COM call that faults
         // outside ComInvoker's own try/catch (e.g. while reading doc.Info).
+        //
+        // The snapshot is attached here, after the step has finished, and only
+        // when the batch's SnapshotPolicy asks for it — the step's StepProbes
+        // come back out of the core so that the snapshot still shares their
+        // post-invoke reads. 'finish' (the last step of a deferred-rebuild
+        // batch) folds the end-of-batch rebuild in first, so the policy sees
+        // the step's final outcome — a last step failed by the rebuild gets
+        // its onFailure snapshot — and the snapshot reads the document as the
+        // rebuild left it. Each phase is charged to the step's clock as it
+        // ends; the caller records the clock once the step is done.
         private OperationResult RunUnsynchronized(
-            OperationRecipe recipe, string? documentName, IReadOnlyDictionary<string, JsonElement>? args)
+            CompiledRecipe recipe, string? documentName, IReadOnlyDictionary<string, JsonElement>? args, StepClock clock,
+            SnapshotPolicy snapshot = SnapshotPolicy.EveryStep, bool isLastStep = true, BatchDocuments? documents = null,
+            StepReferences? references = null, int stepIndex = 0,
+            IReadOnlyList<IReadOnlyDictionary<string, JsonElement>?>? argsList = null, DeferredRebuild? deferredRebuild = null,
+            CancellationToken cancellationToken = default, Func<OperationResult, OperationResult>? finish = null)
         {
+            StepProbes? probes = null;
+            OperationResult result;
             try
             {
-                return RunUnsynchronizedCore(recipe, documentName, args);
+                result = argsList != null
+                    ? RunVectorizedCore(recipe, documentName, argsList, documents, references, stepIndex, deferredRebuild, clock, cancellationToken, out probes)
+                    : RunUnsynchronizedCore(recipe, documentName, args, documents, references, stepIndex, deferredRebuild, clock, out probes);
             }
             catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
             {
+                // Every cached target belonged to the SolidWorks that just went
+                // away; a restarted one hands out new models, so the entries
+                // could only ever age out — release them now instead.
+                if (ex is SwNotRunningException)
+                {
+                    _targets.Clear();
+                }
+
                 return Fail($"'{recipe.Name}' could not run: {ex.Message}");
             }
+
+            if (finish != null)
+            {
+                result = finish(result);
+            }
+
+            if (!WantsSnapshot(snapshot, result.Success, isLastStep))
+            {
+                return result;
+            }
+
+            clock.Skip();
+            result = result with { DocumentState = Snapshot(probes) };
+            clock.Lap(StepPhase.Snapshot);
+            return result;
         }
 
+        // Internal (not private) so swmcp.server.tests can pin the policy
+        // table without SolidWorks.
+        internal static bool WantsSnapshot(SnapshotPolicy policy, bool success, bool isLastStep) => policy switch
+        {
+            SnapshotPolicy.None => false,
+            SnapshotPolicy.OnFailure => !success,
+            SnapshotPolicy.Final => !success || isLastStep,
+            _ => true,
+        };
+
         private OperationResult RunUnsynchronizedCore(
-            OperationRecipe recipe, string? documentName, IReadOnlyDictionary<string, JsonElement>? args)
+            CompiledRecipe recipe, string? documentName, IReadOnlyDictionary<string, JsonElement>? args,
+            BatchDocuments? documents, StepReferences? references, int stepIndex, DeferredRebuild? deferredRebuild, StepClock clock,
+            out StepProbes? probes)
         {
-            var isDocumentScoped = string.Equals(recipe.Scope, "document", StringComparison.OrdinalIgnoreCase);
+            probes = null;
 
-            SwDocument? doc = null;
-            if (isDocumentScoped)
+            var (doc, documentError) = ResolveStepDocument(recipe, documentName, documents);
+            clock.Lap(StepPhase.ResolveDocument);
+            if (documentError != null)
             {
-                if (string.IsNullOrWhiteSpace(documentName))
-                {
-                    return Fail($"documentName is required for document-scoped operation '{recipe.Name}'. Open documents: {DescribeOpenDocuments()}");
-                }
+                return Fail(documentError);
+            }
+
+            probes = doc != null ? new StepProbes(doc, deferredRebuild) : null;
 
-                // DocumentManager.Resolve (SwBridge 0.5.0) throws SwBridgeException
-                // when documentName matches more than one open document, rather
-                // than silently picking the first enumerated — caught by
-                // RunUnsynchronized's wrapper above, reported the same way as any
-                // other refusal.
-                doc = _documents.Resolve(documentName);
-                if (doc == null)
+            // Inside a batch, {"$ref": "steps[k].return..."} args are replaced
+            // by the earlier step's value first; Bind then treats the resolved
+            // value exactly like a literal, so it lands in boundArgs too.
+            if (references != null)
+            {
+                var (resolvedArgs, referenceError) = references.Resolve(recipe.Recipe, args, stepIndex);
+                if (referenceError != null)
                 {
-                    return Fail($"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}");
+                    clock.Lap(StepPhase.Bind);
+                    return Fail(referenceError, probes);
                 }
+
+                args = resolvedArgs;
             }
 
             var (positional, boundArgs, bindError) = Bind(recipe, args);
+            clock.Lap(StepPhase.Bind);
             if (bindError != null)
             {
-                return Fail(bindError, doc);
+                return Fail(bindError, probes);
             }
 
-            if (doc != null)
+            if (probes != null)
             {
-                var (ok, requireError) = CheckRequires(recipe, doc);
+                var (ok, requireError) = CheckRequires(recipe, probes);
+                clock.Lap(StepPhase.Requires);
                 if (!ok)
                 {
-                    return Fail(requireError!, doc, boundArgs);
+                    return Fail(requireError!, probes, boundArgs);
                 }
             }
 
@@ -176,49 +505,251 @@ namespace swmcp.server.Services
             // Deliberate deviation from strict ComPath/ComInvoker dispatch for
             // this one recipe: scope "application" + member "NewPart" is a
             // reserved combination the runner special-cases.
-            if (string.Equals(recipe.Scope, "application", StringComparison.OrdinalIgnoreCase) &&
-                string.Equals(recipe.Member, "NewPart", StringComparison.OrdinalIgnoreCase))
+            if (recipe.IsNewPart)
+            {
+                var created = RunNewPart(recipe, positional, boundArgs, deferredRebuild, out probes);
+                clock.Lap(StepPhase.Invoke);
+                return created;
+            }
+
+            // sketch_bulk_insert: a whole packed entity list through one
+            // SketchManager with inference and redraw suspended — not one COM
+            // member, so (like new_part) a reserved target/member combination
+            // the runner special-cases. See RunSketchBulkInsert.
+            if (recipe.IsSketchBulkInsert && probes != null)
+            {
+                var inserted = RunSketchBulkInsert(recipe, probes, positional, boundArgs);
+                clock.Lap(StepPhase.Invoke);
+                return inserted;
+            }
+
+            var (target, targetError) = ResolveTarget(recipe, doc);
+            clock.Lap(StepPhase.Target);
+            if (targetError != null)
+            {
+                return Fail(targetError, probes, boundArgs);
+            }
+
+            var (converted, invokeError) = InvokeBound(recipe, doc, probes, target!, positional, clock);
+            return invokeError != null ? Fail(invokeError, probes, boundArgs) : Ok(converted, probes, boundArgs);
+        }
+
+        // The argsList form of a step (see RunBatch): everything that does not
+        // depend on the arguments — document, requires, the COM target — is
+        // done once; Bind/invoke/verify/convert run per item. Requires are
+        // checked once, before the first item, against the document as the
+        // step found it. Cancellation is checked before every item but the
+        // first — the step itself was only started because the token had not
+        // fired.
+        private OperationResult RunVectorizedCore(
+            CompiledRecipe recipe, string? documentName, IReadOnlyList<IReadOnlyDictionary<string, JsonElement>?> argsList,
+            BatchDocuments? documents, StepReferences? references, int stepIndex, DeferredRebuild? deferredRebuild,
+            StepClock clock, CancellationToken cancellationToken, out StepProbes? probes)
+        {
+            probes = null;
+
+            var (doc, documentError) = ResolveStepDocument(recipe, documentName, documents);
+            clock.Lap(StepPhase.ResolveDocument);
+            if (documentError != null)
+            {
+                return Fail(documentError);
+            }
+
+            probes = doc != null ? new StepProbes(doc, deferredRebuild) : null;
+
+            if (recipe.IsNewPart)
+            {
+                return Fail($"'{recipe.Name}' cannot take an argsList — it creates a document, one per step.", probes);
+            }
+
+            if (recipe.IsSketchBulkInsert)
+            {
+                return Fail($"'{recipe.Name}' cannot take an argsList — put every entity in one 'entities' list instead.", probes);
+            }
+
+            if (probes != null)
+            {
+                var (ok, requireError) = CheckRequires(recipe, probes);
+                clock.Lap(StepPhase.Requires);
+                if (!ok)
+                {
+                    return Fail(requireError!, probes);
+                }
+            }
+
+            var (target, targetError) = ResolveTarget(recipe, doc);
+            clock.Lap(StepPhase.Target);
+            if (targetError != null)
+            {
+                return Fail(targetError, probes);
+            }
+
+            var items = new List<object>(argsList.Count);
+            for (var k = 0; k < argsList.Count; k++)
+            {
+                if (k > 0 && cancellationToken.IsCancellationRequested)
+                {
+                    return new OperationResult(
+                        false,
+                        $"Cancelled after item {k - 1} of {argsList.Count} ('{recipe.Name}'). Items before it ran and were not rolled back.",
+                        new { count = items.Count, items },
+                        null,
+                        null,
+                        RevisionOf(probes?.Document),
+                        Cancelled: true);
+                }
+
+                var itemArgs = argsList[k];
+                if (references != null)
+                {
+                    var (resolvedArgs, referenceError) = references.Resolve(recipe.Recipe, itemArgs, stepIndex);
+                    if (referenceError != null)
+                    {
+                        clock.Lap(StepPhase.Bind);
+                        return ItemFail(recipe, k, argsList.Count, referenceError, items, probes, null);
+                    }
+
+                    itemArgs = resolvedArgs;
+                }
+
+                var (positional, boundArgs, bindError) = Bind(recipe, itemArgs);
+                clock.Lap(StepPhase.Bind);
+                if (bindError != null)
+                {
+                    return ItemFail(recipe, k, argsList.Count, bindError, items, probes, null);
+                }
+
+                // The probes are deliberately not reset between items: the
+                // previous item's post-invoke reads are exactly this item's
+                // pre-invoke values, so a per-item featureCountIncreased or
+                // sketchSegmentCountIncreased costs one probe read, not two.
+                var (converted, invokeError) = InvokeBound(recipe, doc, probes, target!, positional, clock);
+                if (invokeError != null)
+                {
+                    return ItemFail(recipe, k, argsList.Count, invokeError, items, probes, boundArgs);
+                }
+
+                items.Add(new { @return = converted, boundArgs });
+            }
+
+            return Ok(new { count = items.Count, items }, probes);
+        }
+
+        private OperationResult ItemFail(
+            CompiledRecipe recipe, int index, int count, string error, List<object> items, StepProbes? probes,
+            IReadOnlyDictionary<string, object?>? boundArgs) =>
+            new(
+                false,
+                $"Item {index} of {count} ('{recipe.Name}') failed: {error} Items before it ran and were not rolled back.",
+                new { count = items.Count, items },
+                null,
+                boundArgs,
+                RevisionOf(probes?.Document));
+
+        // Shared by both step forms. DocumentManager.Resolve (SwBridge 0.5.0)
+        // throws SwBridgeException when documentName matches more than one
+        // open document, rather than silently picking the first enumerated —
+        // caught by RunUnsynchronized's wrapper, reported the same way as any
+        // other refusal. Inside a batch the lookup (and any such throw) was
+        // done once up front; BatchDocuments replays it.
+        private (SwDocument? Document, string? Error) ResolveStepDocument(
+            CompiledRecipe recipe, string? documentName, BatchDocuments? documents)
+        {
+            if (!recipe.IsDocumentScoped)
             {
-                return RunNewPart(recipe, positional, boundArgs);
+                return (null, null);
             }
 
-            var root = doc != null ? (object)doc.Model : _connection.GetApp();
+            if (string.IsNullOrWhiteSpace(documentName))
+            {
+                return (null, $"documentName is required for document-scoped operation '{recipe.Name}'. Open documents: {DescribeOpenDocuments()}");
+            }
 
-            int? preFeatureCount = doc != null && recipe.Verify.Any(v => Is(v.Check, "featureCountIncreased"))
-                ? DocumentStateProbes.GetFeatureCount(doc.Model)
-                : null;
-            int? preSketchSegCount = doc != null && recipe.Verify.Any(v => Is(v.Check, "sketchSegmentCountIncreased"))
-                ? DocumentStateProbes.GetSketchSegmentCount(doc.Model)
-                : null;
+            var doc = documents != null ? documents.Resolve(documentName) : _index.Resolve(documentName);
+            return doc == null
+                ? (null, $"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}")
+                : (doc, null);
+        }
 
-            var pathResult = ComPath.Resolve(root, recipe.Target ?? "");
+        // Document-scoped targets go through ComTargetCache: most recipes aim
+        // at one of a handful of per-document managers, which then cost no
+        // COM call at all after the first step against that document.
+        private (object? Target, string? Error) ResolveTarget(CompiledRecipe recipe, SwDocument? doc)
+        {
+            var pathResult = doc != null
+                ? _targets.Resolve(doc.Model, recipe.Target ?? "")
+                : ComTargetCache.ResolveUncached(_connection.GetApp(), recipe.Target ?? "");
             if (!pathResult.Success)
             {
-                return Fail(
+                return (null,
                     $"Could not resolve target '{recipe.Target}' for '{recipe.Name}' (failed at " +
-                    $"'{pathResult.FailedSegment}': {pathResult.FailureDetail}). Use describe_com_members to discover valid dotted paths.",
-                    doc, boundArgs);
+                    $"'{pathResult.FailedSegment}': {pathResult.FailureDetail}). Use describe_com_members to discover valid dotted paths.");
             }
 
-            InvokeOutcome outcome = recipe.Kind.ToLowerInvariant() switch
+            return (pathResult.Value, null);
+        }
+
+        // One invocation of an already-bound recipe against an already-resolved
+        // target: pre-verify baselines, the COM call, the revision bump, verify,
+        // and return conversion. Returns the converted value, or the error the
+        // step should fail with. The baselines are charged to verify, the
+        // revision bump to invoke.
+        private (object? Return, string? Error) InvokeBound(
+            CompiledRecipe recipe, SwDocument? doc, StepProbes? probes, object target, object?[] positional, StepClock clock)
+        {
+            int? preFeatureCount = probes != null && recipe.NeedsPreFeatureCount ? probes.FeatureCount : null;
+            int? preSketchSegCount = probes != null && recipe.NeedsPreSketchSegmentCount ? probes.SketchSegmentCount : null;
+            clock.Lap(StepPhase.Verify);
+
+            InvokeOutcome outcome = recipe.Kind switch
             {
-                "method" => ComInvoker.InvokeMethod(pathResult.Value, recipe.Member, positional),
-                "propertyget" => ComInvoker.GetProperty(pathResult.Value, recipe.Member),
-                "propertyset" => ComInvoker.SetProperty(pathResult.Value, recipe.Member, positional.Length > 0 ? positional[0] : null),
-                _ => InvokeOutcome.Fail($"Unknown 'kind' value '{recipe.Kind}'."),
+                InvokeKind.Method => DispatchInvoker.InvokeMethod(target, recipe.Member, positional),
+                InvokeKind.PropertyGet => DispatchInvoker.GetProperty(target, recipe.Member),
+                InvokeKind.PropertySet => DispatchInvoker.SetProperty(target, recipe.Member, positional.Length > 0 ? positional[0] : null),
+                _ => InvokeOutcome.Fail($"Unknown 'kind' value '{recipe.Recipe.Kind}'."),
             };
 
+            // Bumped whether or not the invocation reported success: a COM
+            // call that faulted half-way can still have changed the document,
+            // and a spurious "changed" only costs a client one extra read,
+            // whereas a false "unchanged" would hand it stale data. A
+            // propertyGet is the one kind that is a read by construction.
+            if (doc != null && recipe.Kind != InvokeKind.PropertyGet)
+            {
+                _revisions.Bump(doc);
+            }
+
+            // No notification reports a save_as renaming the document, so the
+            // index would go on answering to the old title until MaxAge; this
+            // lets the next lookup find it by the new one. Like the bump, done
+            // whether or not the call reported success.
+            if (recipe.RenamesDocument)
+            {
+                _index.Invalidate();
+            }
+
+            clock.Lap(StepPhase.Invoke);
+
+            // Every probe read from here on (verify, then the snapshot every
+            // result carries) must see the document as the invocation left it;
+            // within that phase each probe is read once and shared, so e.g. the
+            // feature-tree walk behind featureCountIncreased also feeds the
+            // snapshot's FeatureCount instead of being repeated.
+            probes?.BeginPostInvoke();
+
             if (!outcome.Success)
             {
-                return Fail($"Invoking '{recipe.Member}' failed: {outcome.FailureDetail}", doc, boundArgs);
+                return (null, $"Invoking '{recipe.Member}' failed: {outcome.FailureDetail}");
             }
 
             var verifyFailures = new List<string>();
-            foreach (var v in recipe.Verify)
+            foreach (var (kind, v) in recipe.Verify)
             {
-                EvaluateVerify(v, doc, outcome, preFeatureCount, preSketchSegCount, verifyFailures);
+                EvaluateVerify(kind, v, probes, outcome, preFeatureCount, preSketchSegCount, verifyFailures);
             }
 
+            clock.Lap(StepPhase.Verify);
+
             // C2: never let a raw RCW leave the dispatch. ConvertReturn refuses
             // (and releases) anything it cannot safely convert, rather than
             // falling through to "return the raw value" — ownsReference is false
@@ -226,28 +757,152 @@ namespace swmcp.server.Services
             // model or the resolved invocation target, since those are shared
             // handles other code still holds (H4: releasing a shared RCW
             // disconnects it for every holder, permanently).
-            var ownsReference = !ReferenceEquals(outcome.Value, doc?.Model) && !ReferenceEquals(outcome.Value, pathResult.Value);
-            var (converted, convertError) = ConvertReturn(recipe.Returns, outcome.Value, ownsReference);
+            var ownsReference = !ReferenceEquals(outcome.Value, doc?.Model) && !ReferenceEquals(outcome.Value, target);
+            var (converted, convertError) = ConvertReturn(recipe.Returns, recipe.ReturnsType, outcome.Value, ownsReference);
+            clock.Lap(StepPhase.Convert);
             if (convertError != null)
             {
-                return Fail(convertError, doc, boundArgs);
+                return (null, convertError);
             }
 
             if (verifyFailures.Count > 0)
             {
-                return Fail(
+                return (null,
                     $"'{recipe.Name}' invoked without a COM error, but its declared post-conditions did not hold: " +
                     string.Join(" ", verifyFailures) +
                     " SolidWorks write APIs frequently report failure by returning Nothing/False rather than " +
-                    "throwing (ADR 0002); the document was left exactly as it is — no automatic rollback was attempted.",
-                    doc, boundArgs);
+                    "throwing (ADR 0002); the document was left exactly as it is — no automatic rollback was attempted.");
+            }
+
+            return (converted, null);
+        }
+
+        // SketchManager.AddToDB = true writes entities straight to the sketch
+        // database, skipping inferencing/snapping and the per-entity solve;
+        // DisplayWhenAdded = false and the view's EnableGraphicsUpdate = false
+        // stop the per-entity redraw. Those per-segment solve+redraw cycles are
+        // what make 500 create_line calls take minutes. UiSuspension restores
+        // all three to whatever they were before, whatever happens — a
+        // SolidWorks session left with AddToDB on silently stops snapping for
+        // the user afterwards. The whole list is parsed before the first
+        // insert; insertion stops at the first entity SolidWorks refuses. The
+        // return is the observed sketch-segment-count delta, and the recipe's
+        // sketchSegmentCountIncreased check (when it gives no explicit 'by')
+        // expects exactly the number of segments in the list.
+        private OperationResult RunSketchBulkInsert(
+            CompiledRecipe recipe, StepProbes probes, object?[] positional, IReadOnlyDictionary<string, object?> boundArgs)
+        {
+            var text = positional.Length > 0 ? positional[0] as string : null;
+            var metersPerUnit = positional.Length > 1 && positional[1] is double scale ? scale : 0.0;
+            if (metersPerUnit <= 0)
+            {
+                return Fail("'unit' must be a positive length, e.g. '1 mm' when the entity coordinates are in millimeters.", probes, boundArgs);
             }
 
-            return Ok(converted, doc, boundArgs);
+            if (!SketchEntityParser.TryParse(text, metersPerUnit, out var entities, out var parseError))
+            {
+                return Fail($"Nothing was inserted — {parseError}", probes, boundArgs);
+            }
+
+            var doc = probes.Document;
+            var (sketchManager, targetError) = ResolveTarget(recipe, doc);
+            if (targetError != null)
+            {
+                return Fail(targetError, probes, boundArgs);
+            }
+
+            var segmentCount = entities.Count(e => e.IsSegment);
+            var preSketchSegCount = probes.SketchSegmentCount;
+
+            string? insertError = null;
+            var inserted = 0;
+            object? activeView = null;
+            try
+            {
+                using var suspension = new UiSuspension();
+                suspension.Set(sketchManager!, "AddToDB", true);
+                suspension.Set(sketchManager!, "DisplayWhenAdded", false);
+                if (ComPath.Resolve(doc.Model, "ActiveView") is { Success: true } view)
+                {
+                    activeView = view.Value;
+                    suspension.Set(activeView, "EnableGraphicsUpdate", false);
+                    suspension.RedrawOnRestore(doc.Model);
+                }
+
+                foreach (var entity in entities)
+                {
+                    var outcome = InsertSketchEntity(sketchManager!, entity);
+                    if (!outcome.Success || outcome.Value == null)
+                    {
+                        insertError =
+                            $"entity {inserted} ({entity.Kind.ToString().ToLowerInvariant()}) was not created" +
+                            (outcome.Success ? " (SolidWorks returned nothing)." : $": {outcome.FailureDetail}");
+                        break;
+                    }
+
+                    // The created segment/point is not returned to the caller
+                    // (500 refs would dwarf the response); this call owns the
+                    // RCW and releases it straight away.
+                    ComLifetime.Release(outcome.Value);
+                    inserted++;
+                }
+            }
+            finally
+            {
+                // C2: this call resolved the view, so it releases it — after
+                // the suspension (disposed with the try block) has restored
+                // EnableGraphicsUpdate through it.
+                ComLifetime.Release(activeView);
+                _revisions.Bump(doc);
+                probes.BeginPostInvoke();
+            }
+
+            if (insertError != null)
+            {
+                return Fail(
+                    $"'{recipe.Name}' stopped: {insertError} The {inserted} entities before it were inserted and were not rolled back.",
+                    probes, boundArgs);
+            }
+
+            var delta = probes.SketchSegmentCount - preSketchSegCount;
+            var verifyFailures = new List<string>();
+            foreach (var (kind, v) in recipe.Verify)
+            {
+                var check = kind == VerifyKind.SketchSegmentCountIncreased && v.By == null
+                    ? new VerifyCheck { Check = v.Check, By = segmentCount }
+                    : v;
+                EvaluateVerify(kind, check, probes, InvokeOutcome.Ok(delta), preFeatureCount: null, preSketchSegCount, verifyFailures);
+            }
+
+            if (verifyFailures.Count > 0)
+            {
+                return Fail(
+                    $"'{recipe.Name}' inserted {inserted} entities ({segmentCount} segments) but its declared post-conditions did not hold: " +
+                    string.Join(" ", verifyFailures),
+                    probes, boundArgs);
+            }
+
+            return Ok(delta, probes, boundArgs);
+        }
+
+        private static InvokeOutcome InsertSketchEntity(object sketchManager, SketchEntity entity)
+        {
+            var v = entity.Values;
+            return entity.Kind switch
+            {
+                SketchEntityKind.Line => DispatchInvoker.InvokeMethod(sketchManager, "CreateLine", new object?[] { v[0], v[1], 0.0, v[2], v[3], 0.0 }),
+                SketchEntityKind.Arc => DispatchInvoker.InvokeMethod(
+                    sketchManager, "CreateArc", new object?[] { v[0], v[1], 0.0, v[2], v[3], 0.0, v[4], v[5], 0.0, entity.Direction }),
+                SketchEntityKind.Circle => DispatchInvoker.InvokeMethod(sketchManager, "CreateCircleByRadius", new object?[] { v[0], v[1], 0.0, v[2] }),
+                _ => DispatchInvoker.InvokeMethod(sketchManager, "CreatePoint", new object?[] { v[0], v[1], 0.0 }),
+            };
         }
 
-        private OperationResult RunNewPart(OperationRecipe recipe, object?[] positional, IReadOnlyDictionary<string, object?> boundArgs)
+        private OperationResult RunNewPart(
+            CompiledRecipe recipe, object?[] positional, IReadOnlyDictionary<string, object?> boundArgs, DeferredRebuild? deferredRebuild,
+            out StepProbes? probes)
         {
+            probes = null;
             string? templatePath = positional.Length > 0 && positional[0] is string s && !string.IsNullOrWhiteSpace(s) ? s : null;
             SwDocument newDoc;
             try
@@ -264,7 +919,13 @@ namespace swmcp.server.Services
                 return Fail($"new_part failed: {ex.Message}", boundArgs: boundArgs);
             }
 
+            // FileNewNotify2 normally marks the index stale already; this
+            // makes sure a step later in the same batch can name the new part
+            // even when the notification is lost.
+            _index.Invalidate();
             var info = newDoc.Info;
+            _revisions.Bump(newDoc);
+            probes = new StepProbes(newDoc, deferredRebuild);
             var dto = new { title = info.Title, path = info.Path, type = info.Type.ToString() };
 
             // M6: new_part previously returned Ok(...) unconditionally, skipping
@@ -273,30 +934,31 @@ namespace swmcp.server.Services
             // same way every other recipe's verify list is evaluated, so a
             // hand-registered variant of new_part with stricter verify is honored.
             var verifyFailures = new List<string>();
-            foreach (var v in recipe.Verify)
+            foreach (var (kind, v) in recipe.Verify)
             {
-                EvaluateVerify(v, newDoc, InvokeOutcome.Ok(dto), preFeatureCount: null, preSketchSegCount: null, verifyFailures);
+                EvaluateVerify(kind, v, probes, InvokeOutcome.Ok(dto), preFeatureCount: null, preSketchSegCount: null, verifyFailures);
             }
 
             if (verifyFailures.Count > 0)
             {
                 return Fail(
                     $"'new_part' created a document but its declared post-conditions did not hold: {string.Join(" ", verifyFailures)}",
-                    newDoc, boundArgs);
+                    probes, boundArgs);
             }
 
-            return Ok(dto, newDoc, boundArgs);
+            return Ok(dto, probes, boundArgs);
         }
 
         // ------------------------------------------------------------ requires
 
-        private static (bool Ok, string? Error) CheckRequires(OperationRecipe recipe, SwDocument doc)
+        private (bool Ok, string? Error) CheckRequires(CompiledRecipe recipe, StepProbes probes)
         {
-            foreach (var req in recipe.Requires)
+            var doc = probes.Document;
+            foreach (var (kind, req) in recipe.Requires)
             {
-                switch (req.Check.ToLowerInvariant())
+                switch (kind)
                 {
-                    case "documenttype":
+                    case RequireKind.DocumentType:
                     {
                         var actual = doc.Info.Type.ToString();
                         if (!string.Equals(actual, req.Value, StringComparison.OrdinalIgnoreCase))
@@ -307,25 +969,25 @@ namespace swmcp.server.Services
                         break;
                     }
 
-                    case "insketchmode":
-                        if (!DocumentStateProbes.IsInSketchMode(doc.Model))
+                    case RequireKind.InSketchMode:
+                        if (!probes.InSketchMode)
                         {
                             return (false, "Precondition 'inSketchMode' failed: no active sketch. Call 'insert_sketch' first.");
                         }
 
                         break;
 
-                    case "notinsketchmode":
-                        if (DocumentStateProbes.IsInSketchMode(doc.Model))
+                    case RequireKind.NotInSketchMode:
+                        if (probes.InSketchMode)
                         {
                             return (false, "Precondition 'notInSketchMode' failed: a sketch is currently being edited. Call 'exit_sketch' first.");
                         }
 
                         break;
 
-                    case "selectioncount":
+                    case RequireKind.SelectionCount:
                     {
-                        var count = DocumentStateProbes.GetSelectionCount(doc.Model);
+                        var count = probes.SelectionCount;
                         if (req.Min.HasValue && count < req.Min.Value)
                         {
                             return (false, $"Precondition 'selectionCount' failed: {count} entities selected, need at least {req.Min}. Call 'select_by_id' first.");
@@ -339,7 +1001,7 @@ namespace swmcp.server.Services
                         break;
                     }
 
-                    case "selectiontype":
+                    case RequireKind.SelectionType:
                     {
                         var (ok, detail) = CheckSelectionType(doc, req);
                         if (!ok)
@@ -364,20 +1026,20 @@ namespace swmcp.server.Services
         // 'req.Type', when present, is a swSelectType_e integer given as a
         // string — a documented simplification of the ADR's unspecified
         // selectionType(type, mark) shape (see OperationRecipe.cs remarks).
-        private static (bool Ok, string? Detail) CheckSelectionType(SwDocument doc, RequireCheck req)
+        private (bool Ok, string? Detail) CheckSelectionType(SwDocument doc, RequireCheck req)
         {
             if (!req.Mark.HasValue)
             {
                 return (false, "Precondition 'selectionType' is missing 'mark' in the recipe.");
             }
 
-            var pathResult = ComPath.Resolve(doc.Model, "SelectionManager");
-            if (!pathResult.Success)
+            var pathResult = _targets.Resolve(doc.Model, "SelectionManager");
+            if (pathResult is not { Success: true, Value: { } selectionManager })
             {
                 return (false, $"Precondition 'selectionType' could not resolve SelectionManager: {pathResult.FailureDetail}");
             }
 
-            var countOutcome = ComInvoker.InvokeMethod(pathResult.Value, "GetSelectedObjectCount2", new object?[] { req.Mark.Value });
+            var countOutcome = DispatchInvoker.InvokeMethod(selectionManager, "GetSelectedObjectCount2", new object?[] { req.Mark.Value });
             var count = countOutcome.Success && countOutcome.Value is int c ? c : 0;
             if (count < 1)
             {
@@ -386,7 +1048,7 @@ namespace swmcp.server.Services
 
             if (!string.IsNullOrWhiteSpace(req.Type) && int.TryParse(req.Type, out var expectedType))
             {
-                var typeOutcome = ComInvoker.InvokeMethod(pathResult.Value, "GetSelectedObjectType3", new object?[] { 1, req.Mark.Value });
+                var typeOutcome = DispatchInvoker.InvokeMethod(selectionManager, "GetSelectedObjectType3", new object?[] { 1, req.Mark.Value });
                 if (typeOutcome.Success && typeOutcome.Value is int actualType && actualType != expectedType)
                 {
                     return (false, $"Precondition 'selectionType' failed: selection at mark {req.Mark} has swSelectType_e {actualType}, expected {expectedType}.");
@@ -400,12 +1062,20 @@ namespace swmcp.server.Services
 
         // Internal (not private) so swmcp.server.tests can exercise verify
         // predicates — notably returnEquals — directly, without SolidWorks.
+        // Probes are read through the step's StepProbes (already in its
+        // post-invoke phase), so two checks reading the same probe — or a check
+        // and the snapshot — share one COM read.
         internal static void EvaluateVerify(
-            VerifyCheck v, SwDocument? doc, InvokeOutcome outcome, int? preFeatureCount, int? preSketchSegCount, List<string> failures)
+            VerifyCheck v, StepProbes? probes, InvokeOutcome outcome, int? preFeatureCount, int? preSketchSegCount, List<string> failures) =>
+            EvaluateVerify(CompiledRecipe.ParseVerify(v.Check), v, probes, outcome, preFeatureCount, preSketchSegCount, failures);
+
+        private static void EvaluateVerify(
+            VerifyKind kind, VerifyCheck v, StepProbes? probes, InvokeOutcome outcome, int? preFeatureCount, int? preSketchSegCount,
+            List<string> failures)
         {
-            switch (v.Check.ToLowerInvariant())
+            switch (kind)
             {
-                case "returnnotnull":
+                case VerifyKind.ReturnNotNull:
                     if (outcome.Value == null)
                     {
                         failures.Add("returnNotNull: the call returned null/nothing.");
@@ -413,7 +1083,7 @@ namespace swmcp.server.Services
 
                     break;
 
-                case "returntrue":
+                case VerifyKind.ReturnTrue:
                     if (outcome.Value is not bool b || !b)
                     {
                         failures.Add($"returnTrue: the call returned {Describe(outcome.Value)}, expected true.");
@@ -425,7 +1095,7 @@ namespace swmcp.server.Services
                 // a status code", so a successful SaveAs3 (which returns 0 =
                 // swFileSaveError_e success, not a bool) was reported as a
                 // verification failure despite writing a correct file to disk.
-                case "returnequals":
+                case VerifyKind.ReturnEquals:
                 {
                     if (v.Expected is not { } expected)
                     {
@@ -441,15 +1111,15 @@ namespace swmcp.server.Services
                     break;
                 }
 
-                case "featurecountincreased":
+                case VerifyKind.FeatureCountIncreased:
                 {
-                    if (doc == null || preFeatureCount == null)
+                    if (probes == null || preFeatureCount == null)
                     {
                         failures.Add("featureCountIncreased: no document to probe.");
                         break;
                     }
 
-                    var post = DocumentStateProbes.GetFeatureCount(doc.Model);
+                    var post = probes.FeatureCount;
                     var expectedBy = v.By ?? 1;
                     var actualBy = post - preFeatureCount.Value;
                     if (actualBy < expectedBy)
@@ -460,15 +1130,15 @@ namespace swmcp.server.Services
                     break;
                 }
 
-                case "sketchsegmentcountincreased":
+                case VerifyKind.SketchSegmentCountIncreased:
                 {
-                    if (doc == null || preSketchSegCount == null)
+                    if (probes == null || preSketchSegCount == null)
                     {
                         failures.Add("sketchSegmentCountIncreased: no document to probe.");
                         break;
                     }
 
-                    var post = DocumentStateProbes.GetSketchSegmentCount(doc.Model);
+                    var post = probes.SketchSegmentCount;
                     var expectedBy = v.By ?? 1;
                     var actualBy = post - preSketchSegCount.Value;
                     if (actualBy < expectedBy)
@@ -479,15 +1149,15 @@ namespace swmcp.server.Services
                     break;
                 }
 
-                case "sketchmodeis":
+                case VerifyKind.SketchModeIs:
                 {
-                    if (doc == null)
+                    if (probes == null)
                     {
                         failures.Add("sketchModeIs: no document to probe.");
                         break;
                     }
 
-                    var mode = DocumentStateProbes.IsInSketchMode(doc.Model);
+                    var mode = probes.InSketchMode;
                     var expected = v.Value ?? true;
                     if (mode != expected)
                     {
@@ -497,14 +1167,21 @@ namespace swmcp.server.Services
                     break;
                 }
 
-                case "nonewrebuilderrors":
-                    if (doc == null)
+                case VerifyKind.NoNewRebuildErrors:
+                    if (probes == null)
                     {
                         failures.Add("noNewRebuildErrors: no document to probe.");
                         break;
                     }
 
-                    if (!DocumentStateProbes.RebuildSucceeded(doc.Model))
+                    // A deferred batch rebuilds once after its last step instead.
+                    if (probes.DeferredRebuild != null)
+                    {
+                        probes.DeferredRebuild.Defer(probes.Document);
+                        break;
+                    }
+
+                    if (!probes.RebuildSucceeded)
                     {
                         failures.Add("noNewRebuildErrors: EditRebuild3 reported errors.");
                     }
@@ -539,27 +1216,52 @@ namespace swmcp.server.Services
 
         private static string Describe(object? v) => v switch { null => "null", bool bb => bb.ToString(), _ => v.ToString() ?? "?" };
 
-        private static bool Is(string check, string name) => string.Equals(check, name, StringComparison.OrdinalIgnoreCase);
-
         // -------------------------------------------------------------- bind
 
         // Internal (not private) so swmcp.server.tests can exercise the pure
         // argument-binding/unit-parsing logic directly, without SolidWorks.
+        // Compiles on every call — the runner itself only ever binds recipes
+        // OperationManager compiled once.
+        internal static (object?[] Positional, Dictionary<string, object?> BoundArgs, string? Error) Bind(
+            OperationRecipe recipe, IReadOnlyDictionary<string, JsonElement>? args) =>
+            Bind(CompiledRecipe.Compile(recipe), args);
+
         internal static (object?[] Positional, Dictionary<string, object?> BoundArgs, string? Error) Bind(
-            OperationRecipe recipe, IReadOnlyDictionary<string, JsonElement>? args)
+            CompiledRecipe recipe, IReadOnlyDictionary<string, JsonElement>? args)
         {
-            // Normalize to a case-insensitive lookup up front: the unknown-key
-            // check below matches param names case-insensitively, so the
-            // per-param retrieval must too, or a key that differs only in case
-            // (e.g. "Mark" for a declared "mark") would pass the unknown-key
-            // check as "known" and then silently miss its own lookup, falling
-            // back to the default anyway — the exact silent-default failure
-            // mode H3/B2 exists to prevent, just with an extra step. Args
-            // supplied over MCP are plain JSON object keys with no case
-            // convention guaranteed by any client.
-            var normalizedArgs = args is { Count: > 0 }
-                ? new Dictionary<string, JsonElement>(args, StringComparer.OrdinalIgnoreCase)
-                : null;
+            // Each supplied key is matched against the compiled,
+            // case-insensitive param index once, into a per-position slot: the
+            // unknown-key check below matches param names case-insensitively,
+            // so the per-param retrieval must too, or a key that differs only
+            // in case (e.g. "Mark" for a declared "mark") would pass the
+            // unknown-key check as "known" and then silently miss its own
+            // lookup, falling back to the default anyway — the exact
+            // silent-default failure mode H3/B2 exists to prevent, just with an
+            // extra step. Args supplied over MCP are plain JSON object keys
+            // with no case convention guaranteed by any client.
+            var supplied = new JsonElement?[recipe.Params.Count];
+            List<string>? unknown = null;
+            if (args != null)
+            {
+                foreach (var (key, value) in args)
+                {
+                    if (!recipe.ParamIndex.TryGetValue(key, out var index))
+                    {
+                        (unknown ??= new List<string>()).Add(key);
+                    }
+                    else if (supplied[index] != null)
+                    {
+                        return (
+                            Array.Empty<object?>(),
+                            new Dictionary<string, object?>(),
+                            $"Argument '{recipe.Params[index].Param.Name}' is given more than once (keys differing only in case).");
+                    }
+                    else
+                    {
+                        supplied[index] = value;
+                    }
+                }
+            }
 
             // H3 / UAT B2: a key in 'args' that names no declared param used to
             // be silently ignored. Since most params have defaults, a typo
@@ -568,30 +1270,25 @@ namespace swmcp.server.Services
             // warning anywhere — a valid-but-wrong feature reported as success.
             // Reject the whole call instead, naming the unknown key(s) and the
             // recipe's real param list.
-            if (normalizedArgs != null)
+            if (unknown != null)
             {
-                var declared = new HashSet<string>(recipe.Params.Select(p => p.Name), StringComparer.OrdinalIgnoreCase);
-                var unknown = normalizedArgs.Keys.Where(k => !declared.Contains(k)).ToList();
-                if (unknown.Count > 0)
-                {
-                    var declaredList = recipe.Params.Count > 0 ? string.Join(", ", recipe.Params.Select(p => p.Name)) : "(none)";
-                    return (
-                        Array.Empty<object?>(),
-                        new Dictionary<string, object?>(),
-                        $"Unknown argument(s) {string.Join(", ", unknown.Select(u => $"'{u}'"))} for operation '{recipe.Name}'. " +
-                        $"Declared params: {declaredList}. Call describe_operation for types, units and defaults.");
-                }
+                return (
+                    Array.Empty<object?>(),
+                    new Dictionary<string, object?>(),
+                    $"Unknown argument(s) {string.Join(", ", unknown.Select(u => $"'{u}'"))} for operation '{recipe.Name}'. " +
+                    $"Declared params: {recipe.DeclaredParamList}. Call describe_operation for types, units and defaults.");
             }
 
             var positional = new object?[recipe.Params.Count];
-            var boundArgs = new Dictionary<string, object?>();
+            var boundArgs = new Dictionary<string, object?>(recipe.Params.Count);
 
             for (var i = 0; i < recipe.Params.Count; i++)
             {
-                var p = recipe.Params[i];
-                var suppliedByCaller = normalizedArgs != null && normalizedArgs.ContainsKey(p.Name);
+                var compiled = recipe.Params[i];
+                var p = compiled.Param;
+                var suppliedByCaller = supplied[i] != null;
 
-                if (string.Equals(p.Type, "comNull", StringComparison.OrdinalIgnoreCase))
+                if (compiled.Kind == ParamKind.ComNull)
                 {
                     // A caller supplying a value for a comNull param has
                     // misunderstood something (it can only ever be a null COM
@@ -617,7 +1314,7 @@ namespace swmcp.server.Services
                 JsonElement? raw = null;
                 if (suppliedByCaller)
                 {
-                    raw = normalizedArgs![p.Name];
+                    raw = supplied[i];
                 }
                 else if (p.HasDefault)
                 {
@@ -636,7 +1333,7 @@ namespace swmcp.server.Services
                 // magnitude — select_by_ray's "radius": 0.0005 default, or
                 // select_by_id's "x": 0, would otherwise be rejected by the
                 // same gate that exists to catch a caller's silent 1000x error.
-                var (value, error) = ConvertParam(p, raw, requireUnit: suppliedByCaller);
+                var (value, error) = ConvertParam(compiled, raw, requireUnit: suppliedByCaller);
                 if (error != null)
                 {
                     return (Array.Empty<object?>(), new Dictionary<string, object?>(), $"Parameter '{p.Name}': {error}");
@@ -649,84 +1346,21 @@ namespace swmcp.server.Services
             return (positional, boundArgs, null);
         }
 
-        internal static (object? Value, string? Error) ConvertParam(OperationParam p, JsonElement? raw, bool requireUnit = true)
+        internal static (object? Value, string? Error) ConvertParam(OperationParam p, JsonElement? raw, bool requireUnit = true) =>
+            ConvertParam(new CompiledParam(p, CompiledRecipe.ParseParam(p.Type), CompiledRecipe.ConverterFor(p)), raw, requireUnit);
+
+        private static (object? Value, string? Error) ConvertParam(CompiledParam p, JsonElement? raw, bool requireUnit)
         {
             try
             {
-                switch (p.Type.ToLowerInvariant())
-                {
-                    case "bool":
-                        return (raw.HasValue ? (object)ToBool(raw.Value) : false, null);
-                    case "int":
-                    case "enum":
-                        return (raw.HasValue ? (object)ToInt(raw.Value) : 0, null);
-                    case "double":
-                        return (raw.HasValue ? (object)ToDouble(raw.Value) : 0.0, null);
-                    case "string":
-                        return (raw.HasValue ? ToStringValue(raw.Value) : "", null);
-                    case "length":
-                        if (!raw.HasValue)
-                        {
-                            return (0.0, null);
-                        }
-
-                        if (!requireUnit && raw.Value.ValueKind == JsonValueKind.Number)
-                        {
-                            return (raw.Value.GetDouble(), null); // recipe-authored default: already canonical SI (meters)
-                        }
-
-                        return UnitParser.TryParseLength(raw.Value, out var meters, out var lengthError)
-                            ? (meters, (string?)null)
-                            : ((object?)null, lengthError);
-                    case "angle":
-                        if (!raw.HasValue)
-                        {
-                            return (0.0, null);
-                        }
-
-                        if (!requireUnit && raw.Value.ValueKind == JsonValueKind.Number)
-                        {
-                            return (raw.Value.GetDouble(), null); // recipe-authored default: already canonical SI (radians)
-                        }
-
-                        return UnitParser.TryParseAngle(raw.Value, out var radians, out var angleError)
-                            ? (radians, (string?)null)
-                            : ((object?)null, angleError);
-                    default:
-                        return (null, $"Unknown parameter type '{p.Type}'.");
-                }
+                return p.Convert(raw, requireUnit);
             }
             catch (Exception ex)
             {
-                return (null, $"Could not convert value for type '{p.Type}': {ex.Message}");
+                return (null, $"Could not convert value for type '{p.Param.Type}': {ex.Message}");
             }
         }
 
-        private static bool ToBool(JsonElement e) => e.ValueKind switch
-        {
-            JsonValueKind.True => true,
-            JsonValueKind.False => false,
-            JsonValueKind.String => bool.Parse(e.GetString() ?? "false"),
-            JsonValueKind.Number => e.GetDouble() != 0,
-            _ => throw new FormatException($"Cannot interpret JSON {e.ValueKind} as bool."),
-        };
-
-        private static int ToInt(JsonElement e) => e.ValueKind switch
-        {
-            JsonValueKind.Number => e.TryGetInt32(out var i) ? i : (int)e.GetDouble(),
-            JsonValueKind.String => int.Parse(e.GetString() ?? "0", System.Globalization.CultureInfo.InvariantCulture),
-            _ => throw new FormatException($"Cannot interpret JSON {e.ValueKind} as int."),
-        };
-
-        private static double ToDouble(JsonElement e) => e.ValueKind switch
-        {
-            JsonValueKind.Number => e.GetDouble(),
-            JsonValueKind.String => double.Parse(e.GetString() ?? "0", System.Globalization.CultureInfo.InvariantCulture),
-            _ => throw new FormatException($"Cannot interpret JSON {e.ValueKind} as double."),
-        };
-
-        private static string ToStringValue(JsonElement e) => e.ValueKind == JsonValueKind.String ? e.GetString() ?? "" : e.ToString();
-
         // ------------------------------------------------------------ return
 
         // C2: the prior "_ => raw" fall-through (and the unconditional pass-
@@ -736,12 +1370,11 @@ namespace swmcp.server.Services
         // STA. Every branch here either converts to a plain DTO or refuses
         // (releasing the RCW first when this call owns it) — nothing but a
         // CLR primitive or a converter DTO ever leaves this method.
-        private static (object? Value, string? Error) ConvertReturn(ReturnsSpec? returns, object? raw, bool ownsReference)
+        private static (object? Value, string? Error) ConvertReturn(ReturnKind kind, string type, object? raw, bool ownsReference)
         {
-            var type = returns?.Type?.ToLowerInvariant() ?? "void";
-            switch (type)
+            switch (kind)
             {
-                case "void":
+                case ReturnKind.Void:
                     if (ownsReference)
                     {
                         ComLifetime.Release(raw);
@@ -749,10 +1382,10 @@ namespace swmcp.server.Services
 
                     return (null, null);
 
-                case "bool":
+                case ReturnKind.Bool:
                     return (raw is bool bb ? bb : raw != null && Convert.ToBoolean(raw), null);
 
-                case "number":
+                case ReturnKind.Number:
                     if (raw is null or IConvertible)
                     {
                         return (raw, null);
@@ -760,19 +1393,19 @@ namespace swmcp.server.Services
 
                     return Reject(raw, type, ownsReference);
 
-                case "string":
+                case ReturnKind.String:
                     return (raw as string, null);
 
-                case "feature":
+                case ReturnKind.Feature:
                     return (ResultConverters.ToFeatureRef(raw, ownsReference), null);
 
-                case "sketchsegment":
+                case ReturnKind.SketchSegment:
                     return (ResultConverters.ToSketchSegmentRef(raw, ownsReference), null);
 
-                case "sketchsegments":
+                case ReturnKind.SketchSegments:
                     return (ResultConverters.ToSketchSegmentRefs(ToObjectEnumerable(raw), ownsReference), null);
 
-                case "document":
+                case ReturnKind.Document:
                     return ToDocumentDto(raw, ownsReference);
 
                 default:
@@ -864,11 +1497,33 @@ namespace swmcp.server.Services
 
         // ----------------------------------------------------------- helpers
 
-        private static OperationResult Ok(object? ret, SwDocument? doc, IReadOnlyDictionary<string, object?>? boundArgs = null) =>
-            new(true, null, ret, Snapshot(doc), boundArgs);
+        // No DocumentState here: RunUnsynchronized attaches it once the step is
+        // over, according to the batch's SnapshotPolicy.
+        private OperationResult Ok(object? ret, StepProbes? probes, IReadOnlyDictionary<string, object?>? boundArgs = null) =>
+            new(true, null, ret, null, boundArgs, RevisionOf(probes?.Document));
 
-        private static OperationResult Fail(string error, SwDocument? doc = null, IReadOnlyDictionary<string, object?>? boundArgs = null) =>
-            new(false, error, null, Snapshot(doc), boundArgs);
+        private OperationResult Fail(string error, StepProbes? probes = null, IReadOnlyDictionary<string, object?>? boundArgs = null) =>
+            new(false, error, null, null, boundArgs, RevisionOf(probes?.Document));
+
+        // Guarded for the same reason as Snapshot below: doc.Info is a COM
+        // read, and a document a step just closed must not turn a clear
+        // failure report into an opaque exception.
+        private long? RevisionOf(SwDocument? doc)
+        {
+            if (doc == null)
+            {
+                return null;
+            }
+
+            try
+            {
+                return _revisions.Current(doc);
+            }
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
+            {
+                return null;
+            }
+        }
 
         // M5: the error path itself used to do unguarded COM work — a document
         // that a step just closed/invalidated (or a shared RCW disconnected by
@@ -876,16 +1531,21 @@ namespace swmcp.server.Services
         // carefully-worded ADR 0002 failure report with an opaque exception at
         // exactly the moment the user most needs to know their document state.
         // The snapshot is diagnostic only; never let it replace the real error.
-        private static DocumentStateSnapshot? Snapshot(SwDocument? doc)
+        // Reads through the step's StepProbes, so any probe verify already read
+        // in this phase is reused rather than repeated; a step refused before
+        // its invocation snapshots the pre-invoke values, which are still
+        // current because nothing was invoked.
+        private static DocumentStateSnapshot? Snapshot(StepProbes? probes)
         {
-            if (doc == null)
+            if (probes == null)
             {
                 return null;
             }
 
+            var doc = probes.Document;
             try
             {
-                var selectionCount = DocumentStateProbes.GetSelectionCount(doc.Model);
+                var selectionCount = probes.SelectionCount;
 
                 // Gap #1: only pay for SelectionInspector.GetSelection (which
                 // reads curve/surface/vertex geometry off every selected
@@ -898,8 +1558,8 @@ namespace swmcp.server.Services
 
                 return new DocumentStateSnapshot(
                     doc.Info.Title,
-                    DocumentStateProbes.IsInSketchMode(doc.Model),
-                    DocumentStateProbes.GetFeatureCount(doc.Model),
+                    probes.InSketchMode,
+                    probes.FeatureCount,
                     selectionCount,
                     selectedEntities);
             }
@@ -917,7 +1577,7 @@ namespace swmcp.server.Services
         {
             try
             {
-                return string.Join(", ", _documents.ListOpenDocuments().Select(d => $"{d.Title} ({d.Type})"));
+                return string.Join(", ", _index.ListOpenDocuments().Select(d => $"{d.Title} ({d.Type})"));
             }
             catch (Exception ex) when (ex is SwBridgeException or COMException)
             {
@@ -0,0 +1,112 @@
+using System.Collections.Concurrent;
+
+namespace swmcp.server.Services
+{
+    /// <summary>A cache's lookups; <see cref="HitRate"/> is null before the first one.</summary>
+    public sealed record CacheRate(long Hits, long Misses)
+    {
+        public double? HitRate => Hits + Misses == 0 ? null : Math.Round((double)Hits / (Hits + Misses), 4);
+    }
+
+    /// <summary>The <see cref="DispatchScheduler"/> gate, as <c>get_server_metrics</c> reports it.</summary>
+    /// <param name="QueueWait">Time from asking for the dispatcher to being granted it, per granted ticket.</param>
+    public sealed record DispatcherMetrics(int QueueDepth, long Admitted, long Rejected, LatencySummary QueueWait);
+
+    /// <summary>Every cache's counters, as <c>get_server_metrics</c> reports them.</summary>
+    public sealed record CacheMetrics(
+        CacheRate DispatchIds, long DispatchIdInvalidations, int DispatchIdCount,
+        CacheRate ComTargets, int ComTargetDocuments,
+        CacheRate FeatureData,
+        CacheRate AssemblyPages,
+        long FeatureDefinitionTypedReads, long FeatureDefinitionLateBoundReads, long FeatureDefinitionSkipped);
+
+    /// <summary>One <see cref="ServerMetrics.Snapshot"/>.</summary>
+    /// <param name="Tools">Per tool, the time each call held the dispatcher — its time on SolidWorks' STA thread.</param>
+    /// <param name="Recipes">Per recipe, then per <see cref="StepPhase"/> (e.g. <c>invoke</c>), each step's time in that phase.</param>
+    /// <param name="ComCalls">Per COM member invoked through <see cref="DispatchInvoker"/>, each call's round trip.</param>
+    public sealed record MetricsSnapshot(
+        DateTimeOffset Since, DateTimeOffset At, DispatcherMetrics Dispatcher,
+        IReadOnlyDictionary<string, LatencySummary> Tools,
+        IReadOnlyDictionary<string, IReadOnlyDictionary<string, LatencySummary>> Recipes,
+        IReadOnlyDictionary<string, LatencySummary> ComCalls,
+        CacheMetrics Caches);
+
+    /// <summary>
+    /// Where the server's time goes, for <c>get_server_metrics</c> and the
+    /// optional <see cref="MetricsDump"/>: the dispatcher queue, each tool's
+    /// time on the dispatcher, each recipe's phases, each COM member's round
+    /// trips, and every cache's hit rate.
+    /// </summary>
+    /// <remarks>
+    /// The latencies are recorded here, into <see cref="LatencyHistogram"/>s
+    /// that never lock; the queue and cache counters stay where they already
+    /// were, on each service, and are only read when a snapshot is taken.
+    /// <see cref="ComCalls"/> is static, for the reason
+    /// <see cref="DispatchIdCache.Shared"/> is: the <see cref="DispatchInvoker"/>
+    /// recording into it is static. Everything counts from process start;
+    /// nothing is reset.
+    /// </remarks>
+    public sealed class ServerMetrics
+    {
+        private readonly DispatchScheduler _scheduler;
+        private readonly ComTargetCache _targets;
+        private readonly FeatureDataCache _featureData;
+        private readonly FeatureDefinitionReader _definitions;
+        private readonly AssemblyTreeCache _assemblyTrees;
+        private readonly ConcurrentDictionary<string, LatencyTable> _recipes = new(StringComparer.OrdinalIgnoreCase);
+
+        public ServerMetrics(
+            DispatchScheduler scheduler, ComTargetCache targets, FeatureDataCache featureData, FeatureDefinitionReader definitions,
+            AssemblyTreeCache assemblyTrees)
+        {
+            _scheduler = scheduler;
+            _targets = targets;
+            _featureData = featureData;
+            _definitions = definitions;
+            _assemblyTrees = assemblyTrees;
+        }
+
+        /// <summary>Round trips of every COM member <see cref="DispatchInvoker"/> calls, by member name.</summary>
+        public static LatencyTable ComCalls { get; } = new();
+
+        public DateTimeOffset Since { get; } = DateTimeOffset.UtcNow;
+
+        /// <summary>
+        /// Time each tool call held the dispatcher, by tool name. A tool
+        /// starts its scope once its <see cref="DispatchTicket"/> is granted,
+        /// so queueing is not counted here but in the scheduler's
+        /// <see cref="DispatchScheduler.WaitTimes"/>.
+        /// </summary>
+        public LatencyTable Tools { get; } = new();
+
+        /// <summary>Records one finished step's phases under its recipe.</summary>
+        internal void RecordStep(string recipe, StepClock clock)
+        {
+            var phases = _recipes.GetOrAdd(recipe, _ => new LatencyTable());
+            foreach (var (phase, ticks) in clock.Phases())
+            {
+                phases.Record(StepClock.Name(phase), ticks);
+            }
+        }
+
+        public MetricsSnapshot Snapshot()
+        {
+            var dispatchIds = DispatchIdCache.Shared;
+            return new MetricsSnapshot(
+                Since,
+                DateTimeOffset.UtcNow,
+                new DispatcherMetrics(_scheduler.QueueDepth, _scheduler.Admitted, _scheduler.Rejected, _scheduler.WaitTimes.Summary()),
+                Tools.Summaries(),
+                _recipes
+                    .OrderBy(r => r.Key, StringComparer.OrdinalIgnoreCase)
+                    .ToDictionary(r => r.Key, r => r.Value.Summaries(), StringComparer.OrdinalIgnoreCase),
+                ComCalls.Summaries(),
+                new CacheMetrics(
+                    new CacheRate(dispatchIds.Hits, dispatchIds.Misses), dispatchIds.Invalidations, dispatchIds.Count,
+                    new CacheRate(_targets.Hits, _targets.Misses), _targets.Count,
+                    new CacheRate(_featureData.Reuses, _featureData.Reads),
+                    new CacheRate(_assemblyTrees.Hits, _assemblyTrees.Misses),
+                    _definitions.TypedReads, _definitions.LateBoundReads, _definitions.Skipped));
+        }
+    }
+}
@@ -0,0 +1,170 @@
+using System.Globalization;
+
+namespace swmcp.server.Services
+{
+    /// <summary>Kind of one entity in a <c>sketch_bulk_insert</c> list.</summary>
+    public enum SketchEntityKind
+    {
+        Line,
+        Arc,
+        Circle,
+        Point,
+    }
+
+    /// <summary>
+    /// One parsed entity, coordinates already scaled to meters. Layout of
+    /// <see cref="Values"/> by kind: line <c>x1 y1 x2 y2</c>; arc
+    /// <c>cx cy x1 y1 x2 y2</c> plus <see cref="Direction"/>; circle
+    /// <c>cx cy r</c>; point <c>x y</c>.
+    /// </summary>
+    public sealed record SketchEntity(SketchEntityKind Kind, double[] Values, short Direction = 1)
+    {
+        /// <summary>True for everything that becomes a sketch segment — i.e. everything but a point.</summary>
+        public bool IsSegment => Kind != SketchEntityKind.Point;
+    }
+
+    /// <summary>
+    /// Parses the packed entity list <c>sketch_bulk_insert</c> takes: one
+    /// entity per <c>;</c>- or newline-separated record, each a kind followed
+    /// by its numbers (separated by spaces and/or commas), all in the call's
+    /// <c>unit</c>:
+    /// <list type="bullet">
+    /// <item><c>L x1 y1 x2 y2</c> — line</item>
+    /// <item><c>A cx cy x1 y1 x2 y2 [dir]</c> — arc from (x1,y1) to (x2,y2) around (cx,cy); dir 1 = counter-clockwise (default), -1 = clockwise</item>
+    /// <item><c>C cx cy r</c> — circle</item>
+    /// <item><c>P x y</c> — point</item>
+    /// </list>
+    /// Kinds are case-insensitive and may be spelled out (<c>line</c>,
+    /// <c>arc</c>, <c>circle</c>, <c>point</c>). A 500-segment DXF-derived
+    /// profile is a few kilobytes of text this way, versus 500 JSON argument
+    /// objects.
+    /// </summary>
+    /// <remarks>
+    /// The whole list is parsed before anything is inserted, so a typo in
+    /// entity 480 refuses the call instead of leaving 479 entities behind.
+    /// The unit is a scale factor rather than a per-number suffix: the
+    /// numbers are a drawing's coordinates, and B1's concern — a bare number
+    /// silently meaning meters — is met by requiring the one explicit
+    /// <c>unit</c> that applies to all of them.
+    /// </remarks>
+    public static class SketchEntityParser
+    {
+        private static readonly char[] RecordSeparators = { ';', '\n', '\r' };
+        private static readonly char[] ValueSeparators = { ' ', '\t', ',' };
+
+        private const string EmptyList = "entities is empty — give at least one record, e.g. 'L 0 0 10 0; C 5 5 2'.";
+
+        public static bool TryParse(string? text, double metersPerUnit, out List<SketchEntity> entities, out string? error)
+        {
+            entities = new List<SketchEntity>();
+            error = null;
+
+            if (string.IsNullOrWhiteSpace(text))
+            {
+                error = EmptyList;
+                return false;
+            }
+
+            var records = text.Split(RecordSeparators, StringSplitOptions.RemoveEmptyEntries | StringSplitOptions.TrimEntries);
+            for (var i = 0; i < records.Length; i++)
+            {
+                // A record of separators only (e.g. "L 0 0 1 1; ,") is as
+                // blank as an empty one, and skipped the same way.
+                var tokens = records[i].Split(ValueSeparators, StringSplitOptions.RemoveEmptyEntries);
+                if (tokens.Length == 0)
+                {
+                    continue;
+                }
+
+                if (!TryParseRecord(tokens, metersPerUnit, out var entity, out var recordError))
+                {
+                    error = $"entity {entities.Count} ('{records[i]}'): {recordError}";
+                    entities.Clear();
+                    return false;
+                }
+
+                entities.Add(entity!);
+            }
+
+            if (entities.Count == 0)
+            {
+                error = EmptyList;
+                return false;
+            }
+
+            return true;
+        }
+
+        private static bool TryParseRecord(string[] tokens, double scale, out SketchEntity? entity, out string? error)
+        {
+            entity = null;
+            error = null;
+
+            SketchEntityKind kind;
+            int minValues, maxValues;
+            switch (tokens[0].ToLowerInvariant())
+            {
+                case "l":
+                case "line":
+                    (kind, minValues, maxValues) = (SketchEntityKind.Line, 4, 4);
+                    break;
+                case "a":
+                case "arc":
+                    (kind, minValues, maxValues) = (SketchEntityKind.Arc, 6, 7);
+                    break;
+                case "c":
+                case "circle":
+                    (kind, minValues, maxValues) = (SketchEntityKind.Circle, 3, 3);
+                    break;
+                case "p":
+                case "point":
+                    (kind, minValues, maxValues) = (SketchEntityKind.Point, 2, 2);
+                    break;
+                default:
+                    error = $"unknown kind '{tokens[0]}' — use L (line), A (arc), C (circle) or P (point).";
+                    return false;
+            }
+
+            var count = tokens.Length - 1;
+            if (count < minValues || count > maxValues)
+            {
+                var expected = minValues == maxValues ? $"{minValues}" : $"{minValues} or {maxValues}";
+                error = $"{kind.ToString().ToLowerInvariant()} takes {expected} numbers, got {count}.";
+                return false;
+            }
+
+            var values = new double[Math.Min(count, minValues)];
+            for (var i = 0; i < values.Length; i++)
+            {
+                if (!double.TryParse(tokens[i + 1], NumberStyles.Float, CultureInfo.InvariantCulture, out var v) || !double.IsFinite(v))
+                {
+                    error = $"'{tokens[i + 1]}' is not a number.";
+                    return false;
+                }
+
+                values[i] = v * scale;
+            }
+
+            short direction = 1;
+            if (count == 7)
+            {
+                if (tokens[7] is not ("1" or "+1" or "-1"))
+                {
+                    error = $"arc direction must be 1 (counter-clockwise) or -1 (clockwise), got '{tokens[7]}'.";
+                    return false;
+                }
+
+                direction = tokens[7] == "-1" ? (short)-1 : (short)1;
+            }
+
+            if (kind == SketchEntityKind.Circle && values[2] <= 0)
+            {
+                error = "circle radius must be positive.";
+                return false;
+            }
+
+            entity = new SketchEntity(kind, values, direction);
+            return true;
+        }
+    }
+}
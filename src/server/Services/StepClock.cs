@@ -0,0 +1,102 @@
+using System.Diagnostics;
+
+namespace swmcp.server.Services
+{
+    /// <summary>The phases of one <see cref="OperationRunner"/> step, in the order they run.</summary>
+    public enum StepPhase
+    {
+        /// <summary>Finding the step's document (or replaying the batch's up-front lookup).</summary>
+        ResolveDocument,
+
+        /// <summary>Resolving <c>$ref</c>s and binding named args to the positional array.</summary>
+        Bind,
+
+        /// <summary>The recipe's <c>requires</c> checks.</summary>
+        Requires,
+
+        /// <summary>Resolving the COM target path (from <see cref="ComTargetCache"/> when possible).</summary>
+        Target,
+
+        /// <summary>The COM call itself.</summary>
+        Invoke,
+
+        /// <summary>Pre-verify baselines and the <c>verify</c> checks, including a <c>noNewRebuildErrors</c> rebuild.</summary>
+        Verify,
+
+        /// <summary>Converting the return value to a DTO.</summary>
+        Convert,
+
+        /// <summary>The result's <see cref="DocumentStateSnapshot"/>.</summary>
+        Snapshot,
+    }
+
+    /// <summary>
+    /// One step's time per <see cref="StepPhase"/>, in milliseconds — what a
+    /// result carries under <c>timings: true</c>. A phase the step never
+    /// reached is null; <see cref="TotalMs"/> is the sum of the ones it did.
+    /// </summary>
+    /// <param name="QueueWaitMs">
+    /// Time between the request arriving at the dispatcher gate and the
+    /// dispatcher starting its work: its wait for a turn, then SolidWorks'
+    /// dispatcher picking the call up. Only the first step of a batch waits;
+    /// the others ran straight after the step before and report null.
+    /// </param>
+    /// <param name="VerifyMs">The pre-invoke baselines and <c>verify</c>, including a <c>noNewRebuildErrors</c> rebuild.</param>
+    /// <param name="SnapshotMs">The <c>documentState</c> reads, selected-entity descriptors included.</param>
+    public sealed record StepTimings(
+        double? QueueWaitMs, double? ResolveDocumentMs, double? BindMs, double? RequiresMs, double? TargetMs, double? InvokeMs,
+        double? VerifyMs, double? ConvertMs, double? SnapshotMs, double TotalMs);
+
+    /// <summary>
+    /// Where one step's time went, phase by phase. The runner calls
+    /// <see cref="Lap"/> as each phase ends, and the time since the previous
+    /// lap is added to that phase — so a vectorized step's phases sum over
+    /// its items, and a phase the step never reached (a bind error stops
+    /// before <see cref="StepPhase.Requires"/>) is absent rather than zero.
+    /// Lives for one step on the dispatcher thread, like
+    /// <see cref="StepProbes"/>; never shared, never locked.
+    /// </summary>
+    internal sealed class StepClock
+    {
+        private readonly long[] _ticks = new long[Enum.GetValues<StepPhase>().Length];
+        private readonly bool[] _reached = new bool[Enum.GetValues<StepPhase>().Length];
+        private long _last = Stopwatch.GetTimestamp();
+
+        /// <summary>Charges the time since the previous lap to <paramref name="phase"/>.</summary>
+        public void Lap(StepPhase phase)
+        {
+            var now = Stopwatch.GetTimestamp();
+            _ticks[(int)phase] += now - _last;
+            _reached[(int)phase] = true;
+            _last = now;
+        }
+
+        /// <summary>Starts the next lap now, so time spent between phases is charged to none of them.</summary>
+        public void Skip() => _last = Stopwatch.GetTimestamp();
+
+        /// <summary>Every phase the step reached, in order, with its <see cref="Stopwatch"/> ticks.</summary>
+        public IEnumerable<(StepPhase Phase, long Ticks)> Phases() =>
+            Enum.GetValues<StepPhase>().Where(p => _reached[(int)p]).Select(p => (p, _ticks[(int)p]));
+
+        /// <summary>The phases as a result's <see cref="StepTimings"/>, with <paramref name="queueWait"/> when the step waited.</summary>
+        public StepTimings Timings(TimeSpan? queueWait)
+        {
+            double? Ms(StepPhase phase) => _reached[(int)phase] ? Round(LatencyHistogram.ToMs(_ticks[(int)phase])) : null;
+
+            return new StepTimings(
+                queueWait is { } wait ? Round(wait.TotalMilliseconds) : null,
+                Ms(StepPhase.ResolveDocument), Ms(StepPhase.Bind), Ms(StepPhase.Requires), Ms(StepPhase.Target),
+                Ms(StepPhase.Invoke), Ms(StepPhase.Verify), Ms(StepPhase.Convert), Ms(StepPhase.Snapshot),
+                Round(LatencyHistogram.ToMs(Phases().Sum(p => p.Ticks))));
+        }
+
+        /// <summary>A phase's name as responses spell it, e.g. <c>resolveDocument</c>.</summary>
+        public static string Name(StepPhase phase)
+        {
+            var name = phase.ToString();
+            return char.ToLowerInvariant(name[0]) + name[1..];
+        }
+
+        private static double Round(double ms) => Math.Round(ms, 3);
+    }
+}
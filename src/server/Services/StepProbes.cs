@@ -0,0 +1,68 @@
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// One step's memo of <see cref="DocumentStateProbes"/> reads, so each
+    /// probe runs at most once per phase instead of once per consumer. A step
+    /// has two phases: everything before the invocation (<c>requires</c> and
+    /// the pre-verify baselines) reads the document as it was, everything after
+    /// it (<c>verify</c> and the result's <see cref="DocumentStateSnapshot"/>)
+    /// reads it as the invocation left it — <see cref="BeginPostInvoke"/> is the
+    /// boundary.
+    /// </summary>
+    /// <remarks>
+    /// The payoff is <see cref="FeatureCount"/>: every call walks the whole
+    /// feature tree, and a feature-creating step used to pay for that walk
+    /// three times (pre-verify baseline, <c>featureCountIncreased</c>, snapshot)
+    /// where two now suffice. Lives only for the duration of one step on the
+    /// dispatcher thread — never shared, never locked.
+    /// </remarks>
+    internal sealed class StepProbes
+    {
+        private bool? _inSketchMode;
+        private int? _selectionCount;
+        private int? _featureCount;
+        private int? _sketchSegmentCount;
+        private bool? _rebuildSucceeded;
+
+        public StepProbes(SwDocument document, DeferredRebuild? deferredRebuild = null)
+        {
+            Document = document;
+            DeferredRebuild = deferredRebuild;
+        }
+
+        public SwDocument Document { get; }
+
+        /// <summary>
+        /// Non-null in a <see cref="RebuildPolicy.Deferred"/> batch: a
+        /// <c>noNewRebuildErrors</c> check hands the document here instead of
+        /// reading <see cref="RebuildSucceeded"/>.
+        /// </summary>
+        public DeferredRebuild? DeferredRebuild { get; }
+
+        public bool InSketchMode => _inSketchMode ??= DocumentStateProbes.IsInSketchMode(Document.Model);
+
+        public int SelectionCount => _selectionCount ??= DocumentStateProbes.GetSelectionCount(Document.Model);
+
+        public int FeatureCount => _featureCount ??= DocumentStateProbes.GetFeatureCount(Document.Model);
+
+        public int SketchSegmentCount => _sketchSegmentCount ??= DocumentStateProbes.GetSketchSegmentCount(Document.Model);
+
+        /// <summary>
+        /// Forces <c>EditRebuild3</c> the first time it is read in a phase —
+        /// a recipe listing <c>noNewRebuildErrors</c> twice still rebuilds once.
+        /// </summary>
+        public bool RebuildSucceeded => _rebuildSucceeded ??= DocumentStateProbes.RebuildSucceeded(Document.Model);
+
+        /// <summary>Forgets every pre-invocation value: the next read of each probe sees the document as the invocation left it.</summary>
+        public void BeginPostInvoke()
+        {
+            _inSketchMode = null;
+            _selectionCount = null;
+            _featureCount = null;
+            _sketchSegmentCount = null;
+            _rebuildSucceeded = null;
+        }
+    }
+}
@@ -0,0 +1,188 @@
+using System.Globalization;
+using System.Text.Json;
+using System.Text.RegularExpressions;
+using swmcp.server.Models;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Step-to-step dataflow inside one <see cref="OperationRunner.RunBatch"/>:
+    /// an argument written as <c>{"$ref": "steps[3].return.name"}</c> is
+    /// replaced, just before its step binds, by that value out of an earlier
+    /// step's converted <see cref="OperationResult.Return"/> — so a plan can
+    /// <c>select_by_id</c> the feature <c>extrude_boss</c> just created without
+    /// splitting the batch around a client round trip. The resolved value then
+    /// binds exactly like a literal would and shows up in
+    /// <see cref="OperationResult.BoundArgs"/>.
+    /// </summary>
+    /// <remarks>
+    /// Path grammar: <c>steps[k].return</c> followed by any number of
+    /// <c>.member</c> / <c>[index]</c> segments. <c>k</c> must name an earlier
+    /// step; member names match case-insensitively (a DTO serializes as
+    /// <c>Name</c> here but reaches the client as <c>name</c>). Only returns
+    /// are addressable — never the live COM objects behind them, which have
+    /// already been converted and released (C2) by the time the next step runs.
+    /// A resolved number bound to a <c>length</c>/<c>angle</c> param is taken
+    /// as canonical SI, the same trust a recipe's own default gets: it is a
+    /// value this server produced, not a client's guess at a magnitude (B1).
+    /// Lives for one batch on the dispatcher thread — never shared.
+    /// </remarks>
+    internal sealed class StepReferences
+    {
+        private const string RefKey = "$ref";
+
+        private static readonly Regex PathPattern = new(
+            @"^\s*steps\[(?<step>[0-9]+)\]\.return(?<rest>(?:\.[A-Za-z_][A-Za-z0-9_]*|\[[0-9]+\])*)\s*$",
+            RegexOptions.Compiled);
+
+        private static readonly Regex SegmentPattern = new(@"\.(?<member>[A-Za-z_][A-Za-z0-9_]*)|\[(?<index>[0-9]+)\]", RegexOptions.Compiled);
+
+        private readonly List<OperationResult> _results = new();
+        private readonly Dictionary<int, JsonElement> _serializedReturns = new();
+
+        /// <summary>Records the next step's result, making its return addressable by later steps.</summary>
+        public void Add(OperationResult result) => _results.Add(result);
+
+        /// <summary>True when any of <paramref name="args"/> is a <c>$ref</c> — the common no-reference step skips resolution entirely.</summary>
+        public static bool HasReferences(IReadOnlyDictionary<string, JsonElement>? args) =>
+            args != null && args.Values.Any(IsReference);
+
+        /// <summary>
+        /// Returns <paramref name="args"/> with every <c>$ref</c> replaced by the
+        /// value it points at, or an error naming the first reference that does
+        /// not resolve. <paramref name="stepIndex"/> is the index of the step
+        /// being bound; a reference may only point at a step before it.
+        /// </summary>
+        public (IReadOnlyDictionary<string, JsonElement>? Args, string? Error) Resolve(
+            OperationRecipe recipe, IReadOnlyDictionary<string, JsonElement>? args, int stepIndex)
+        {
+            if (!HasReferences(args))
+            {
+                return (args, null);
+            }
+
+            var resolved = new Dictionary<string, JsonElement>(StringComparer.OrdinalIgnoreCase);
+            foreach (var (name, value) in args!)
+            {
+                if (!IsReference(value))
+                {
+                    resolved[name] = value;
+                    continue;
+                }
+
+                var path = value.GetProperty(RefKey).GetString() ?? "";
+                var (target, error) = Evaluate(path, stepIndex);
+                if (error != null)
+                {
+                    return (null, $"Argument '{name}': reference '{path}' {error}");
+                }
+
+                resolved[name] = AsSiQuantity(recipe, name, target);
+            }
+
+            return (resolved, null);
+        }
+
+        private static bool IsReference(JsonElement value) =>
+            value.ValueKind == JsonValueKind.Object &&
+            value.TryGetProperty(RefKey, out var path) &&
+            path.ValueKind == JsonValueKind.String &&
+            value.EnumerateObject().Count() == 1;
+
+        private (JsonElement Value, string? Error) Evaluate(string path, int stepIndex)
+        {
+            var match = PathPattern.Match(path);
+            if (!match.Success)
+            {
+                return (default, "is not of the form 'steps[<index>].return[.member|[n]]...'.");
+            }
+
+            if (!int.TryParse(match.Groups["step"].Value, NumberStyles.None, CultureInfo.InvariantCulture, out var source) ||
+                source >= stepIndex)
+            {
+                return (default, $"must point at an earlier step (this is step {stepIndex}).");
+            }
+
+            if (source >= _results.Count)
+            {
+                return (default, $"points at step {source}, which has not run.");
+            }
+
+            var current = SerializedReturn(source);
+            foreach (Match segment in SegmentPattern.Matches(match.Groups["rest"].Value))
+            {
+                if (segment.Groups["member"].Success)
+                {
+                    var member = segment.Groups["member"].Value;
+                    if (current.ValueKind != JsonValueKind.Object ||
+                        !TryGetPropertyIgnoreCase(current, member, out current))
+                    {
+                        return (default, $"does not resolve: step {source}'s return has no member '{member}' there.");
+                    }
+                }
+                else
+                {
+                    var index = int.Parse(segment.Groups["index"].Value, CultureInfo.InvariantCulture);
+                    if (current.ValueKind != JsonValueKind.Array || index >= current.GetArrayLength())
+                    {
+                        return (default, $"does not resolve: step {source}'s return has no element [{index}] there.");
+                    }
+
+                    current = current[index];
+                }
+            }
+
+            return (current, null);
+        }
+
+        // Serialized at most once per step, however many later steps refer to it.
+        private JsonElement SerializedReturn(int step)
+        {
+            if (!_serializedReturns.TryGetValue(step, out var element))
+            {
+                element = JsonSerializer.SerializeToElement(_results[step].Return);
+                _serializedReturns[step] = element;
+            }
+
+            return element;
+        }
+
+        private static bool TryGetPropertyIgnoreCase(JsonElement obj, string name, out JsonElement value)
+        {
+            foreach (var property in obj.EnumerateObject())
+            {
+                if (string.Equals(property.Name, name, StringComparison.OrdinalIgnoreCase))
+                {
+                    value = property.Value;
+                    return true;
+                }
+            }
+
+            value = default;
+            return false;
+        }
+
+        // A number headed for a length/angle param becomes an explicit SI
+        // quantity string, so Bind's unit gate (which refuses a bare number)
+        // accepts it as exactly the value the earlier step returned.
+        private static JsonElement AsSiQuantity(OperationRecipe recipe, string argName, JsonElement value)
+        {
+            if (value.ValueKind != JsonValueKind.Number)
+            {
+                return value;
+            }
+
+            var param = recipe.Params.FirstOrDefault(p => string.Equals(p.Name, argName, StringComparison.OrdinalIgnoreCase));
+            var unit = param?.Type.ToLowerInvariant() switch
+            {
+                "length" => "m",
+                "angle" => "rad",
+                _ => null,
+            };
+
+            return unit == null
+                ? value
+                : JsonSerializer.SerializeToElement($"{value.GetDouble().ToString("R", CultureInfo.InvariantCulture)} {unit}");
+        }
+    }
+}
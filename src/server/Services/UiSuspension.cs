@@ -0,0 +1,132 @@
+using System.Runtime.InteropServices;
+using SwBridge;
+
+namespace swmcp.server.Services
+{
+    /// <summary>
+    /// Temporarily overridden boolean COM properties, put back on
+    /// <see cref="Dispose"/> in reverse order — the "switch SolidWorks' UI off
+    /// for this much work, and always switch it back" pattern shared by
+    /// <c>run_operations</c>' <c>suspendUi</c> and <c>sketch_bulk_insert</c>.
+    /// </summary>
+    /// <remarks>
+    /// Only a value that was actually read is ever restored: a property whose
+    /// read failed is left alone rather than "restored" to a guessed default.
+    /// Restoration never throws — it runs from a <c>finally</c>, often right
+    /// after a failure, and a document a step closed (or a SolidWorks that went
+    /// away) must not replace the real error. Overrides nest correctly: an
+    /// inner suspension restores the value the outer one set, and the outer
+    /// one then restores the original. Dispatcher-thread only.
+    /// </remarks>
+    internal sealed class UiSuspension : IDisposable
+    {
+        private readonly List<(object Target, string Property, bool Previous)> _overrides = new();
+        private readonly List<object> _redraw = new();
+        private readonly List<object> _resolved = new();
+        private bool _disposed;
+
+        /// <summary>
+        /// Suspends graphics updates (<c>ActiveView.EnableGraphicsUpdate</c>) and
+        /// feature-tree repaints (<c>FeatureManager.EnableFeatureTree</c> /
+        /// <c>EnableFeatureTreeWindow</c>) on every document given, redrawing
+        /// each once on <see cref="Dispose"/>.
+        /// </summary>
+        public static UiSuspension ForDocuments(IEnumerable<SwDocument> documents)
+        {
+            var suspension = new UiSuspension();
+            foreach (var doc in documents)
+            {
+                suspension.SuspendDocument(doc);
+            }
+
+            return suspension;
+        }
+
+        /// <summary>Sets <paramref name="property"/> to <paramref name="value"/>, remembering its current value for <see cref="Dispose"/>.</summary>
+        public void Set(object target, string property, bool value)
+        {
+            var before = ComInvoker.GetProperty(target, property);
+            if (before is not { Success: true, Value: bool previous })
+            {
+                return;
+            }
+
+            if (ComInvoker.SetProperty(target, property, value).Success)
+            {
+                _overrides.Add((target, property, previous));
+            }
+        }
+
+        /// <summary>Calls <c>GraphicsRedraw2</c> on <paramref name="model"/> after everything is restored.</summary>
+        public void RedrawOnRestore(object model) => _redraw.Add(model);
+
+        public void Dispose()
+        {
+            if (_disposed)
+            {
+                return;
+            }
+
+            _disposed = true;
+            for (var i = _overrides.Count - 1; i >= 0; i--)
+            {
+                var (target, property, previous) = _overrides[i];
+                Guarded(() => ComInvoker.SetProperty(target, property, previous));
+            }
+
+            foreach (var model in _redraw)
+            {
+                Guarded(() => ComInvoker.InvokeMethod(model, "GraphicsRedraw2", Array.Empty<object?>()));
+            }
+
+            // C2: the views and feature managers SuspendDocument resolved are
+            // this suspension's, released once each, only now that nothing is
+            // left to restore through them. Each resolve handed out one RCW
+            // reference, so a single release is balanced even when the
+            // FeatureManager RCW is the one ComTargetCache holds (H4).
+            foreach (var target in _resolved)
+            {
+                ComLifetime.Release(target);
+            }
+        }
+
+        private void SuspendDocument(SwDocument doc)
+        {
+            try
+            {
+                var view = ComPath.Resolve(doc.Model, "ActiveView");
+                if (view is { Success: true, Value: { } activeView })
+                {
+                    _resolved.Add(activeView);
+                    Set(activeView, "EnableGraphicsUpdate", false);
+                }
+
+                var featureManager = ComPath.Resolve(doc.Model, "FeatureManager");
+                if (featureManager is { Success: true, Value: { } manager })
+                {
+                    _resolved.Add(manager);
+                    Set(manager, "EnableFeatureTree", false);
+                    Set(manager, "EnableFeatureTreeWindow", false);
+                }
+
+                RedrawOnRestore(doc.Model);
+            }
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
+            {
+                // Suspension is an optimization: a document that cannot be
+                // suspended just runs at normal speed.
+            }
+        }
+
+        private static void Guarded(Action action)
+        {
+            try
+            {
+                action();
+            }
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
+            {
+            }
+        }
+    }
+}
@@ -1,4 +1,5 @@
 using System.ComponentModel;
+using System.Runtime.InteropServices;
 using System.Text.Json;
 using ModelContextProtocol.Server;
 using SwBridge;
@@ -13,12 +14,24 @@ namespace swmcp.server.Tools
         [Description("Operation name, e.g. 'insert_sketch'.")]
         public string Operation { get; set; } = "";
 
-        [Description("Named arguments for this step's operation. See describe_operation for the operation's declared params.")]
+        [Description(
+            "Named arguments for this step's operation. See describe_operation for the operation's declared params. Any " +
+            "value may instead be {\"$ref\": \"steps[k].return.<path>\"} to use an earlier step's return value.")]
         public Dictionary<string, JsonElement>? Args { get; set; }
+
+        [Description("Which open document this step acts on. Omit to use the batch-level documentName.")]
+        public string? DocumentName { get; set; }
+
+        [Description(
+            "Instead of args: an array of argument sets, each shaped like args, to apply this step's operation to one after " +
+            "another — e.g. 200 create_line calls as one step. The operation is looked up, its document and target resolved " +
+            "and its preconditions checked once; each item is then bound, invoked and verified in turn. The step returns " +
+            "{count, items: [{return, boundArgs}]} and fails at the first failing item.")]
+        public Dictionary<string, JsonElement>[]? ArgsList { get; set; }
     }
 
     /// <summary>
-    /// The generic write-operation surface (ADR 0001): seven tools instead of a
+    /// The generic write-operation surface (ADR 0001): ten tools instead of a
     /// per-feature tool per SolidWorks capability. Every document-scoped
     /// operation requires an explicit <c>documentName</c> — stricter than the
     /// read tools in <see cref="SolidWorksTool"/>, deliberately: a wrong read
@@ -29,15 +42,23 @@ namespace swmcp.server.Tools
     {
         private readonly OperationManager _operations;
         private readonly OperationRunner _runner;
-        private readonly DocumentManager _documents;
+        private readonly DocumentIndex _documents;
         private readonly SwConnection _connection;
+        private readonly JobManager _jobs;
+        private readonly DispatchScheduler _scheduler;
+        private readonly ServerMetrics _metrics;
 
-        public OperationsTool(OperationManager operations, OperationRunner runner, DocumentManager documents, SwConnection connection)
+        public OperationsTool(
+            OperationManager operations, OperationRunner runner, DocumentIndex documents, SwConnection connection, JobManager jobs,
+            DispatchScheduler scheduler, ServerMetrics metrics)
         {
             _operations = operations;
             _runner = runner;
             _documents = documents;
             _connection = connection;
+            _jobs = jobs;
+            _scheduler = scheduler;
+            _metrics = metrics;
         }
 
         [McpServerTool, Description(
@@ -78,7 +99,11 @@ namespace swmcp.server.Tools
             "do not hold is still reported as a failure (ADR 0002) — the document is left exactly as it was; call the " +
             "'undo' operation yourself if you need to back out, nothing does that automatically. The response's " +
             "'boundArgs' field echoes the exact SI values actually sent to COM (after unit parsing) — check it whenever " +
-            "the geometry looks wrong; it is the audit trail for a bad binding.")]
+            "the geometry looks wrong; it is the audit trail for a bad binding. 'revision' is the document's revision after " +
+            "this call (bumped by every write) — pass it to get_part_info/get_document_state as ifRevisionNot to skip " +
+            "re-reading a document nothing has changed since. Pass timings: true to get where the call's time went: " +
+            "'timings' gives milliseconds per phase (queueWait, resolveDocument, bind, requires, target, invoke, verify, " +
+            "convert, snapshot).")]
         public object RunOperation(
             [Description(
                 "Operation name, e.g. 'insert_sketch'.")]
@@ -93,9 +118,13 @@ namespace swmcp.server.Tools
                 "Which open document to act on (title, file name, or path). Required for every document-scoped " +
                 "operation; omit only for application-scoped operations (currently just new_part). A name matching " +
                 "more than one open document is refused rather than guessed.")]
-            string? documentName = null)
+            string? documentName = null,
+            [Description(
+                "Report the call's time per phase in 'timings' (milliseconds). A phase the call never reached is null; " +
+                "queueWait is the wait for SolidWorks before it started.")]
+            bool timings = false)
         {
-            var recipe = _operations.Get(operation);
+            var recipe = _operations.GetCompiled(operation);
             if (recipe == null)
             {
                 return new { error = $"No operation named '{operation}'. Call list_operations to see available operations." };
@@ -103,7 +132,15 @@ namespace swmcp.server.Tools
 
             try
             {
-                return ToResponse(_runner.Run(recipe, documentName, args));
+                using var ticket = _scheduler.Admit(DispatchPriority.Write, DispatchScheduler.Requests, SwDispatcher.DefaultTimeout, out var busy);
+                if (ticket == null)
+                {
+                    return new { success = false, error = busy, busy = true };
+                }
+
+                using var held = _metrics.Tools.Time("run_operation");
+
+                return ToResponse(_runner.Run(recipe, documentName, args, timings, ticket.QueueWait));
             }
             catch (Exception ex) when (ex is SwBridgeException or ObjectDisposedException)
             {
@@ -117,7 +154,7 @@ namespace swmcp.server.Tools
         }
 
         [McpServerTool, Description(
-            "Executes an ordered batch of operations against one document, failing fast, as a SINGLE unit of work on " +
+            "Executes an ordered batch of operations, failing fast, as a SINGLE unit of work on " +
             "SolidWorks' dispatcher (no other request — read or write — can interleave mid-batch and mutate the active " +
             "sketch or selection a later step depends on). Operation names are resolved before any step runs: an " +
             "unknown operation anywhere in the list refuses the whole batch up front, with nothing executed. On the " +
@@ -125,46 +162,89 @@ namespace swmcp.server.Tools
             "execution stops and the response reports every step completed so far plus the failing step's index, " +
             "operation name, error, boundArgs, and the document's state at that point. There is NO automatic rollback " +
             "(ADR 0002) — a partial plan leaves the document exactly as the completed steps left it; call the 'undo' " +
-            "operation deliberately if you need to back out. Steps do not pass return values to each other; coupling " +
-            "goes entirely through SolidWorks' own state (active sketch, current selection). The whole batch shares one " +
+            "operation deliberately if you need to back out. A step can use an earlier step's return value as an argument: " +
+            "write the arg as {\"$ref\": \"steps[3].return.name\"} (steps[k].return, then any .member / [n] path) and it is " +
+            "resolved server-side, inside the same dispatch, just before the step binds — the resolved value shows in its " +
+            "boundArgs. Other coupling goes through SolidWorks' own state (active sketch, current selection). The whole batch shares one " +
             "generous timeout (120s + 30s per step) — if the WHOLE batch does not complete within it (e.g. a modal " +
             "SolidWorks dialog appears mid-batch), the call fails with no transcript at all, since the in-progress work " +
             "cannot be recovered from a timed-out wait; this is rare with the generous default and is the accepted " +
-            "trade-off for single-dispatch batch isolation. If the plan needs a new document, call run_operation with " +
-            "'new_part' first and pass its returned title as documentName here — new_part itself is application-scoped " +
-            "and cannot be a step in this batch.")]
+            "trade-off for single-dispatch batch isolation. If the plan needs a new document, make 'new_part' a step and " +
+            "give later steps the title it will have (e.g. 'Part2') as their documentName — after a step that creates " +
+            "or renames a document (new_part, save_as), names are looked up again. A step may carry its own documentName (overriding the batch-level one), so " +
+            "a plan that builds several documents — a part, its mating part, a fixture — is still one batch and one round " +
+            "trip; every named document is resolved once, up front, and a name that matches nothing fails the first step " +
+            "that uses it. 'snapshot' controls which steps' results carry a documentState: a " +
+            "snapshot costs several COM reads (more when something is selected), so a long batch that only needs the " +
+            "failing step's state should pass 'onFailure'. 'suspendUi' switches off graphics and feature-tree updates on " +
+            "every document the batch touches while it runs (restored, with one redraw, when it ends — including when a " +
+            "step fails); use it for long geometry-heavy plans. 'rebuild': 'deferred' skips every step's " +
+            "noNewRebuildErrors rebuild and runs ONE rebuild after the last step instead; if it fails, the last step fails " +
+            "with rebuildFailure naming the earliest feature in error and the step that created it. If the client cancels " +
+            "the request (notifications/cancelled), the batch stops before its next step — or its next argsList item — and " +
+            "the response is the partial transcript with cancelled: true and cancelledAtStep naming the step that did not " +
+            "finish; like a failure, nothing is rolled back. 'timings': true adds each step's time per phase, in the " +
+            "run_operation shape, to its result (the first step's queueWait is the batch's wait for SolidWorks).")]
         public object RunOperations(
-            [Description("Ordered steps to execute against documentName, in order.")] OperationStepInput[] steps,
-            [Description("Which open document every document-scoped step acts on.")] string? documentName = null)
+            [Description("Ordered steps to execute, in order.")] OperationStepInput[] steps,
+            [Description("Which open document every document-scoped step acts on, unless the step names its own documentName.")]
+            string? documentName = null,
+            [Description(
+                "Which steps carry a documentState: 'everyStep' (default), 'final' (the failing step, or the last step " +
+                "of a batch that completed), 'onFailure' (only the failing step), or 'none'.")]
+            string snapshot = "everyStep",
+            [Description(
+                "Suspend SolidWorks' graphics and FeatureManager tree updates for the duration of the batch. Faster on " +
+                "long plans; the view and tree are restored and redrawn once when the batch ends, success or not.")]
+            bool suspendUi = false,
+            [Description(
+                "When noNewRebuildErrors checks rebuild: 'perStep' (default — each step that declares one forces a full " +
+                "rebuild) or 'deferred' (one rebuild per document after the last step; a 20-feature plan rebuilds once, " +
+                "not 20 times, at the price of learning about a failure only at the end).")]
+            string rebuild = "perStep",
+            [Description(
+                "Report each step's time per phase in its result's 'timings' (milliseconds), to find which step — and " +
+                "which part of it: the COM call, a verify rebuild, the snapshot's selection reads — was slow.")]
+            bool timings = false,
+            CancellationToken cancellationToken = default)
         {
-            var resolvedSteps = new List<(OperationRecipe Recipe, IReadOnlyDictionary<string, JsonElement>? Args)>();
-            for (var i = 0; i < steps.Length; i++)
+            var (resolvedSteps, options, refusal) = PrepareBatch(steps, snapshot, suspendUi, rebuild, timings);
+            if (refusal != null)
             {
-                var recipe = _operations.Get(steps[i].Operation);
-                if (recipe == null)
-                {
-                    return new
-                    {
-                        error = $"Step {i}: no operation named '{steps[i].Operation}'. Call list_operations to see available operations. " +
-                                "No step in this batch ran (names are resolved before dispatch).",
-                        failedStepIndex = i,
-                        failedOperation = steps[i].Operation,
-                        completedSteps = Array.Empty<object>(),
-                    };
-                }
-
-                resolvedSteps.Add((recipe, steps[i].Args));
+                return refusal;
             }
 
             try
             {
                 var timeout = TimeSpan.FromSeconds(120 + (30 * Math.Max(1, steps.Length)));
-                var results = _runner.RunBatch(resolvedSteps, documentName, timeout);
+                using var ticket = _scheduler.Admit(
+                    DispatchPriority.Write, DispatchScheduler.Requests, timeout, out var busy, cancellationToken);
+                if (ticket == null)
+                {
+                    return cancellationToken.IsCancellationRequested
+                        ? new { error = busy, cancelled = true, cancelledAtStep = 0, completedSteps = Array.Empty<object>() }
+                        : new { error = busy, busy = true, completedSteps = Array.Empty<object>() };
+                }
+
+                using var held = _metrics.Tools.Time("run_operations");
+
+                // The MCP SDK cancels this token on notifications/cancelled;
+                // RunBatch stops at the next step or argsList item, so the
+                // dispatcher is handed back after one step's work instead of
+                // the whole plan's. The client has stopped listening, but the
+                // response still goes out as a transcript of what ran.
+                var results = _runner.RunBatch(
+                    resolvedSteps, documentName, timeout, options, cancellationToken: cancellationToken, queuedFor: ticket.QueueWait);
 
                 var completed = new List<object>();
                 for (var i = 0; i < results.Count; i++)
                 {
                     var result = results[i];
+                    if (result.Cancelled)
+                    {
+                        return Cancelled(i, result.Error, completed, result.Return);
+                    }
+
                     if (!result.Success)
                     {
                         return new
@@ -174,6 +254,10 @@ namespace swmcp.server.Tools
                             failedOperation = steps[i].Operation,
                             documentState = result.DocumentState,
                             boundArgs = result.BoundArgs,
+                            @return = result.Return,
+                            rebuildFailure = result.RebuildFailure,
+                            revision = result.Revision,
+                            timings = result.Timings,
                             completedSteps = completed,
                         };
                     }
@@ -181,7 +265,14 @@ namespace swmcp.server.Tools
                     completed.Add(new { index = i, operation = steps[i].Operation, result = ToResponse(result) });
                 }
 
-                return new { completedSteps = completed };
+                return results.Count < steps.Length
+                    ? Cancelled(
+                        results.Count,
+                        $"Cancelled before step {results.Count} ('{steps[results.Count].Operation}')." +
+                        (options.Rebuild == RebuildPolicy.Deferred ? OperationRunner.DeferredChecksSkipped : ""),
+                        completed,
+                        null)
+                    : new { completedSteps = completed };
             }
             catch (Exception ex) when (ex is SwBridgeException or ObjectDisposedException)
             {
@@ -200,6 +291,87 @@ namespace swmcp.server.Tools
             }
         }
 
+        // cancelledAtStep is the first step that did not finish: either never
+        // started, or a vectorized step stopped between items, whose items
+        // that did run come back as 'return'.
+        private static object Cancelled(int step, string? error, List<object> completed, object? partial) => new
+        {
+            error,
+            cancelled = true,
+            cancelledAtStep = step,
+            @return = partial,
+            completedSteps = completed,
+        };
+
+        [McpServerTool, Description(
+            "Starts the same kind of batch run_operations executes — same steps, same per-step documentName, same " +
+            "single-unit-of-work isolation on SolidWorks' dispatcher, same fail-fast, no rollback — but returns a jobId " +
+            "IMMEDIATELY instead of waiting for it. Every step is recorded on the job the moment it finishes, so nothing is lost if " +
+            "the batch outlives run_operations' 120s + 30s/step budget — that wait simply stops mattering. Poll with " +
+            "get_job — no progress notifications are sent, since this request has already been answered; stop with cancel_job (takes effect between steps, and between a vectorized step's items). Unknown operation names or an unknown snapshot " +
+            "policy refuse the submission up front, with nothing queued. Use this for long, rebuild-heavy plans, or to " +
+            "keep planning while a plan executes.")]
+        public object SubmitOperations(
+            [Description("Ordered steps to execute, in order — the same shape run_operations takes.")] OperationStepInput[] steps,
+            [Description("Which open document every document-scoped step acts on, unless the step names its own documentName.")]
+            string? documentName = null,
+            [Description("Which steps' recorded results carry a documentState — same values as run_operations' snapshot.")]
+            string snapshot = "everyStep",
+            [Description("Suspend graphics and feature-tree updates while the job runs — same as run_operations' suspendUi.")]
+            bool suspendUi = false,
+            [Description("'perStep' (default) or 'deferred' — same as run_operations' rebuild.")]
+            string rebuild = "perStep",
+            [Description("Record each step's time per phase in its result's 'timings' — same as run_operations' timings.")]
+            bool timings = false)
+        {
+            var (resolvedSteps, options, refusal) = PrepareBatch(steps, snapshot, suspendUi, rebuild, timings);
+            if (refusal != null)
+            {
+                return refusal;
+            }
+
+            var job = _jobs.Submit(resolvedSteps, documentName, options);
+            if (job == null)
+            {
+                return new { error = $"SolidWorks is busy: {DispatchScheduler.MaxQueuedJobs} jobs are already queued for it. Retry shortly.", busy = true };
+            }
+
+            return new { jobId = job.Id, status = Describe(JobStatus.Queued), totalSteps = resolvedSteps.Count };
+        }
+
+        [McpServerTool, Description(
+            "Reports a submit_operations job: its status (queued, running, completed, failed, cancelled), every step " +
+            "finished so far (each with the same result shape run_operation returns), and — once it stopped on a failing " +
+            "step — that step's index and error. 'dispatchTimedOut' true means the batch outlived its dispatch budget; " +
+            "it is still running on SolidWorks' dispatcher and its remaining steps are still recorded here as they finish.")]
+        public object GetJob([Description("The jobId submit_operations returned.")] string jobId)
+        {
+            var job = _jobs.Get(jobId);
+            if (job == null)
+            {
+                return new { error = $"No job with id '{jobId}'. Finished jobs are kept for the last {JobManager.MaxFinishedJobs} submissions." };
+            }
+
+            return ToResponse(job.Snapshot());
+        }
+
+        [McpServerTool, Description(
+            "Stops a submit_operations job at the next step boundary: the step currently executing (if any) finishes and " +
+            "is recorded, no later step starts. Nothing is rolled back (ADR 0002) — call the 'undo' operation yourself if " +
+            "you need to back out. Refuses an unknown jobId or a job that has already finished.")]
+        public object CancelJob([Description("The jobId submit_operations returned.")] string jobId)
+        {
+            if (!_jobs.Cancel(jobId))
+            {
+                var job = _jobs.Get(jobId);
+                return job == null
+                    ? new { error = $"No job with id '{jobId}'." }
+                    : new { error = $"Job '{jobId}' has already finished ({Describe(job.Snapshot().Status)}); nothing to cancel." };
+            }
+
+            return ToResponse(_jobs.Get(jobId)!.Snapshot());
+        }
+
         [McpServerTool, Description(
             "Validates and persists a new operation recipe — the enrichment entry point for any SolidWorks capability " +
             "beyond the shipped seed. Recommended loop: call describe_com_members to find real member names/signatures " +
@@ -217,6 +389,15 @@ namespace swmcp.server.Tools
         {
             try
             {
+                // The live member check reads SolidWorks' type library.
+                using var ticket = _scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, SwDispatcher.DefaultTimeout, out var busy);
+                if (ticket == null)
+                {
+                    return new { error = busy, busy = true };
+                }
+
+                using var held = _metrics.Tools.Time("register_operation");
+
                 var (ok, error, warnings) = _operations.Register(recipe);
                 return ok ? new { registered = recipe.Name, warnings } : new { error, warnings };
             }
@@ -269,6 +450,14 @@ namespace swmcp.server.Tools
         {
             try
             {
+                using var ticket = _scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, SwDispatcher.DefaultTimeout, out var busy);
+                if (ticket == null)
+                {
+                    return new { error = busy, busy = true };
+                }
+
+                using var held = _metrics.Tools.Time("describe_com_members");
+
                 if (featureName != null)
                 {
                     if (string.IsNullOrWhiteSpace(documentName))
@@ -276,10 +465,10 @@ namespace swmcp.server.Tools
                         return new { error = "documentName is required when featureName is given." };
                     }
 
-                    var doc = _documents.Resolve(documentName);
+                    var (doc, error) = ResolveDocument(documentName);
                     if (doc == null)
                     {
-                        return new { error = $"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}" };
+                        return new { error };
                     }
 
                     var featureMembers = doc.DescribeFeatureDefinition(featureName);
@@ -295,10 +484,10 @@ namespace swmcp.server.Tools
                 string rootDescription;
                 if (documentName != null)
                 {
-                    var doc = _documents.Resolve(documentName);
+                    var (doc, error) = ResolveDocument(documentName);
                     if (doc == null)
                     {
-                        return new { error = $"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}" };
+                        return new { error };
                     }
 
                     root = doc.Model;
@@ -346,7 +535,7 @@ namespace swmcp.server.Tools
                     return PageMembers(target, "ITypeInfo+interop (union)", members, nameFilter, offset, limit);
                 });
             }
-            catch (SwBridgeException ex)
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
             {
                 return new { error = ex.Message };
             }
@@ -380,6 +569,112 @@ namespace swmcp.server.Tools
             };
         }
 
+        // Shared by run_operations and submit_operations: everything that can
+        // refuse a batch before any step runs.
+        private (List<BatchStep> Steps, BatchOptions Options, object? Refusal) PrepareBatch(
+            OperationStepInput[] steps, string snapshot, bool suspendUi, string rebuild, bool timings)
+        {
+            var resolvedSteps = new List<BatchStep>();
+            if (!TryParseSnapshotPolicy(snapshot, out var snapshotPolicy))
+            {
+                return (resolvedSteps, BatchOptions.Default, new
+                {
+                    error = $"Unknown snapshot policy '{snapshot}'. Use one of: none, onFailure, final, everyStep. No step in this batch ran.",
+                    completedSteps = Array.Empty<object>(),
+                });
+            }
+
+            if (!TryParseRebuildPolicy(rebuild, out var rebuildPolicy))
+            {
+                return (resolvedSteps, BatchOptions.Default, new
+                {
+                    error = $"Unknown rebuild policy '{rebuild}'. Use perStep or deferred. No step in this batch ran.",
+                    completedSteps = Array.Empty<object>(),
+                });
+            }
+
+            for (var i = 0; i < steps.Length; i++)
+            {
+                var recipe = _operations.GetCompiled(steps[i].Operation);
+                if (recipe == null)
+                {
+                    return (resolvedSteps, BatchOptions.Default, new
+                    {
+                        error = $"Step {i}: no operation named '{steps[i].Operation}'. Call list_operations to see available operations. " +
+                                "No step in this batch ran (names are resolved before dispatch).",
+                        failedStepIndex = i,
+                        failedOperation = steps[i].Operation,
+                        completedSteps = Array.Empty<object>(),
+                    });
+                }
+
+                if (steps[i].ArgsList != null && (steps[i].Args != null || steps[i].ArgsList!.Length == 0))
+                {
+                    return (resolvedSteps, BatchOptions.Default, new
+                    {
+                        error = $"Step {i} ('{steps[i].Operation}'): " +
+                                (steps[i].Args != null ? "give either args or argsList, not both." : "argsList is empty.") +
+                                " No step in this batch ran.",
+                        failedStepIndex = i,
+                        failedOperation = steps[i].Operation,
+                        completedSteps = Array.Empty<object>(),
+                    });
+                }
+
+                resolvedSteps.Add(new BatchStep(recipe, steps[i].Args, steps[i].DocumentName, steps[i].ArgsList));
+            }
+
+            return (resolvedSteps, new BatchOptions(snapshotPolicy, suspendUi, rebuildPolicy, timings), null);
+        }
+
+        internal static bool TryParseSnapshotPolicy(string? value, out SnapshotPolicy policy) =>
+            TryParseOption(value, SnapshotPolicy.EveryStep, out policy);
+
+        internal static bool TryParseRebuildPolicy(string? value, out RebuildPolicy policy) =>
+            TryParseOption(value, RebuildPolicy.PerStep, out policy);
+
+        // Enum.TryParse alone would also accept "2" or "none,final"; only the
+        // documented names are valid here. Blank means the default.
+        private static bool TryParseOption<TEnum>(string? value, TEnum defaultValue, out TEnum option)
+            where TEnum : struct, Enum
+        {
+            option = defaultValue;
+            if (string.IsNullOrWhiteSpace(value))
+            {
+                return true;
+            }
+
+            return Enum.GetNames<TEnum>().Any(n => string.Equals(n, value.Trim(), StringComparison.OrdinalIgnoreCase)) &&
+                   Enum.TryParse(value.Trim(), ignoreCase: true, out option);
+        }
+
+        private static object ToResponse(JobSnapshot job)
+        {
+            var failed = job.Results.Count > 0 && !job.Results[^1].Success && !job.Results[^1].Cancelled;
+            return new
+            {
+                jobId = job.Id,
+                status = Describe(job.Status),
+                totalSteps = job.Operations.Count,
+                error = job.Error,
+                failedStepIndex = failed ? job.Results.Count - 1 : (int?)null,
+                rebuildFailure = failed ? job.Results[^1].RebuildFailure : null,
+                dispatchTimedOut = job.DispatchTimedOut,
+                submittedAt = job.SubmittedAt,
+                finishedAt = job.FinishedAt,
+                completedSteps = job.Results
+                    .Select((r, i) => new { index = i, operation = job.Operations[i], result = ToResponse(r) })
+                    .ToList(),
+            };
+        }
+
+        // camelCase, like every other enum-ish value in this surface.
+        internal static string Describe(JobStatus status)
+        {
+            var name = status.ToString();
+            return char.ToLowerInvariant(name[0]) + name[1..];
+        }
+
         private static object ToResponse(OperationResult result) => new
         {
             success = result.Success,
@@ -387,18 +682,32 @@ namespace swmcp.server.Tools
             @return = result.Return,
             documentState = result.DocumentState,
             boundArgs = result.BoundArgs,
+            revision = result.Revision,
+            timings = result.Timings,
         };
 
+        // ADR 0003: DocumentIndex makes COM calls of its own (snapshot
+        // rebuild, notification subscriptions, target eviction), so the
+        // lookup and its error text run on the dispatcher thread.
+        private (SwDocument? Document, string? Error) ResolveDocument(string documentName) =>
+            _connection.Dispatcher.Run(() =>
+            {
+                var doc = _documents.Resolve(documentName);
+                return doc == null
+                    ? ((SwDocument?)null, (string?)$"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}")
+                    : (doc, null);
+            });
+
         // H5: guarded so error-message construction (e.g. "no document matches
         // X, open documents are: ...") can never itself throw and replace a
-        // clear refusal with an opaque exception.
+        // clear refusal with an opaque exception. Dispatcher thread only.
         private string DescribeOpenDocuments()
         {
             try
             {
                 return string.Join(", ", _documents.ListOpenDocuments().Select(d => $"{d.Title} ({d.Type})"));
             }
-            catch (Exception ex) when (ex is SwBridgeException)
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
             {
                 return $"(could not list open documents: {ex.Message})";
             }
@@ -1,4 +1,5 @@
 using System.ComponentModel;
+using System.Runtime.InteropServices;
 using System.Text.Json;
 using ModelContextProtocol.Server;
 using SolidWorks.Interop.sldworks;
@@ -23,25 +24,87 @@ namespace swmcp.server.Tools
     [McpServerToolType]
     public class SolidWorksTool
     {
-        private readonly DocumentManager _documents;
+        // SwDocumentType's names, as list_open_documents' type filter accepts them.
+        private static readonly string[] DocumentTypes = { "Part", "Assembly", "Drawing" };
+
+        // get_part_info's optional sections, in response order.
+        private static readonly string[] PartInfoFields = { "mass", "material", "density", "features", "boundingBox" };
+
+        private readonly DocumentIndex _documents;
         private readonly SchemaManager _schemaManager;
         private readonly SwConnection _connection;
+        private readonly DocumentRevisions _revisions;
+        private readonly FeatureDataCache _featureData;
+        private readonly AssemblyTreeCache _assemblyTrees;
+        private readonly DispatchScheduler _scheduler;
+        private readonly ServerMetrics _metrics;
 
-        public SolidWorksTool(DocumentManager documents, SchemaManager schemaManager, SwConnection connection)
+        public SolidWorksTool(
+            DocumentIndex documents, SchemaManager schemaManager, SwConnection connection, DocumentRevisions revisions,
+            FeatureDataCache featureData, AssemblyTreeCache assemblyTrees, DispatchScheduler scheduler, ServerMetrics metrics)
         {
             _documents = documents;
             _schemaManager = schemaManager;
             _connection = connection;
+            _revisions = revisions;
+            _featureData = featureData;
+            _assemblyTrees = assemblyTrees;
+            _scheduler = scheduler;
+            _metrics = metrics;
         }
 
-        [McpServerTool, Description("Lists all documents currently open in SolidWorks (title, file path, type).")]
-        public object ListOpenDocuments()
+        [McpServerTool, Description(
+            "Lists the documents currently open in SolidWorks (title, file path, type), optionally only those of one " +
+            "type, a page at a time. totalCount is the number of documents matching 'type' before paging; use it " +
+            "with offset/hasMore to page through the rest.")]
+        public object ListOpenDocuments(
+            [Description("Only list documents of this type: 'part', 'assembly' or 'drawing' (case-insensitive). Omit for all.")]
+            string? type = null,
+            [Description("Zero-based index into the (optionally type-filtered) document list to start returning from.")]
+            int offset = 0,
+            [Description("Maximum documents to return in this call. Default 100.")]
+            int limit = 100)
         {
             try
             {
-                return new { documents = _documents.ListOpenDocuments() };
+                var wanted = string.IsNullOrWhiteSpace(type)
+                    ? null
+                    : DocumentTypes.FirstOrDefault(t => string.Equals(t, type.Trim(), StringComparison.OrdinalIgnoreCase));
+                if (!string.IsNullOrWhiteSpace(type) && wanted == null)
+                {
+                    return new { error = $"Unknown document type '{type}'. Expected 'part', 'assembly' or 'drawing'." };
+                }
+
+                using var ticket = _scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, SwDispatcher.DefaultTimeout, out var busy);
+                if (ticket == null)
+                {
+                    return Busy(busy);
+                }
+
+                using var held = _metrics.Tools.Time("list_open_documents");
+
+                // ADR 0003: the index builds its snapshot (and subscribes to
+                // SolidWorks' notifications) on the dispatcher thread.
+                var documents = _connection.Dispatcher.Run(() => _documents.ListOpenDocuments());
+                var filtered = wanted == null
+                    ? documents
+                    : documents.Where(d => string.Equals(d.Type.ToString(), wanted, StringComparison.Ordinal)).ToList();
+
+                var safeOffset = Math.Max(0, offset);
+                var safeLimit = Math.Max(0, limit);
+                var page = filtered.Skip(safeOffset).Take(safeLimit).ToList();
+
+                return new
+                {
+                    type = wanted,
+                    totalCount = filtered.Count,
+                    offset = safeOffset,
+                    returned = page.Count,
+                    hasMore = safeOffset + page.Count < filtered.Count,
+                    documents = page,
+                };
             }
-            catch (SwBridgeException ex)
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
             {
                 return new { error = ex.Message };
             }
@@ -53,7 +116,14 @@ namespace swmcp.server.Tools
             "(title, file name, or path) when more than one document is open. A documentName matching " +
             "more than one open document is refused rather than guessed. By default the feature tree omits permanent " +
             "tree-plumbing entries (folders, lights — see includeFolderFeatures) that carry no geometry information " +
-            "and would otherwise be 19 of a typical 25-entry list.")]
+            "and would otherwise be 19 of a typical 25-entry list. The response's 'revision' changes whenever a write " +
+            "lands on the document; pass it back as ifRevisionNot to get a tiny {unchanged: true} answer instead of a " +
+            "full re-read when nothing has moved. Pass 'fields' to compute only some sections — mass and density each " +
+            "cost a mass-property evaluation that can take seconds on complex bodies. The feature list is paged " +
+            "(offset/limit, default 500 per call) and filterable by type and name; totalCount is always the true number " +
+            "of matching features, so use hasMore/offset to page through a large part. A schema property whose read " +
+            "fails is skipped from then on and listed under unreadableProperties (by feature type) — fix its member " +
+            "with register_feature_schema.")]
         public object GetPartInfo(
             [Description("Which open document to inspect; may be omitted when exactly one document is open.")]
             string? documentName = null,
@@ -62,48 +132,222 @@ namespace swmcp.server.Tools
                 "(Comments, Favorites, History, ...), the material folder, notes, lights — are omitted; they carry no " +
                 "geometry information and are the same 16-19 entries on every part regardless of what was modeled. " +
                 "Set true to see the full, unfiltered tree exactly as SolidWorks' FeatureManager reports it.")]
-            bool includeFolderFeatures = false)
+            bool includeFolderFeatures = false,
+            [Description(
+                "The 'revision' from a previous response for this document. When the document is still at that " +
+                "revision, the response is just {documentName, revision, unchanged: true} — no feature-tree walk, no " +
+                "mass evaluation. Only writes made through this server move the revision; edits made by hand in " +
+                "SolidWorks do not.")]
+            long? ifRevisionNot = null,
+            [Description(
+                "Sections to compute: any of 'mass', 'material', 'density', 'boundingBox', 'features' " +
+                "(case-insensitive). path, title and revision are always included. Omit for every section.")]
+            string[]? fields = null,
+            [Description("Zero-based index into the (filtered) feature list to start returning from.")]
+            int offset = 0,
+            [Description("Maximum features to return in this call. Default 500.")]
+            int limit = 500,
+            [Description("Only list features of these GetTypeName2() types, e.g. ['Fillet', 'Chamfer'] (exact, case-sensitive).")]
+            string[]? typeNames = null,
+            [Description("Never list features of these GetTypeName2() types (exact, case-sensitive).")]
+            string[]? excludeTypeNames = null,
+            [Description("Only list features whose name matches this case-insensitive wildcard: '*' any run of characters, '?' any one, e.g. 'Fillet*'.")]
+            string? namePattern = null)
         {
             try
             {
+                var wanted = ParseFields(fields, out var fieldsError);
+                if (wanted == null)
+                {
+                    return new { error = fieldsError };
+                }
+
+                using var ticket = _scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, SwDispatcher.DefaultTimeout, out var busy);
+                if (ticket == null)
+                {
+                    return Busy(busy);
+                }
+
+                using var held = _metrics.Tools.Time("get_part_info");
+
                 var doc = ResolveDocument(documentName, out var error);
                 if (doc == null)
                 {
                     return new { error };
                 }
 
-                var partInfo = doc.GetPartInfo(_schemaManager.GetSchema);
-                if (partInfo == null)
+                var revision = _revisions.Current(doc);
+                if (ifRevisionNot == revision)
+                {
+                    return Unchanged(doc, revision);
+                }
+
+                // SwBridge's GetPartInfo is what evaluates mass and the
+                // bounding box, so it is only called when one of those is
+                // asked for — and even then is handed no schema: the tree and
+                // per-feature data come from FeatureDataCache, which re-reads
+                // only the features whose update stamp moved since the last
+                // call.
+                PartInfo? partInfo = null;
+                if (wanted.Contains("mass") || wanted.Contains("boundingBox"))
+                {
+                    partInfo = doc.GetPartInfo(_ => null);
+                    if (partInfo == null)
+                    {
+                        return new { error = $"Document '{doc.Info.Title}' is not a part with solid bodies." };
+                    }
+                }
+                else if (doc.Info.Type.ToString() != "Part")
                 {
                     return new { error = $"Document '{doc.Info.Title}' is not a part with solid bodies." };
                 }
 
-                var (material, density) = ReadMaterialInfo(doc);
-                var features = FeatureTreeFilter.Apply(partInfo.Features, includeFolderFeatures);
+                // camelCase keys spelled out: the serializer's naming policy
+                // does not apply to dictionary keys.
+                var response = new Dictionary<string, object?>
+                {
+                    ["path"] = partInfo?.Path ?? doc.Info.Path,
+                    ["title"] = partInfo?.Title ?? doc.Info.Title,
+                    ["revision"] = revision,
+                };
 
-                return new
+                if (wanted.Contains("mass"))
+                {
+                    response["mass"] = partInfo!.Mass;
+                }
+
+                if (wanted.Contains("material") || wanted.Contains("density"))
                 {
-                    partInfo.Path,
-                    partInfo.Title,
-                    partInfo.Mass,
-                    Material = material,
-                    Density = density,
-                    Features = features.Select(f => new
+                    var (material, density) = ReadMaterialInfo(doc, wanted.Contains("material"), wanted.Contains("density"));
+                    if (wanted.Contains("material"))
+                    {
+                        response["material"] = material;
+                    }
+
+                    if (wanted.Contains("density"))
+                    {
+                        response["density"] = density;
+                    }
+                }
+
+                if (wanted.Contains("features"))
+                {
+                    var query = new FeatureQuery(includeFolderFeatures, typeNames, excludeTypeNames, namePattern, offset, limit);
+                    var page = _connection.Dispatcher.Run(() => _featureData.Read(doc, _schemaManager.GetSchema, query));
+                    response["totalCount"] = page.TotalCount;
+                    response["offset"] = query.Offset;
+                    response["returned"] = page.Features.Count;
+                    response["hasMore"] = query.Offset + page.Features.Count < page.TotalCount;
+                    response["features"] = page.Features.Select(f => new
                     {
                         f.Name,
                         f.TypeName,
-                        Known = f.Properties != null,
-                        Data = f.Properties,
-                    }),
-                    partInfo.BoundingBox,
-                };
+                        Known = f.Data != null,
+                        f.Data,
+                    });
+
+                    // Only when there is something to report, so a healthy
+                    // schema's response is unchanged.
+                    if (page.Unreadable.Count > 0)
+                    {
+                        response["unreadableProperties"] = page.Unreadable;
+                    }
+                }
+
+                if (wanted.Contains("boundingBox"))
+                {
+                    response["boundingBox"] = partInfo!.BoundingBox;
+                }
+
+                return response;
             }
-            catch (SwBridgeException ex)
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
             {
                 // Covers SwNotRunningException (SolidWorks closed) and, since
                 // SwBridge 0.5.0, the SwBridgeException DocumentManager.Resolve
                 // throws when documentName is ambiguous — that used to escape
-                // as an unhandled exception here.
+                // as an unhandled exception here. The COM exceptions cover the
+                // feature-data walk, which (unlike GetPartInfo) is this
+                // server's own code.
+                return new { error = ex.Message };
+            }
+        }
+
+        [McpServerTool, Description(
+            "Gets an open SolidWorks assembly's component tree, one level and one page at a time: each component's " +
+            "name (its path from the top level, e.g. 'Frame-1/Bracket-2'), referenced file and configuration, " +
+            "suppression state (including 'lightweight'), transform, and child count. Pass a component's name as " +
+            "'parent' to list its children, or depth > 1 to expand levels inline. Nothing is resolved into memory " +
+            "unless resolveLightweight is set, so a top-level assembly with thousands of components can be browsed " +
+            "page by page. Results are cached per document revision. Accepts ifRevisionNot exactly like get_part_info.")]
+        public object GetAssemblyInfo(
+            [Description("Which open assembly to inspect; may be omitted when exactly one document is open.")]
+            string? documentName = null,
+            [Description("A component's name (Name2, e.g. 'Frame-1' or 'Frame-1/Bracket-2') whose children to list. Omit for the top level.")]
+            string? parent = null,
+            [Description("Levels to list: 1 (default) is just the level, 2 adds each listed component's first page of children, and so on, up to 8.")]
+            int depth = 1,
+            [Description("Zero-based index into the listed level to start returning from.")]
+            int offset = 0,
+            [Description("Maximum components to return per level. Default 100.")]
+            int limit = 100,
+            [Description("Include each component's transform (rotation, translation in meters, scale). Default true.")]
+            bool includeTransforms = true,
+            [Description("Resolve the page's lightweight components before reading them. Loads them into memory; default false.")]
+            bool resolveLightweight = false,
+            [Description("The 'revision' from a previous response for this document; answered with {unchanged: true} and no walk when the document is still at it.")]
+            long? ifRevisionNot = null)
+        {
+            try
+            {
+                using var ticket = _scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, SwDispatcher.DefaultTimeout, out var busy);
+                if (ticket == null)
+                {
+                    return Busy(busy);
+                }
+
+                using var held = _metrics.Tools.Time("get_assembly_info");
+
+                var doc = ResolveDocument(documentName, out var error);
+                if (doc == null)
+                {
+                    return new { error };
+                }
+
+                if (doc.Info.Type.ToString() != "Assembly")
+                {
+                    return new { error = $"Document '{doc.Info.Title}' is not an assembly." };
+                }
+
+                var revision = _revisions.Current(doc);
+                if (ifRevisionNot == revision)
+                {
+                    return Unchanged(doc, revision);
+                }
+
+                var query = new AssemblyQuery(parent, depth, offset, limit, includeTransforms, resolveLightweight);
+                var page = _connection.Dispatcher.Run(() => _assemblyTrees.Read(doc, revision, query));
+                if (page == null)
+                {
+                    return new { error = $"No component named '{query.Parent}' in '{doc.Info.Title}'." };
+                }
+
+                return new
+                {
+                    path = doc.Info.Path,
+                    title = doc.Info.Title,
+                    revision,
+                    parent = query.Parent,
+                    depth = query.Depth,
+                    totalCount = page.TotalCount,
+                    offset = query.Offset,
+                    returned = page.Components.Count,
+                    hasMore = query.Offset + page.Components.Count < page.TotalCount,
+                    components = page.Components,
+                };
+            }
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
+            {
                 return new { error = ex.Message };
             }
         }
@@ -114,17 +358,34 @@ namespace swmcp.server.Tools
             "rebuild is outstanding. Passive probes only — nothing here writes to the document or forces a rebuild " +
             "(unlike the 'rebuild' operation or the noNewRebuildErrors verify check). Use this after reconnecting to a " +
             "session you did not start (e.g. after a client crash) to discover a dangling sketch or stale selection " +
-            "without having to attempt a write first, or mid-plan to confirm ambient state before the next step.")]
+            "without having to attempt a write first, or mid-plan to confirm ambient state before the next step. Accepts " +
+            "ifRevisionNot exactly like get_part_info.")]
         public object GetDocumentState(
             [Description("Which open document to inspect (title, file name, or path). Required — no active-document fallback.")]
-            string documentName)
+            string documentName,
+            [Description("The 'revision' from a previous response for this document; answered with {unchanged: true} and no probes when the document is still at it.")]
+            long? ifRevisionNot = null)
         {
             try
             {
-                var doc = _documents.Resolve(documentName);
+                using var ticket = _scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, SwDispatcher.DefaultTimeout, out var busy);
+                if (ticket == null)
+                {
+                    return Busy(busy);
+                }
+
+                using var held = _metrics.Tools.Time("get_document_state");
+
+                var doc = ResolveDocument(documentName, out var error);
                 if (doc == null)
                 {
-                    return new { error = $"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}" };
+                    return new { error };
+                }
+
+                var revision = _revisions.Current(doc);
+                if (ifRevisionNot == revision)
+                {
+                    return Unchanged(doc, revision);
                 }
 
                 return _connection.Dispatcher.Run<object>(() =>
@@ -139,6 +400,7 @@ namespace swmcp.server.Tools
                     return new
                     {
                         documentName = doc.Info.Title,
+                        revision,
                         inSketchMode,
                         activeSketch = activeSketchName,
                         featureCount,
@@ -148,7 +410,7 @@ namespace swmcp.server.Tools
                     };
                 });
             }
-            catch (SwBridgeException ex)
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
             {
                 return new { error = ex.Message };
             }
@@ -187,6 +449,17 @@ namespace swmcp.server.Tools
             return new { registered = featureType, propertyCount = specs.Count };
         }
 
+        // Reads counters only — never waits for the dispatcher, so it answers
+        // even (especially) while SolidWorks is busy.
+        [McpServerTool, Description(
+            "Reports where the server's time has gone since it started: the dispatcher queue (depth, admitted, " +
+            "rejected as busy, and a histogram of how long requests waited for SolidWorks), each tool's time holding " +
+            "SolidWorks' dispatcher, each recipe's time per phase (resolveDocument, bind, requires, target, invoke, " +
+            "verify, convert, snapshot), each COM member's call count and round-trip time, and every cache's hit rate. " +
+            "Histograms give count, total, mean, p50, p95 and max in milliseconds, plus their non-empty buckets. " +
+            "Does not touch SolidWorks.")]
+        public object GetServerMetrics() => _metrics.Snapshot();
+
         // Gap #4 (UAT re-verdict): get_part_info reported mass with no way to
         // confirm what material (if any) produced it — an unassigned part
         // computes at water's density (1000 kg/m^3), a plausible-looking
@@ -195,7 +468,10 @@ namespace swmcp.server.Tools
         // never via a strongly-typed interop cast — consistent with "swmcp
         // contains no interop code" even where SwBridge's raw ModelDoc2
         // escape hatch would make a typed cast easy to write.
-        private (string? Material, double? Density) ReadMaterialInfo(SwDocument doc) =>
+        //
+        // Each half is read only when asked for: density needs a
+        // CreateMassProperty evaluation, the expensive part of this call.
+        private (string? Material, double? Density) ReadMaterialInfo(SwDocument doc, bool readMaterial, bool readDensity) =>
             _connection.Dispatcher.Run(() =>
             {
                 // IPartDoc.GetMaterialPropertyName2's second parameter is a
@@ -213,7 +489,7 @@ namespace swmcp.server.Tools
                 // just below, which has no ByRef parameter and works late-bound
                 // exactly as expected.
                 string? material = null;
-                if (doc.Model is PartDoc partDoc)
+                if (readMaterial && doc.Model is PartDoc partDoc)
                 {
                     var materialName = partDoc.GetMaterialPropertyName2("", out _);
                     if (!string.IsNullOrWhiteSpace(materialName))
@@ -227,7 +503,8 @@ namespace swmcp.server.Tools
                 object? massProperty = null;
                 try
                 {
-                    if (ComPropertyReader.TryGetProperty(doc.Model, "Extension", out extension) && extension != null &&
+                    if (readDensity &&
+                        ComPropertyReader.TryGetProperty(doc.Model, "Extension", out extension) && extension != null &&
                         ComPropertyReader.TryGetMember(extension, "CreateMassProperty", null, out massProperty) && massProperty != null &&
                         ComPropertyReader.TryGetProperty(massProperty, "Density", out var densityValue) && densityValue is double d)
                     {
@@ -279,38 +556,87 @@ namespace swmcp.server.Tools
             }
         }
 
-        private SwDocument? ResolveDocument(string? documentName, out string? error)
+        /// <summary>
+        /// The canonical names of the requested <c>get_part_info</c> sections
+        /// (every section for null or empty), or null with
+        /// <paramref name="error"/> set when one is not a section. Internal
+        /// (not private) so swmcp.server.tests can check it without a live
+        /// document.
+        /// </summary>
+        internal static IReadOnlySet<string>? ParseFields(IReadOnlyList<string>? fields, out string? error)
         {
             error = null;
-            if (documentName != null)
+            if (fields == null || fields.Count == 0)
             {
-                var resolved = _documents.Resolve(documentName);
-                if (resolved == null)
+                return new HashSet<string>(PartInfoFields, StringComparer.Ordinal);
+            }
+
+            var wanted = new HashSet<string>(StringComparer.Ordinal);
+            foreach (var field in fields)
+            {
+                var canonical = PartInfoFields.FirstOrDefault(f => string.Equals(f, field?.Trim(), StringComparison.OrdinalIgnoreCase));
+                if (canonical == null)
                 {
-                    error = $"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}";
+                    error = $"Unknown field '{field}'. Valid fields: {string.Join(", ", PartInfoFields)}.";
+                    return null;
                 }
-                return resolved;
+
+                wanted.Add(canonical);
+            }
+
+            return wanted;
+        }
+
+        private static object Busy(string? refusal) => new { error = refusal, busy = true };
+
+        private static object Unchanged(SwDocument doc, long revision) => new
+        {
+            documentName = doc.Info.Title,
+            revision,
+            unchanged = true,
+        };
+
+        // ADR 0003: DocumentIndex's lookups (its snapshot rebuild, its
+        // notification subscriptions, a closed document's target eviction)
+        // make COM calls of their own, so the whole lookup — error text
+        // included — runs as one unit on the dispatcher thread.
+        private SwDocument? ResolveDocument(string? documentName, out string? error)
+        {
+            var (doc, message) = _connection.Dispatcher.Run(() => FindDocument(documentName));
+            error = message;
+            return doc;
+        }
+
+        // Dispatcher thread only; see ResolveDocument.
+        private (SwDocument? Document, string? Error) FindDocument(string? documentName)
+        {
+            if (documentName != null)
+            {
+                var resolved = _documents.Resolve(documentName);
+                return resolved == null
+                    ? (null, $"No open document matches '{documentName}'. Open documents: {DescribeOpenDocuments()}")
+                    : (resolved, null);
             }
 
             var open = _documents.GetOpenDocuments();
             if (open.Count == 1)
             {
-                return open[0];
+                return (open[0], null);
             }
 
-            error = open.Count == 0
+            return (null, open.Count == 0
                 ? "No documents are open in SolidWorks."
-                : $"Multiple documents are open — specify documentName. Open documents: {DescribeOpenDocuments()}";
-            return null;
+                : $"Multiple documents are open — specify documentName. Open documents: {DescribeOpenDocuments()}");
         }
 
+        // Dispatcher thread only; see ResolveDocument.
         private string DescribeOpenDocuments()
         {
             try
             {
                 return string.Join(", ", _documents.ListOpenDocuments().Select(d => $"{d.Title} ({d.Type})"));
             }
-            catch (SwBridgeException ex)
+            catch (Exception ex) when (ex is SwBridgeException or COMException or InvalidComObjectException)
             {
                 return $"(could not list open documents: {ex.Message})";
             }
@@ -0,0 +1,95 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. The get_assembly_info page cache's
+    /// revision rules, the query's bounds and the transform layout; the tree
+    /// walk itself needs a live assembly.
+    /// </summary>
+    public class AssemblyTreeCacheTests
+    {
+        private const string Key = @"C:\assemblies\frame.SLDASM";
+
+        private static readonly AssemblyPage Page = new(new List<AssemblyComponent>(), 0);
+
+        private readonly AssemblyTreeCache _cache = new();
+
+        [Fact]
+        public void SameRevisionAndQuery_IsAHit()
+        {
+            _cache.Store(Key, 7, new AssemblyQuery(limit: 50), Page);
+
+            Assert.True(_cache.TryGet(Key, 7, new AssemblyQuery(limit: 50), out var page));
+            Assert.Same(Page, page);
+            Assert.Equal(1, _cache.Hits);
+        }
+
+        [Fact]
+        public void NewRevision_DropsTheDocumentsPages()
+        {
+            _cache.Store(Key, 7, new AssemblyQuery(), Page);
+            _cache.Store(Key, 8, new AssemblyQuery(parent: "Frame-1"), Page);
+
+            Assert.False(_cache.TryGet(Key, 7, new AssemblyQuery(), out _));
+            Assert.False(_cache.TryGet(Key, 8, new AssemblyQuery(), out _));
+            Assert.True(_cache.TryGet(Key, 8, new AssemblyQuery(parent: " Frame-1 "), out _));
+        }
+
+        [Fact]
+        public void DifferentPage_IsAMiss()
+        {
+            _cache.Store(Key, 7, new AssemblyQuery(offset: 0), Page);
+
+            Assert.False(_cache.TryGet(Key, 7, new AssemblyQuery(offset: 100), out _));
+            Assert.False(_cache.TryGet(Key, 7, new AssemblyQuery(transforms: false), out _));
+            Assert.Equal(2, _cache.Misses);
+        }
+
+        [Fact]
+        public void Forget_DropsEverything()
+        {
+            _cache.Store(Key, 7, new AssemblyQuery(), Page);
+            _cache.Forget(Key);
+
+            Assert.False(_cache.TryGet(Key, 7, new AssemblyQuery(), out _));
+        }
+
+        [Fact]
+        public void Query_IsBounded()
+        {
+            var query = new AssemblyQuery(parent: "  ", depth: 99, offset: -5, limit: -1);
+
+            Assert.Null(query.Parent);
+            Assert.Equal(AssemblyQuery.MaxDepth, query.Depth);
+            Assert.Equal(0, query.Offset);
+            Assert.Equal(0, query.Limit);
+            Assert.Equal(1, new AssemblyQuery(depth: 0).Depth);
+        }
+
+        [Fact]
+        public void ArrayData_SplitsIntoRotationTranslationAndScale()
+        {
+            var data = new double[] { 1, 0, 0, 0, 1, 0, 0, 0, 1, 0.1, 0.2, 0.3, 1, 0, 0, 0 };
+
+            var transform = AssemblyTreeCache.FromArrayData(data)!;
+
+            Assert.Equal(new double[] { 1, 0, 0, 0, 1, 0, 0, 0, 1 }, transform.Rotation);
+            Assert.Equal(new[] { 0.1, 0.2, 0.3 }, transform.Translation);
+            Assert.Equal(1, transform.Scale);
+            Assert.Null(AssemblyTreeCache.FromArrayData(new double[3]));
+            Assert.Null(AssemblyTreeCache.FromArrayData(null));
+        }
+
+        [Theory]
+        [InlineData(1, "lightweight")]
+        [InlineData(3, "resolved")]
+        [InlineData(0, "suppressed")]
+        [InlineData(null, "unknown")]
+        public void SuppressionState_IsNamed(int? state, string expected)
+        {
+            Assert.Equal(expected, AssemblyTreeCache.SuppressionName(state));
+        }
+    }
+}
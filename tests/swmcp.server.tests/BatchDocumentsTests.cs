@@ -0,0 +1,84 @@
+using System.Runtime.InteropServices;
+using SwBridge;
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required (the fake resolver never matches, so
+    /// no SwDocument is needed). Fixes the contract RunBatch relies on: each
+    /// distinct name is looked up once per batch, and a failed lookup replays
+    /// the same way on every step that names it, until a step that creates
+    /// or renames a document makes the batch forget it.
+    /// </summary>
+    public class BatchDocumentsTests
+    {
+        [Fact]
+        public void ResolvesEachDistinctNameOnce()
+        {
+            var lookups = new List<string>();
+            SwDocument? Resolve(string name)
+            {
+                lookups.Add(name);
+                return null;
+            }
+
+            var documents = new BatchDocuments(new[] { "Bracket", null, "bracket", "Fixture", " ", "Bracket" }, Resolve);
+            documents.Resolve("BRACKET");
+            documents.Resolve("Fixture");
+
+            Assert.Equal(2, documents.Count);
+            Assert.Equal(new[] { "Bracket", "Fixture" }, lookups);
+        }
+
+        [Fact]
+        public void NameOutsideTheUpFrontSet_IsResolvedOnDemandThenCached()
+        {
+            var lookups = 0;
+            var documents = new BatchDocuments(Array.Empty<string?>(), _ =>
+            {
+                lookups++;
+                return null;
+            });
+
+            Assert.Null(documents.Resolve("Part1"));
+            Assert.Null(documents.Resolve("Part1"));
+            Assert.Equal(1, lookups);
+        }
+
+        [Fact]
+        public void FailedLookup_IsReplayedNotRetried()
+        {
+            var lookups = 0;
+            var documents = new BatchDocuments(new[] { "Part1" }, _ =>
+            {
+                lookups++;
+                throw new COMException("RPC server unavailable");
+            });
+
+            var first = Assert.Throws<COMException>(() => documents.Resolve("Part1"));
+            var second = Assert.Throws<COMException>(() => documents.Resolve("part1"));
+
+            Assert.Same(first, second);
+            Assert.Equal(1, lookups);
+        }
+
+        [Fact]
+        public void Forget_LooksCachedMissesUpAgain()
+        {
+            var lookups = 0;
+            var documents = new BatchDocuments(new[] { "Part2" }, _ =>
+            {
+                lookups++;
+                return null;
+            });
+
+            documents.Forget();
+            Assert.Null(documents.Resolve("Part2"));
+            Assert.Null(documents.Resolve("Part2"));
+
+            Assert.Equal(2, lookups);
+        }
+    }
+}
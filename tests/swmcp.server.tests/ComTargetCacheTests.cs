@@ -0,0 +1,112 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. Plain objects stand in for the
+    /// model and target RCWs, and the release is recorded instead of made;
+    /// the ComPath walk itself needs a live SolidWorks.
+    /// </summary>
+    public class ComTargetCacheTests
+    {
+        [Theory]
+        [InlineData("FeatureManager", true)]
+        [InlineData("Extension.SelectionManager", true)]
+        [InlineData("sketchmanager", true)]
+        [InlineData("ActiveView", false)]
+        [InlineData("SketchManager.ActiveSketch", false)]
+        [InlineData("", false)]
+        [InlineData(null, false)]
+        public void IsCacheable_OnlyPathsOfPerDocumentManagers(string? path, bool expected)
+        {
+            Assert.Equal(expected, ComTargetCache.IsCacheable(path));
+        }
+
+        [Fact]
+        public void CachesPerDocument_PathsIgnoreCase()
+        {
+            var cache = new ComTargetCache(_ => { });
+            var model = new object();
+            var featureManager = new object();
+
+            Assert.False(cache.TryGet(model, "FeatureManager", out _));
+            cache.Add(model, "FeatureManager", featureManager);
+
+            Assert.True(cache.TryGet(model, "featuremanager", out var hit));
+            Assert.Same(featureManager, hit);
+            Assert.False(cache.TryGet(new object(), "FeatureManager", out _));
+            Assert.Equal(1, cache.Hits);
+            Assert.Equal(2, cache.Misses);
+        }
+
+        [Fact]
+        public void Add_KeepsTheFirstTargetAndReleasesTheDuplicate()
+        {
+            var released = new List<object>();
+            var cache = new ComTargetCache(released.Add);
+            var model = new object();
+            var first = new object();
+            var second = new object();
+
+            Assert.Same(first, cache.Add(model, "SketchManager", first));
+            Assert.Same(first, cache.Add(model, "SketchManager", second));
+
+            Assert.Equal(new[] { second }, released);
+        }
+
+        [Fact]
+        public void Add_UncacheablePathLeavesTheTargetWithTheCaller()
+        {
+            var released = new List<object>();
+            var cache = new ComTargetCache(released.Add);
+            var view = new object();
+
+            Assert.Same(view, cache.Add(new object(), "ActiveView", view));
+
+            Assert.Empty(released);
+            Assert.Equal(0, cache.Count);
+        }
+
+        [Fact]
+        public void OverCapacity_ReleasesTheLeastRecentlyUsedDocumentOnly()
+        {
+            var released = new List<object>();
+            var cache = new ComTargetCache(released.Add);
+            var models = Enumerable.Range(0, ComTargetCache.Capacity).Select(_ => new object()).ToList();
+            var targets = models.Select(_ => new object()).ToList();
+            for (var i = 0; i < models.Count; i++)
+            {
+                cache.Add(models[i], "FeatureManager", targets[i]);
+            }
+
+            // Touch the oldest, so the second-oldest is now least recently used.
+            Assert.True(cache.TryGet(models[0], "FeatureManager", out _));
+            cache.Add(new object(), "FeatureManager", new object());
+
+            Assert.Equal(new[] { targets[1] }, released);
+            Assert.Equal(ComTargetCache.Capacity, cache.Count);
+            Assert.True(cache.TryGet(models[0], "FeatureManager", out _));
+        }
+
+        [Fact]
+        public void EvictAndClear_ReleaseEachTargetOnce()
+        {
+            var released = new List<object>();
+            var cache = new ComTargetCache(released.Add);
+            var a = new object();
+            var b = new object();
+            cache.Add(a, "FeatureManager", "a.fm");
+            cache.Add(a, "Extension", "a.ext");
+            cache.Add(b, "SketchManager", "b.sm");
+
+            cache.Evict(a);
+            cache.Evict(a);
+            Assert.Equal(new[] { "a.ext", "a.fm" }, released.Cast<string>().Order(StringComparer.Ordinal));
+
+            cache.Clear();
+            Assert.Equal(3, released.Count);
+            Assert.Equal(0, cache.Count);
+        }
+    }
+}
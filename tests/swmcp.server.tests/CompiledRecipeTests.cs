@@ -0,0 +1,97 @@
+using System.Text.Json;
+using swmcp.server.Models;
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. Pins what compilation works out
+    /// once per recipe, and that binding the compiled form behaves exactly
+    /// like binding the authored recipe.
+    /// </summary>
+    public class CompiledRecipeTests
+    {
+        private static JsonElement Parse(string json) => JsonDocument.Parse(json).RootElement.Clone();
+
+        private static OperationRecipe Recipe() => new()
+        {
+            Name = "extrude_boss",
+            Kind = "Method",
+            Target = "FeatureManager",
+            Member = "FeatureExtrusion3",
+            Params = new List<OperationParam>
+            {
+                new() { Name = "depth", Type = "Length", Required = true },
+                new() { Name = "endCondition", Type = "enum", Default = Parse("0") },
+                new() { Name = "callout", Type = "comNull" },
+            },
+            Requires = new List<RequireCheck> { new() { Check = "INSKETCHMODE" } },
+            Verify = new List<VerifyCheck> { new() { Check = "featureCountIncreased" }, new() { Check = "noNewRebuildErrors" } },
+            Returns = new ReturnsSpec { Type = "Feature" },
+        };
+
+        [Fact]
+        public void Compile_ParsesEveryVocabularyCaseInsensitively()
+        {
+            var compiled = CompiledRecipe.Compile(Recipe());
+
+            Assert.Equal(InvokeKind.Method, compiled.Kind);
+            Assert.Equal(new[] { ParamKind.Length, ParamKind.Int, ParamKind.ComNull }, compiled.Params.Select(p => p.Kind));
+            Assert.Equal(RequireKind.InSketchMode, compiled.Requires.Single().Kind);
+            Assert.Equal(new[] { VerifyKind.FeatureCountIncreased, VerifyKind.NoNewRebuildErrors }, compiled.Verify.Select(v => v.Kind));
+            Assert.Equal(ReturnKind.Feature, compiled.Returns);
+            Assert.True(compiled.NeedsPreFeatureCount);
+            Assert.False(compiled.NeedsPreSketchSegmentCount);
+            Assert.True(compiled.IsDocumentScoped);
+            Assert.False(compiled.IsNewPart);
+            Assert.Equal(1, compiled.ParamIndex["ENDCONDITION"]);
+            Assert.Equal("depth, endCondition, callout", compiled.DeclaredParamList);
+        }
+
+        [Fact]
+        public void Compile_UnknownValuesCompileToUnknown_NotThrow()
+        {
+            var recipe = Recipe();
+            recipe.Kind = "invoke";
+            recipe.Returns = new ReturnsSpec { Type = "mystery" };
+            recipe.Verify.Add(new VerifyCheck { Check = "looksRight" });
+
+            var compiled = CompiledRecipe.Compile(recipe);
+
+            Assert.Equal(InvokeKind.Unknown, compiled.Kind);
+            Assert.Equal(ReturnKind.Unknown, compiled.Returns);
+            Assert.Equal(VerifyKind.Unknown, compiled.Verify[^1].Kind);
+        }
+
+        [Fact]
+        public void Bind_CompiledRecipeIsReusedAcrossCalls()
+        {
+            var compiled = CompiledRecipe.Compile(Recipe());
+
+            var first = OperationRunner.Bind(compiled, new Dictionary<string, JsonElement> { ["depth"] = Parse("\"5 mm\"") });
+            var second = OperationRunner.Bind(compiled, new Dictionary<string, JsonElement> { ["Depth"] = Parse("\"2 cm\"") });
+
+            Assert.Null(first.Error);
+            Assert.Null(second.Error);
+            Assert.Equal(0.005, (double)first.Positional[0]!, 9);
+            Assert.Equal(0.02, (double)second.Positional[0]!, 9);
+            Assert.Equal(0, second.Positional[1]);
+        }
+
+        [Fact]
+        public void Bind_SameParamTwiceDifferingInCase_IsRefused()
+        {
+            var args = new Dictionary<string, JsonElement>
+            {
+                ["depth"] = Parse("\"5 mm\""),
+                ["DEPTH"] = Parse("\"6 mm\""),
+            };
+
+            var (_, _, error) = OperationRunner.Bind(CompiledRecipe.Compile(Recipe()), args);
+
+            Assert.NotNull(error);
+            Assert.Contains("'depth' is given more than once", error);
+        }
+    }
+}
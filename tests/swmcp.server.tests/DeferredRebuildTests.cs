@@ -0,0 +1,58 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required: the attribution of a deferred
+    /// rebuild's failing feature to the step that created it works on the
+    /// steps' already-converted returns, so anonymous objects stand in for them.
+    /// </summary>
+    public class DeferredRebuildTests
+    {
+        private static OperationResult Step(object? ret) => new(true, null, ret, null, null);
+
+        [Fact]
+        public void FeatureReturn_IsMatchedByNameIgnoringCase()
+        {
+            var results = new[]
+            {
+                Step(null),
+                Step(new { Name = "Boss-Extrude1", TypeName = "Extrusion" }),
+                Step(true),
+                Step(new { Name = "Fillet1", TypeName = "Fillet" }),
+            };
+
+            Assert.Equal(3, DeferredRebuild.FindCreatingStep("fillet1", results));
+            Assert.Equal(1, DeferredRebuild.FindCreatingStep("Boss-Extrude1", results));
+        }
+
+        [Fact]
+        public void VectorizedStep_IsMatchedThroughItsItems()
+        {
+            var results = new[]
+            {
+                Step(new
+                {
+                    count = 2,
+                    items = new object[]
+                    {
+                        new { @return = new { name = "Cut-Extrude1" }, boundArgs = (object?)null },
+                        new { @return = new { name = "Cut-Extrude2" }, boundArgs = (object?)null },
+                    },
+                }),
+            };
+
+            Assert.Equal(0, DeferredRebuild.FindCreatingStep("Cut-Extrude2", results));
+        }
+
+        [Fact]
+        public void LaterStepWins_AndUnknownFeatureIsNull()
+        {
+            var results = new[] { Step(new { name = "Sketch1" }), Step(new { name = "Sketch1" }) };
+
+            Assert.Equal(1, DeferredRebuild.FindCreatingStep("Sketch1", results));
+            Assert.Null(DeferredRebuild.FindCreatingStep("Boss-Extrude1", results));
+        }
+    }
+}
@@ -0,0 +1,54 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. The table DispatchInvoker consults;
+    /// the COM half (GetIDsOfNames, the [DISPID=n] invoke) needs a live
+    /// SolidWorks and is covered by the smoke tests.
+    /// </summary>
+    public class DispatchIdCacheTests
+    {
+        private static readonly Guid FeatureManager = new("cbc1c6f0-6b6e-4d39-9f00-4b46f8a9e4a1");
+        private static readonly Guid SketchManager = new("0d7f5b8e-1f8b-4c55-8a0f-2c3a1e2f9b10");
+
+        [Fact]
+        public void CountsHitsAndMisses_MemberNamesIgnoreCase()
+        {
+            var cache = new DispatchIdCache();
+
+            Assert.False(cache.TryGet(FeatureManager, "FeatureExtrusion3", out _));
+            cache.Add(FeatureManager, "FeatureExtrusion3", 42);
+
+            Assert.True(cache.TryGet(FeatureManager, "featureextrusion3", out var dispId));
+            Assert.Equal(42, dispId);
+            Assert.Equal(1, cache.Hits);
+            Assert.Equal(1, cache.Misses);
+        }
+
+        [Fact]
+        public void EntriesAreKeyedOnTypeAsWellAsName()
+        {
+            var cache = new DispatchIdCache();
+            cache.Add(FeatureManager, "InsertSketch", 7);
+
+            Assert.False(cache.TryGet(SketchManager, "InsertSketch", out _));
+            Assert.Equal(1, cache.Count);
+        }
+
+        [Fact]
+        public void Invalidate_RemovesTheEntryAndCountsOnlyRealRemovals()
+        {
+            var cache = new DispatchIdCache();
+            cache.Add(SketchManager, "CreateLine", 3);
+
+            cache.Invalidate(SketchManager, "CREATELINE");
+            cache.Invalidate(SketchManager, "CreateLine");
+
+            Assert.False(cache.TryGet(SketchManager, "CreateLine", out _));
+            Assert.Equal(1, cache.Invalidations);
+            Assert.Equal(0, cache.Count);
+        }
+    }
+}
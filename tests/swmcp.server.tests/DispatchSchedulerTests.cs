@@ -0,0 +1,150 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. Admission, priority and per-source
+    /// round-robin of the dispatcher gate, with tickets standing in for work.
+    /// </summary>
+    public class DispatchSchedulerTests
+    {
+        private readonly DispatchScheduler _scheduler = new(maxQueueDepth: 3);
+
+        [Fact]
+        public void IdleDispatcher_GrantsAtOnce()
+        {
+            using var ticket = _scheduler.TryEnter(DispatchPriority.Write, DispatchScheduler.Requests)!;
+
+            Assert.True(ticket.IsGranted);
+            Assert.Equal(0, _scheduler.QueueDepth);
+        }
+
+        [Fact]
+        public void ReadsGoBeforeWritesAndWritesBeforeJobs()
+        {
+            var holder = Enter(DispatchPriority.Write);
+            var job = Enter(DispatchPriority.Background, "job1");
+            var write = Enter(DispatchPriority.Write);
+            var read = Enter(DispatchPriority.Read);
+
+            Assert.Equal(new[] { read, write, job }, GrantOrder(holder, read, write, job));
+        }
+
+        [Fact]
+        public void SourcesTakeTurnsWithinAPriority()
+        {
+            var holder = Enter(DispatchPriority.Read);
+            var a1 = Enter(DispatchPriority.Background, "a");
+            var a2 = Enter(DispatchPriority.Background, "a");
+            var b1 = Enter(DispatchPriority.Background, "b");
+
+            Assert.Equal(new[] { a1, b1, a2 }, GrantOrder(holder, a1, a2, b1));
+        }
+
+        [Fact]
+        public void FullQueue_IsRefused()
+        {
+            var holder = Enter(DispatchPriority.Write);
+            for (var i = 0; i < 3; i++)
+            {
+                Enter(DispatchPriority.Read);
+            }
+
+            Assert.Null(_scheduler.TryEnter(DispatchPriority.Read, DispatchScheduler.Requests));
+            Assert.Null(_scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, TimeSpan.Zero, out var refusal));
+            Assert.Contains("busy", refusal);
+            Assert.Equal(2, _scheduler.Rejected);
+            Assert.True(holder.IsGranted);
+        }
+
+        [Fact]
+        public void QueuedJobs_DoNotCrowdOutInteractiveRequests()
+        {
+            var scheduler = new DispatchScheduler(maxQueueDepth: 3, maxQueuedJobs: 3);
+            var holder = scheduler.TryEnter(DispatchPriority.Write, DispatchScheduler.Requests)!;
+            for (var i = 0; i < 3; i++)
+            {
+                Assert.NotNull(scheduler.TryEnter(DispatchPriority.Background, $"job{i}"));
+            }
+
+            Assert.Null(scheduler.TryEnter(DispatchPriority.Background, "job3"));
+            var read = scheduler.TryEnter(DispatchPriority.Read, DispatchScheduler.Requests);
+            Assert.NotNull(read);
+
+            holder.Dispose();
+            Assert.True(read!.IsGranted);
+        }
+
+        [Fact]
+        public void WaitThatRunsOut_GivesUpItsPlace()
+        {
+            var holder = Enter(DispatchPriority.Write);
+
+            Assert.Null(_scheduler.Admit(DispatchPriority.Read, DispatchScheduler.Requests, TimeSpan.FromMilliseconds(10), out var refusal));
+            Assert.Contains("waited", refusal);
+            Assert.Equal(0, _scheduler.QueueDepth);
+
+            var next = Enter(DispatchPriority.Write);
+            holder.Dispose();
+            Assert.True(next.IsGranted);
+        }
+
+        [Fact]
+        public void CancelledWait_ReturnsFalse()
+        {
+            Enter(DispatchPriority.Write);
+            using var job = Enter(DispatchPriority.Background, "job1");
+            using var cancellation = new CancellationTokenSource();
+            cancellation.Cancel();
+
+            Assert.False(job.Wait(Timeout.InfiniteTimeSpan, cancellation.Token));
+        }
+
+        [Fact]
+        public void CancelledAdmit_SaysNothingRan()
+        {
+            Enter(DispatchPriority.Write);
+            using var cancellation = new CancellationTokenSource();
+            cancellation.Cancel();
+
+            Assert.Null(_scheduler.Admit(
+                DispatchPriority.Write, DispatchScheduler.Requests, TimeSpan.FromSeconds(30), out var refusal, cancellation.Token));
+            Assert.Contains("nothing ran", refusal);
+            Assert.Equal(0, _scheduler.QueueDepth);
+        }
+
+        [Fact]
+        public void EveryGrant_RecordsItsWait()
+        {
+            var holder = Enter(DispatchPriority.Write);
+            var next = Enter(DispatchPriority.Read);
+            Thread.Sleep(5);
+            holder.Dispose();
+
+            Assert.Equal(2, _scheduler.WaitTimes.Summary().Count);
+            var wait = next.QueueWait;
+            Assert.True(wait >= TimeSpan.FromMilliseconds(5));
+            Thread.Sleep(2);
+            Assert.Equal(wait, next.QueueWait); // stops counting once granted
+        }
+
+        private DispatchTicket Enter(DispatchPriority priority, string source = DispatchScheduler.Requests) =>
+            _scheduler.TryEnter(priority, source)!;
+
+        // Releases the holder, then each ticket as it is granted, recording the order.
+        private static List<DispatchTicket> GrantOrder(DispatchTicket holder, params DispatchTicket[] waiting)
+        {
+            var order = new List<DispatchTicket>();
+            var current = holder;
+            while (order.Count < waiting.Length)
+            {
+                current.Dispose();
+                current = waiting.Single(t => t.IsGranted && !order.Contains(t));
+                order.Add(current);
+            }
+
+            return order;
+        }
+    }
+}
@@ -0,0 +1,43 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. The key rules DocumentIndex
+    /// resolves names by; the snapshot and notification half needs a live
+    /// SolidWorks.
+    /// </summary>
+    public class DocumentIndexTests
+    {
+        [Fact]
+        public void SavedDocument_AnswersToTitleFileNameAndFullPath()
+        {
+            var keys = DocumentIndex.KeysFor("bracket.SLDPRT", @"C:\work\bracket.SLDPRT").ToList();
+
+            Assert.Equal(new[] { "bracket.SLDPRT", @"C:\work\bracket.SLDPRT" }, keys);
+        }
+
+        [Fact]
+        public void UnsavedDocument_AnswersToItsTitleOnly()
+        {
+            Assert.Equal(new[] { "Part1" }, DocumentIndex.KeysFor("Part1", ""));
+            Assert.Equal(new[] { "Part1" }, DocumentIndex.KeysFor("Part1", null));
+        }
+
+        [Fact]
+        public void BuildKeys_IgnoresCase_AndKeepsEveryDocumentSharingAName()
+        {
+            var keys = DocumentIndex.BuildKeys(new (string, string?)[]
+            {
+                ("plate.SLDPRT", @"C:\a\plate.SLDPRT"),
+                ("plate.SLDPRT", @"C:\b\plate.SLDPRT"),
+                ("Part3", null),
+            });
+
+            Assert.Equal(new[] { 0, 1 }, keys["PLATE.sldprt"]);
+            Assert.Equal(new[] { 1 }, keys[@"c:\B\plate.sldprt"]);
+            Assert.Equal(new[] { 2 }, keys["part3"]);
+        }
+    }
+}
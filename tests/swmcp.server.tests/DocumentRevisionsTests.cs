@@ -0,0 +1,77 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. Fixes the one property clients
+    /// rely on when they send ifRevisionNot: a revision is never handed out
+    /// twice, so a stale one can only ever read as "changed".
+    /// </summary>
+    public class DocumentRevisionsTests
+    {
+        [Fact]
+        public void Current_IsStableUntilBumped()
+        {
+            var revisions = new DocumentRevisions();
+
+            var first = revisions.Current("Part1");
+
+            Assert.Equal(first, revisions.Current("Part1"));
+            Assert.Equal(first, revisions.Current("part1")); // keys are case-insensitive, like document resolution
+        }
+
+        [Fact]
+        public void Bump_MovesToAStrictlyLargerRevision()
+        {
+            var revisions = new DocumentRevisions();
+            var before = revisions.Current("Part1");
+
+            var after = revisions.Bump("Part1");
+
+            Assert.True(after > before);
+            Assert.Equal(after, revisions.Current("Part1"));
+        }
+
+        // A document seen for the first time (e.g. Part1 after save_as gave it
+        // a path) must never start at a revision some other key already used —
+        // otherwise a client's stale ifRevisionNot could match by coincidence.
+        [Fact]
+        public void NewKey_NeverReusesAnIssuedRevision()
+        {
+            var revisions = new DocumentRevisions();
+            var issued = new HashSet<long>
+            {
+                revisions.Current("Part1"),
+                revisions.Bump("Part1"),
+                revisions.Current("Part2"),
+                revisions.Bump("Part2"),
+            };
+
+            var fresh = revisions.Current(@"C:\parts\Part1.SLDPRT");
+
+            Assert.DoesNotContain(fresh, issued);
+            Assert.True(fresh > issued.Max());
+        }
+
+        // Closed without saving and opened again: same path, edits gone — the
+        // old revision must not read as "unchanged".
+        [Fact]
+        public void ForgottenKey_ComesBackAtAFreshRevision()
+        {
+            var revisions = new DocumentRevisions();
+            var before = revisions.Bump(@"C:\parts\Part1.SLDPRT");
+
+            revisions.Forget(@"c:\parts\part1.sldprt");
+
+            Assert.True(revisions.Current(@"C:\parts\Part1.SLDPRT") > before);
+        }
+
+        [Fact]
+        public void KeyFor_PrefersPathOverTitle()
+        {
+            Assert.Equal(@"C:\parts\Bracket.SLDPRT", DocumentRevisions.KeyFor("Bracket.SLDPRT", @"C:\parts\Bracket.SLDPRT"));
+            Assert.Equal("Part3", DocumentRevisions.KeyFor("Part3", ""));
+        }
+    }
+}
@@ -0,0 +1,141 @@
+using SwBridge;
+using swmcp.server.Services;
+using Xunit;
+using FeatureVersion = swmcp.server.Services.FeatureDataCache.FeatureVersion;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. The reuse rules of the
+    /// get_part_info feature-data cache; the tree walk and definition reads
+    /// need a live SolidWorks.
+    /// </summary>
+    public class FeatureDataCacheTests
+    {
+        private static readonly IReadOnlyList<PropertySpec> FilletSchema = new List<PropertySpec> { PropertySpec.Bare("DefaultRadius") };
+
+        private readonly FeatureDataCache _cache = new(new ComTargetCache(_ => { }), new FeatureDefinitionReader());
+        private readonly List<string> _read = new();
+
+        [Fact]
+        public void UnchangedFeatures_AreNotReadAgain()
+        {
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema), new FeatureVersion("Fillet2", 9, false, FilletSchema));
+            var data = Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema), new FeatureVersion("Fillet2", 10, false, FilletSchema));
+
+            Assert.Equal(new[] { "Fillet1", "Fillet2", "Fillet2" }, _read);
+            Assert.Equal("Fillet2", data["Fillet2"]!["DefaultRadius"]);
+            Assert.Equal(3, _cache.Reads);
+            Assert.Equal(1, _cache.Reuses);
+        }
+
+        [Fact]
+        public void SuppressionOrSchemaChange_ForcesARead()
+        {
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+            Refresh(new FeatureVersion("Fillet1", 7, true, FilletSchema));
+            Refresh(new FeatureVersion("Fillet1", 7, true, new List<PropertySpec>(FilletSchema)));
+
+            Assert.Equal(3, _read.Count);
+        }
+
+        [Fact]
+        public void UnreadableStamp_IsNeverReused()
+        {
+            Refresh(new FeatureVersion("Fillet1", null, false, FilletSchema));
+            Refresh(new FeatureVersion("Fillet1", null, false, FilletSchema));
+
+            Assert.Equal(2, _read.Count);
+        }
+
+        [Fact]
+        public void IncompleteRead_IsNeverReused()
+        {
+            var features = new[] { new FeatureVersion("Fillet1", 7, false, FilletSchema) };
+            var present = new HashSet<string> { "Fillet1" };
+            _cache.Refresh(Key, present, features, f => (Read(f).Data, false));
+            Refresh(features);
+            Refresh(features);
+
+            Assert.Equal(2, _read.Count);
+            Assert.Equal(1, _cache.Reuses);
+        }
+
+        [Fact]
+        public void FeaturesOffThePage_KeepTheirEntries()
+        {
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema), new FeatureVersion("Fillet2", 9, false, FilletSchema));
+            _cache.Refresh(Key, new HashSet<string> { "Fillet1", "Fillet2" }, new[] { new FeatureVersion("Fillet2", 9, false, FilletSchema) }, Read);
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+
+            Assert.Equal(new[] { "Fillet1", "Fillet2" }, _read);
+        }
+
+        [Fact]
+        public void PartialWalk_PrunesNothing()
+        {
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+            _cache.Refresh(Key, null, Array.Empty<FeatureVersion>(), Read);
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+
+            Assert.Single(_read);
+        }
+
+        [Fact]
+        public void FeaturesGoneFromTheTree_AreDropped()
+        {
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+            var data = Refresh();
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+
+            Assert.Empty(data);
+            Assert.Equal(2, _read.Count);
+        }
+
+        [Fact]
+        public void DefaultWalk_PrunesDespiteFolderNoise()
+        {
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema), new FeatureVersion("Fillet2", 9, false, FilletSchema));
+            var walk = Walk(FeatureQuery.Default, "MaterialFolder:Material", "Fillet:Fillet2");
+            _cache.Refresh(Key, walk.Present, walk.Versions, Read);
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+
+            Assert.Equal(new[] { "Fillet2" }, walk.Present);
+            Assert.Equal(new[] { "Fillet1", "Fillet2", "Fillet1" }, _read);
+        }
+
+        [Fact]
+        public void TypeFilteredWalk_PrunesNothing()
+        {
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+            var walk = Walk(new FeatureQuery(typeNames: new[] { "Chamfer" }), "Fillet:Fillet1", "Chamfer:Chamfer1");
+            _cache.Refresh(Key, walk.Present, walk.Versions, Read);
+            Refresh(new FeatureVersion("Fillet1", 7, false, FilletSchema));
+
+            Assert.Null(walk.Present);
+            Assert.Equal(new[] { "Fillet1" }, _read);
+        }
+
+        private const string Key = @"C:\parts\bracket.SLDPRT";
+
+        // Features as "Type:Name" strings stand in for the RCWs the real walk reads.
+        private static FeatureDataCache.FeatureWalk Walk(FeatureQuery query, params string[] features) =>
+            FeatureDataCache.Walk(
+                features,
+                type => type == "Fillet" ? FilletSchema : null,
+                query,
+                f => ((string)f).Split(':')[0],
+                f => ((string)f).Split(':')[1],
+                (_, name, _, schema) => new FeatureVersion(name, 9, false, schema));
+
+        // The whole tree on one page: present is exactly the features given.
+        private IReadOnlyDictionary<string, IReadOnlyDictionary<string, object?>?> Refresh(params FeatureVersion[] features) =>
+            _cache.Refresh(Key, features.Select(f => f.Name).ToHashSet(), features, Read);
+
+        private (IReadOnlyDictionary<string, object?>? Data, bool Reusable) Read(FeatureVersion feature)
+        {
+            _read.Add(feature.Name);
+            return (new Dictionary<string, object?> { ["DefaultRadius"] = feature.Name }, true);
+        }
+    }
+}
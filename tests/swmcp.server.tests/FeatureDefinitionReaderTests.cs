@@ -0,0 +1,132 @@
+using System.Text.Json;
+using SwBridge;
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. The typed readers' coverage of the
+    /// shipped seed, and which failed properties are remembered; the typed reads
+    /// themselves need live definitions.
+    /// </summary>
+    public class FeatureDefinitionReaderTests
+    {
+        private static readonly string SeedPath = Path.Combine(AppContext.BaseDirectory, "known_features.json");
+
+        [Theory]
+        [InlineData("Extrusion")]
+        [InlineData("Cut")]
+        [InlineData("ICE")]
+        [InlineData("Fillet")]
+        [InlineData("Chamfer")]
+        public void SeedSchema_IsCoveredByTypedReaders(string typeName)
+        {
+            var schema = SeedSchema(typeName);
+
+            Assert.NotEmpty(schema);
+            Assert.All(schema, spec => Assert.True(
+                FeatureDefinitionReader.HasTypedReader(typeName, spec),
+                $"{typeName}.{spec.Name} ({FeatureDefinitionReader.Signature(spec.Member, spec.Args)}) has no typed reader"));
+        }
+
+        [Fact]
+        public void TypedReaders_MatchMemberAndArguments()
+        {
+            Assert.True(FeatureDefinitionReader.HasTypedReader("Cut", new PropertySpec("Depth", "getdepth", new object?[] { true })));
+            Assert.False(FeatureDefinitionReader.HasTypedReader("Cut", new PropertySpec("Depth", "GetDepth", null)));
+            Assert.False(FeatureDefinitionReader.HasTypedReader("Shell", PropertySpec.Bare("Thickness")));
+        }
+
+        [Fact]
+        public void Signature_FormatsArgumentsInvariantly()
+        {
+            Assert.Equal("GetDepth(True)", FeatureDefinitionReader.Signature("GetDepth", new object?[] { true }));
+            Assert.Equal("GetEdgeChamferDistance(1)", FeatureDefinitionReader.Signature("GetEdgeChamferDistance", new object?[] { 1 }));
+            Assert.Equal("Thickness()", FeatureDefinitionReader.Signature("Thickness", null));
+        }
+
+        [Fact]
+        public void FailedProperty_IsSkippedAndReported()
+        {
+            var attempts = new List<string>();
+            var reader = new FeatureDefinitionReader(LateBound(attempts, failing: "Bogus"), UnknownMember("Bogus"));
+            var schema = new List<PropertySpec> { PropertySpec.Bare("Thickness"), PropertySpec.Bare("Bogus") };
+
+            var first = reader.Read(new object(), "Shell", schema, out _);
+            var second = reader.Read(new object(), "Shell", schema, out _);
+
+            Assert.Equal(new[] { "Thickness", "Bogus", "Thickness" }, attempts);
+            Assert.Equal(new[] { "Thickness" }, second.Keys);
+            Assert.Equal(first, second);
+            Assert.Equal(new[] { "Bogus" }, reader.Unreadable(schema));
+            Assert.Equal(1, reader.Skipped);
+            Assert.Equal(3, reader.LateBoundReads);
+        }
+
+        [Fact]
+        public void ReRegisteredSchema_RetriesFailedProperties()
+        {
+            var attempts = new List<string>();
+            var reader = new FeatureDefinitionReader(LateBound(attempts, failing: "Bogus"), UnknownMember("Bogus"));
+            reader.Read(new object(), "Shell", new List<PropertySpec> { PropertySpec.Bare("Bogus") }, out _);
+
+            var replacement = new List<PropertySpec> { PropertySpec.Bare("Bogus") };
+            reader.Read(new object(), "Shell", replacement, out _);
+
+            Assert.Equal(2, attempts.Count);
+            Assert.Equal(new[] { "Bogus" }, reader.Unreadable(replacement));
+        }
+
+        [Fact]
+        public void DefinitionWithoutTheInterface_IsReadLateBound()
+        {
+            var attempts = new List<string>();
+            var reader = new FeatureDefinitionReader(LateBound(attempts, failing: null), UnknownMember(null));
+
+            var data = reader.Read(new object(), "Fillet", new List<PropertySpec> { PropertySpec.Bare("DefaultRadius") }, out var complete);
+
+            Assert.Equal(new[] { "DefaultRadius" }, attempts);
+            Assert.Equal("DefaultRadius", data["DefaultRadius"]);
+            Assert.Equal(0, reader.TypedReads);
+            Assert.True(complete);
+        }
+
+        [Fact]
+        public void TransientFailure_IsRetriedNotRemembered()
+        {
+            var attempts = new List<string>();
+            var reader = new FeatureDefinitionReader(LateBound(attempts, failing: "Thickness"), (_, _) => false);
+            var schema = new List<PropertySpec> { PropertySpec.Bare("Thickness") };
+
+            reader.Read(new object(), "Shell", schema, out var complete);
+            reader.Read(new object(), "Shell", schema, out _);
+
+            Assert.False(complete);
+            Assert.Equal(2, attempts.Count);
+            Assert.Empty(reader.Unreadable(schema));
+            Assert.Equal(0, reader.Skipped);
+        }
+
+        private static FeatureDefinitionReader.LateBoundRead LateBound(List<string> attempts, string? failing) =>
+            (object target, string member, IReadOnlyList<object?>? args, out object? value) =>
+            {
+                attempts.Add(member);
+                value = member == failing ? null : member;
+                return member != failing;
+            };
+
+        private static Func<object, string, bool> UnknownMember(string? unknown) => (_, member) => member == unknown;
+
+        private static List<PropertySpec> SeedSchema(string typeName)
+        {
+            using var seed = JsonDocument.Parse(File.ReadAllText(SeedPath));
+            return seed.RootElement.GetProperty(typeName).EnumerateArray()
+                .Select(e => new PropertySpec(
+                    e.GetProperty("name").GetString()!,
+                    e.GetProperty("member").GetString()!,
+                    e.TryGetProperty("args", out var args) ? args.EnumerateArray().Select(SchemaManager.ToClrValue).ToList() : null))
+                .ToList();
+        }
+    }
+}
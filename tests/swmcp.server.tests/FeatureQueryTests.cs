@@ -0,0 +1,62 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. get_part_info's feature filter
+    /// and paging rules.
+    /// </summary>
+    public class FeatureQueryTests
+    {
+        [Fact]
+        public void Default_DropsFolderNoiseOnly()
+        {
+            Assert.False(FeatureQuery.Default.Matches("Comments", "CommentsFolder"));
+            Assert.True(FeatureQuery.Default.Matches("Boss-Extrude1", "Extrusion"));
+            Assert.True(new FeatureQuery(includeFolderFeatures: true).Matches("Comments", "CommentsFolder"));
+        }
+
+        [Fact]
+        public void TypeFilters_IncludeThenExclude_Exactly()
+        {
+            var query = new FeatureQuery(typeNames: new[] { "Fillet", "Chamfer" }, excludeTypeNames: new[] { "Chamfer" });
+
+            Assert.True(query.Matches("Fillet1", "Fillet"));
+            Assert.False(query.Matches("Chamfer1", "Chamfer"));
+            Assert.False(query.Matches("Fillet2", "fillet"));
+            Assert.False(query.Matches("Boss-Extrude1", "Extrusion"));
+        }
+
+        [Fact]
+        public void TypeStage_RejectsWithoutAName()
+        {
+            var query = new FeatureQuery(typeNames: new[] { "Fillet" }, namePattern: "Fillet1");
+
+            Assert.False(query.MatchesType("DirectionLight"));
+            Assert.False(query.MatchesType("Extrusion"));
+            Assert.True(query.MatchesType("Fillet"));
+            Assert.False(query.MatchesName("Fillet2"));
+        }
+
+        [Theory]
+        [InlineData("Fillet*", "fillet12", true)]
+        [InlineData("Fillet?", "Fillet1", true)]
+        [InlineData("Fillet?", "Fillet12", false)]
+        [InlineData("*Extrude*", "Cut-Extrude3", true)]
+        [InlineData("Boss.*", "Boss-Extrude1", false)]
+        public void NamePattern_IsAWholeNameWildcard(string pattern, string name, bool expected)
+        {
+            Assert.Equal(expected, new FeatureQuery(namePattern: pattern).Matches(name, "Extrusion"));
+        }
+
+        [Fact]
+        public void OnPage_CoversOffsetThroughOffsetPlusLimit()
+        {
+            var query = new FeatureQuery(offset: 2, limit: 3);
+
+            Assert.Equal(new[] { 2, 3, 4 }, Enumerable.Range(0, 10).Where(query.OnPage));
+            Assert.Empty(Enumerable.Range(0, 10).Where(new FeatureQuery(offset: -5, limit: 0).OnPage));
+        }
+    }
+}
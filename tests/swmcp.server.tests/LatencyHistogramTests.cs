@@ -0,0 +1,119 @@
+using System.Diagnostics;
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. The metrics histograms' bucketing
+    /// and percentiles, and how a step's clock lands in
+    /// <see cref="ServerMetrics"/> per recipe and phase and in a result's
+    /// <see cref="StepTimings"/>.
+    /// </summary>
+    public class LatencyHistogramTests
+    {
+        [Fact]
+        public void Records_LandInTheirBuckets()
+        {
+            var histogram = new LatencyHistogram();
+            histogram.Record(Ticks(0.05));
+            histogram.Record(Ticks(3));
+            histogram.Record(Ticks(4));
+            histogram.Record(Ticks(60000));
+
+            var summary = histogram.Summary();
+
+            Assert.Equal(4, summary.Count);
+            Assert.Equal(
+                new[] { new LatencyBucket(0.1, 1), new LatencyBucket(5, 2), new LatencyBucket(null, 1) },
+                summary.Buckets);
+            Assert.Equal(5, summary.P50Ms);
+            Assert.InRange(summary.P95Ms, 59999, 60001);
+            Assert.Equal(summary.MaxMs, summary.P95Ms);
+        }
+
+        [Fact]
+        public void Percentile_NeverExceedsTheSlowestCall()
+        {
+            var histogram = new LatencyHistogram();
+            histogram.Record(Ticks(120));
+
+            var summary = histogram.Summary();
+
+            Assert.Equal(summary.MaxMs, summary.P50Ms);
+            Assert.True(summary.P95Ms < 250);
+        }
+
+        [Fact]
+        public void EmptyHistogram_ReportsZeros()
+        {
+            var summary = new LatencyHistogram().Summary();
+
+            Assert.Equal(0, summary.Count);
+            Assert.Equal(0, summary.MeanMs);
+            Assert.Empty(summary.Buckets);
+        }
+
+        [Fact]
+        public void Table_NamesCompareCaseInsensitively()
+        {
+            var table = new LatencyTable();
+            table.Record("FeatureExtrusion3", Ticks(1));
+            table.Record("featureextrusion3", Ticks(1));
+
+            Assert.Equal(2, Assert.Single(table.Summaries()).Value.Count);
+        }
+
+        [Fact]
+        public void StepClock_ReportsOnlyReachedPhases()
+        {
+            var clock = new StepClock();
+            clock.Lap(StepPhase.ResolveDocument);
+            clock.Lap(StepPhase.Bind);
+            clock.Lap(StepPhase.Bind);
+
+            Assert.Equal(new[] { StepPhase.ResolveDocument, StepPhase.Bind }, clock.Phases().Select(p => p.Phase));
+            Assert.Equal("resolveDocument", StepClock.Name(StepPhase.ResolveDocument));
+        }
+
+        [Fact]
+        public void StepTimings_LeaveUnreachedPhasesNull()
+        {
+            var clock = new StepClock();
+            clock.Lap(StepPhase.ResolveDocument);
+            clock.Lap(StepPhase.Bind);
+
+            var timings = clock.Timings(TimeSpan.FromMilliseconds(12.5));
+            var untimed = clock.Timings(null);
+
+            Assert.Equal(12.5, timings.QueueWaitMs);
+            Assert.NotNull(timings.BindMs);
+            Assert.Null(timings.RequiresMs);
+            Assert.Null(timings.InvokeMs);
+            var sum = timings.ResolveDocumentMs!.Value + timings.BindMs!.Value;
+            Assert.InRange(timings.TotalMs, sum - 0.002, sum + 0.002);
+            Assert.Null(untimed.QueueWaitMs);
+        }
+
+        [Fact]
+        public void RecordedStep_IsReportedByRecipeAndPhase()
+        {
+            var targets = new ComTargetCache();
+            var definitions = new FeatureDefinitionReader();
+            var metrics = new ServerMetrics(
+                new DispatchScheduler(), targets, new FeatureDataCache(targets, definitions), definitions, new AssemblyTreeCache());
+            var clock = new StepClock();
+            clock.Lap(StepPhase.Bind);
+            clock.Lap(StepPhase.Invoke);
+
+            metrics.RecordStep("extrude_boss", clock);
+            metrics.RecordStep("EXTRUDE_BOSS", clock);
+
+            var phases = metrics.Snapshot().Recipes["extrude_boss"];
+            Assert.Equal(new[] { "bind", "invoke" }, phases.Keys);
+            Assert.Equal(2, phases["invoke"].Count);
+        }
+
+        private static long Ticks(double ms) => (long)(ms * Stopwatch.Frequency / 1000);
+    }
+}
@@ -3,6 +3,7 @@ using System.Text.Json;
 using SwBridge;
 using swmcp.server.Models;
 using swmcp.server.Services;
+using swmcp.server.Tools;
 using Xunit;
 
 namespace swmcp.server.tests
@@ -263,7 +264,7 @@ namespace swmcp.server.tests
             var check = new VerifyCheck { Check = "returnEquals", Expected = Parse("0") };
             var failures = new List<string>();
 
-            OperationRunner.EvaluateVerify(check, doc: null, InvokeOutcome.Ok(0), preFeatureCount: null, preSketchSegCount: null, failures);
+            OperationRunner.EvaluateVerify(check, probes: null, InvokeOutcome.Ok(0), preFeatureCount: null, preSketchSegCount: null, failures);
 
             Assert.Empty(failures);
         }
@@ -274,7 +275,7 @@ namespace swmcp.server.tests
             var check = new VerifyCheck { Check = "returnEquals", Expected = Parse("0") };
             var failures = new List<string>();
 
-            OperationRunner.EvaluateVerify(check, doc: null, InvokeOutcome.Ok(2), preFeatureCount: null, preSketchSegCount: null, failures);
+            OperationRunner.EvaluateVerify(check, probes: null, InvokeOutcome.Ok(2), preFeatureCount: null, preSketchSegCount: null, failures);
 
             Assert.Single(failures);
             Assert.Contains("returnEquals", failures[0]);
@@ -286,10 +287,67 @@ namespace swmcp.server.tests
             var check = new VerifyCheck { Check = "returnEquals" };
             var failures = new List<string>();
 
-            OperationRunner.EvaluateVerify(check, doc: null, InvokeOutcome.Ok(0), preFeatureCount: null, preSketchSegCount: null, failures);
+            OperationRunner.EvaluateVerify(check, probes: null, InvokeOutcome.Ok(0), preFeatureCount: null, preSketchSegCount: null, failures);
 
             Assert.Single(failures);
             Assert.Contains("expected", failures[0], StringComparison.OrdinalIgnoreCase);
         }
+
+        // Probe-backed checks fail closed when the step has no document (and
+        // therefore no StepProbes) rather than throwing.
+        [Theory]
+        [InlineData("featureCountIncreased")]
+        [InlineData("sketchSegmentCountIncreased")]
+        [InlineData("sketchModeIs")]
+        [InlineData("noNewRebuildErrors")]
+        public void EvaluateVerify_ProbeCheckWithoutDocument_Fails(string checkName)
+        {
+            var check = new VerifyCheck { Check = checkName };
+            var failures = new List<string>();
+
+            OperationRunner.EvaluateVerify(check, probes: null, InvokeOutcome.Ok(null), preFeatureCount: 3, preSketchSegCount: 3, failures);
+
+            Assert.Single(failures);
+            Assert.Contains("no document to probe", failures[0]);
+        }
+
+        [Theory]
+        [InlineData(SnapshotPolicy.EveryStep, true, false, true)]
+        [InlineData(SnapshotPolicy.Final, true, false, false)]
+        [InlineData(SnapshotPolicy.Final, true, true, true)]
+        [InlineData(SnapshotPolicy.Final, false, false, true)]
+        [InlineData(SnapshotPolicy.OnFailure, true, true, false)]
+        [InlineData(SnapshotPolicy.OnFailure, false, false, true)]
+        [InlineData(SnapshotPolicy.None, false, true, false)]
+        public void WantsSnapshot_FollowsPolicy(SnapshotPolicy policy, bool success, bool isLastStep, bool expected)
+        {
+            Assert.Equal(expected, OperationRunner.WantsSnapshot(policy, success, isLastStep));
+        }
+
+        [Theory]
+        [InlineData("onFailure", true)]
+        [InlineData("EVERYSTEP", true)]
+        [InlineData("2", false)]
+        [InlineData("none,final", false)]
+        [InlineData("always", false)]
+        public void TryParseSnapshotPolicy_AcceptsOnlyDocumentedNames(string value, bool expected)
+        {
+            Assert.Equal(expected, OperationsTool.TryParseSnapshotPolicy(value, out _));
+        }
+
+        [Theory]
+        [InlineData("deferred", true, RebuildPolicy.Deferred)]
+        [InlineData("PERSTEP", true, RebuildPolicy.PerStep)]
+        [InlineData("", true, RebuildPolicy.PerStep)]
+        [InlineData("1", false, RebuildPolicy.PerStep)]
+        [InlineData("never", false, RebuildPolicy.PerStep)]
+        public void TryParseRebuildPolicy_AcceptsOnlyDocumentedNames(string value, bool expected, RebuildPolicy expectedPolicy)
+        {
+            Assert.Equal(expected, OperationsTool.TryParseRebuildPolicy(value, out var policy));
+            if (expected)
+            {
+                Assert.Equal(expectedPolicy, policy);
+            }
+        }
     }
 }
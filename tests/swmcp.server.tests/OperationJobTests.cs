@@ -0,0 +1,99 @@
+using swmcp.server.Services;
+using swmcp.server.Tools;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. Fixes the job record's state
+    /// machine: steps land as they finish, and the first terminal status wins
+    /// (a step that fails or completes the batch on the dispatcher thread is
+    /// never overwritten by the background task finishing later).
+    /// </summary>
+    public class OperationJobTests
+    {
+        private static OperationResult Ok() => new(true, null, null, null, null);
+
+        private static OperationResult Failed(string error) => new(false, error, null, null, null);
+
+        private static OperationJob NewJob(params string[] operations) => new("job1", operations);
+
+        [Fact]
+        public void LastSuccessfulStep_CompletesTheJob()
+        {
+            var job = NewJob("insert_sketch", "create_line");
+
+            job.Append(0, Ok());
+            Assert.Equal(JobStatus.Running, job.Snapshot().Status);
+
+            job.Append(1, Ok());
+            var snapshot = job.Snapshot();
+            Assert.Equal(JobStatus.Completed, snapshot.Status);
+            Assert.Equal(2, snapshot.Results.Count);
+            Assert.NotNull(snapshot.FinishedAt);
+        }
+
+        [Fact]
+        public void FailingStep_FailsTheJobAndNamesTheStep()
+        {
+            var job = NewJob("insert_sketch", "extrude_boss", "rebuild");
+
+            job.Append(0, Ok());
+            job.Append(1, Failed("featureCountIncreased: expected +1, observed 0 (3->3)."));
+            job.Finish(JobStatus.Completed, null); // the background task returning afterwards must not overwrite it
+
+            var snapshot = job.Snapshot();
+            Assert.Equal(JobStatus.Failed, snapshot.Status);
+            Assert.Contains("Step 1 ('extrude_boss')", snapshot.Error);
+        }
+
+        [Fact]
+        public void VectorizedStepStoppedBetweenItems_CancelsTheJob()
+        {
+            var job = NewJob("insert_sketch", "create_circle_by_radius", "exit_sketch");
+
+            job.Append(0, Ok());
+            job.Append(1, new OperationResult(false, "Cancelled after item 41 of 200 ('create_circle_by_radius').", null, null, null, Cancelled: true));
+
+            var snapshot = job.Snapshot();
+            Assert.Equal(JobStatus.Cancelled, snapshot.Status);
+            Assert.Contains("step 1 ('create_circle_by_radius')", snapshot.Error);
+            Assert.Equal(2, snapshot.Results.Count);
+        }
+
+        [Fact]
+        public void StepLandingAfterCancellation_IsRecordedButStatusStaysCancelled()
+        {
+            var job = NewJob("insert_sketch", "create_line", "exit_sketch");
+            job.Append(0, Ok());
+            job.MarkDispatchTimedOut();
+
+            job.Finish(JobStatus.Cancelled, "Cancelled by cancel_job.");
+            job.Append(1, Ok());
+
+            var snapshot = job.Snapshot();
+            Assert.Equal(JobStatus.Cancelled, snapshot.Status);
+            Assert.True(snapshot.DispatchTimedOut);
+            Assert.Equal(2, snapshot.Results.Count);
+        }
+
+        [Fact]
+        public void Snapshot_IsACopy()
+        {
+            var job = NewJob("insert_sketch", "create_line");
+            job.Append(0, Ok());
+            var before = job.Snapshot();
+
+            job.Append(1, Ok());
+
+            Assert.Single(before.Results);
+        }
+
+        [Fact]
+        public void Describe_IsCamelCase()
+        {
+            Assert.Equal("queued", OperationsTool.Describe(JobStatus.Queued));
+            Assert.Equal("cancelled", OperationsTool.Describe(JobStatus.Cancelled));
+        }
+    }
+}
@@ -0,0 +1,39 @@
+using swmcp.server.Tools;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. get_part_info's 'fields'
+    /// argument parsing.
+    /// </summary>
+    public class PartInfoFieldsTests
+    {
+        [Fact]
+        public void NoFields_MeansEverySection()
+        {
+            var all = SolidWorksTool.ParseFields(null, out var error);
+
+            Assert.Null(error);
+            Assert.Equal(new[] { "boundingBox", "density", "features", "mass", "material" }, all!.Order(StringComparer.Ordinal));
+            Assert.Equal(all, SolidWorksTool.ParseFields(Array.Empty<string>(), out _));
+        }
+
+        [Fact]
+        public void Fields_AreCaseInsensitive_AndCanonicalized()
+        {
+            var wanted = SolidWorksTool.ParseFields(new[] { "MASS", " boundingbox " }, out var error);
+
+            Assert.Null(error);
+            Assert.Equal(new[] { "boundingBox", "mass" }, wanted!.Order(StringComparer.Ordinal));
+        }
+
+        [Fact]
+        public void UnknownField_IsRefused()
+        {
+            Assert.Null(SolidWorksTool.ParseFields(new[] { "features", "volume" }, out var error));
+            Assert.Contains("'volume'", error);
+            Assert.Contains("boundingBox", error);
+        }
+    }
+}
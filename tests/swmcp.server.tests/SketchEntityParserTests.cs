@@ -0,0 +1,58 @@
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    public class SketchEntityParserTests
+    {
+        [Fact]
+        public void ParsesEveryKind_ScaledToMeters()
+        {
+            var ok = SketchEntityParser.TryParse(
+                "L 0 0 40 0; arc 40,30, 40,20, 40,40 -1\nC 20 10 3;P 5 5", 0.001, out var entities, out var error);
+
+            Assert.True(ok, error);
+            Assert.Equal(4, entities.Count);
+            Assert.Equal(SketchEntityKind.Line, entities[0].Kind);
+            Assert.Equal(0.04, entities[0].Values[2], 12);
+            Assert.Equal(SketchEntityKind.Arc, entities[1].Kind);
+            Assert.Equal(-1, entities[1].Direction);
+            Assert.Equal(6, entities[1].Values.Length);
+            Assert.Equal(0.003, entities[2].Values[2], 12);
+            Assert.False(entities[3].IsSegment);
+            Assert.Equal(3, entities.Count(e => e.IsSegment));
+        }
+
+        [Fact]
+        public void ArcDirection_DefaultsToCounterClockwise()
+        {
+            Assert.True(SketchEntityParser.TryParse("A 0 0 1 0 0 1", 1.0, out var entities, out _));
+            Assert.Equal(1, entities[0].Direction);
+        }
+
+        [Fact]
+        public void SeparatorOnlyRecord_IsSkipped()
+        {
+            Assert.True(SketchEntityParser.TryParse("L 0 0 1 1; ,", 1.0, out var entities, out var error), error);
+            Assert.Single(entities);
+        }
+
+        [Theory]
+        [InlineData("", "empty")]
+        [InlineData(",", "empty")]
+        [InlineData(" ;\t, ;", "empty")]
+        [InlineData("L 0 0 1", "line takes 4 numbers, got 3")]
+        [InlineData("L 0 0 1 1; Q 1 2", "entity 1 ('Q 1 2'): unknown kind 'Q'")]
+        [InlineData("C 0 0 x", "'x' is not a number")]
+        [InlineData("C 0 0 0", "radius must be positive")]
+        [InlineData("A 0 0 1 0 0 1 2", "arc direction must be 1")]
+        public void MalformedList_IsRefusedWhole(string text, string expected)
+        {
+            var ok = SketchEntityParser.TryParse(text, 0.001, out var entities, out var error);
+
+            Assert.False(ok);
+            Assert.Empty(entities);
+            Assert.Contains(expected, error);
+        }
+    }
+}
@@ -0,0 +1,108 @@
+using System.Text.Json;
+using swmcp.server.Models;
+using swmcp.server.Services;
+using Xunit;
+
+namespace swmcp.server.tests
+{
+    /// <summary>
+    /// Pure logic — no SolidWorks required. Earlier steps' returns are plain
+    /// DTOs by the time a later step refers to them, so anonymous objects
+    /// stand in for them here.
+    /// </summary>
+    public class StepReferencesTests
+    {
+        private static JsonElement Parse(string json) => JsonDocument.Parse(json).RootElement.Clone();
+
+        private static Dictionary<string, JsonElement> Args(string json) =>
+            JsonSerializer.Deserialize<Dictionary<string, JsonElement>>(json)!;
+
+        private static OperationRecipe Recipe(params (string Name, string Type)[] parameters) => new()
+        {
+            Name = "test_op",
+            Params = parameters.Select(p => new OperationParam { Name = p.Name, Type = p.Type }).ToList(),
+        };
+
+        private static StepReferences WithReturns(params object?[] returns)
+        {
+            var references = new StepReferences();
+            foreach (var r in returns)
+            {
+                references.Add(new OperationResult(true, null, r, null, null));
+            }
+
+            return references;
+        }
+
+        [Fact]
+        public void MemberPath_ResolvesCaseInsensitively_AndBindsLikeALiteral()
+        {
+            var references = WithReturns(null, new { Name = "Boss-Extrude1", TypeName = "Extrusion" });
+            var recipe = Recipe(("name", "string"), ("type", "string"));
+
+            var (args, error) = references.Resolve(recipe, Args("""{"name": {"$ref": "steps[1].return.name"}, "type": "BODYFEATURE"}"""), stepIndex: 2);
+            var (_, boundArgs, bindError) = OperationRunner.Bind(recipe, args);
+
+            Assert.Null(error);
+            Assert.Null(bindError);
+            Assert.Equal("Boss-Extrude1", boundArgs["name"]);
+            Assert.Equal("BODYFEATURE", boundArgs["type"]);
+        }
+
+        [Fact]
+        public void IndexPath_ResolvesIntoArrays()
+        {
+            var references = WithReturns(new { segments = new[] { new { id = "Line1" }, new { id = "Line2" } } });
+            var recipe = Recipe(("name", "string"));
+
+            var (args, error) = references.Resolve(recipe, Args("""{"name": {"$ref": "steps[0].return.segments[1].id"}}"""), stepIndex: 1);
+
+            Assert.Null(error);
+            Assert.Equal("Line2", args!["name"].GetString());
+        }
+
+        // A length the server itself returned is canonical SI — it must bind,
+        // not trip the bare-number unit gate meant for client guesses.
+        [Fact]
+        public void NumberIntoLengthParam_BindsAsMeters()
+        {
+            var references = WithReturns(new { depth = 0.04 });
+            var recipe = Recipe(("depth1", "length"));
+
+            var (args, _) = references.Resolve(recipe, Args("""{"depth1": {"$ref": "steps[0].return.depth"}}"""), stepIndex: 1);
+            var (_, boundArgs, bindError) = OperationRunner.Bind(recipe, args);
+
+            Assert.Null(bindError);
+            Assert.Equal(0.04, (double)boundArgs["depth1"]!, 12);
+        }
+
+        [Theory]
+        [InlineData("steps[1].return", "earlier step")]
+        [InlineData("steps[5].return", "earlier step")]
+        [InlineData("steps[0].return.missing", "no member 'missing'")]
+        [InlineData("steps[0].return.name[2]", "no element [2]")]
+        [InlineData("step[0].name", "is not of the form")]
+        public void UnresolvableReference_NamesTheProblem(string path, string expected)
+        {
+            var references = WithReturns(new { name = "Sketch1" });
+            var recipe = Recipe(("name", "string"));
+
+            var (args, error) = references.Resolve(recipe, new Dictionary<string, JsonElement> { ["name"] = Parse($"{{\"$ref\": \"{path}\"}}") }, stepIndex: 1);
+
+            Assert.Null(args);
+            Assert.Contains("Argument 'name'", error);
+            Assert.Contains(expected, error);
+        }
+
+        [Fact]
+        public void ArgsWithoutReferences_ArePassedThroughUntouched()
+        {
+            var original = Args("""{"name": "Front Plane", "extra": {"$ref": "x", "other": 1}}""");
+
+            var (args, error) = new StepReferences().Resolve(Recipe(("name", "string")), original, stepIndex: 0);
+
+            Assert.Null(error);
+            Assert.Same(original, args);
+        }
+    }
+}